@@ -0,0 +1,42 @@
+# __init__.py
+# Подмодули (и python-pptx вместе с ними) загружаются при первом обращении
+# к имени, а не при импорте пакета (PEP 562)
+import importlib
+
+__version__ = "4.0.0"
+__author__ = "Presentation Generator Team"
+
+# Имя -> подмодуль, из которого оно берется
+_LAZY_EXPORTS = {
+    'PresentationGenerator': '.core',
+    'create_presentation': '.core',
+    'Slide': '.core',
+    'ContentElement': '.core',
+    'ContentType': '.core',
+    'ElementStyle': '.core',
+    'TextStyle': '.core',
+    'BorderStyle': '.core',
+    'SizeConstraints': '.core',
+    'LayoutStrategy': '.core',
+    'Inches': '.core',
+    'Pt': '.core',
+    'RGBColor': '.core',
+    'PP_ALIGN': '.core',
+    'MSO_SHAPE': '.core'
+}
+
+__all__ = list(_LAZY_EXPORTS)
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module_name, __package__), name)
+    globals()[name] = value  # Следующие обращения идут мимо __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,217 @@
+# chart_downsample.py - ПРОРЕЖИВАНИЕ РЯДОВ ДИАГРАММ
+"""
+Этап перед рендером: ряд длиннее max_points сокращается до max_points
+точек с сохранением формы графика.
+
+- lttb - Largest-Triangle-Three-Buckets: точки делятся на корзины, из
+  каждой берется точка, образующая самый большой треугольник с выбранной
+  точкой предыдущей корзины и средним следующей. Сохраняет пики и изломы.
+- minmax - минимум и максимум каждой корзины (в порядке следования):
+  огибающая ряда, глобальные минимум и максимум сохраняются всегда. Из
+  нескольких выбросов одной корзины остается только самый большой (и самый
+  малый), так что близкие выбросы сливаются в один.
+
+Оба метода - один проход по корзинам, время линейно от числа точек. С NumPy
+корзина обрабатывается векторно, без него - тот же расчет на списках.
+Первая и последняя точки ряда сохраняются всегда; пропуски (None, NaN)
+в выборку не попадают.
+"""
+
+from .chart_module import ChartSeries, ChartSpec, _is_numeric
+from dataclasses import dataclass, replace
+from typing import List, Optional, Sequence, Tuple
+import math
+
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен
+    np = None
+
+DOWNSAMPLE_METHODS = ("lttb", "minmax")
+
+
+@dataclass
+class DownsampleReport:
+    """Сколько точек было и осталось (по самому длинному ряду)"""
+    method: str
+    original: int
+    kept: int
+
+    @property
+    def reduced(self) -> bool:
+        return self.kept < self.original
+
+    @property
+    def ratio(self) -> float:
+        """Во сколько раз меньше точек"""
+        return self.original / self.kept if self.kept else 1.0
+
+
+def _is_array(values) -> bool:
+    return np is not None and isinstance(values, np.ndarray)
+
+
+def _valid_indices(x: Optional[Sequence], y: Sequence) -> Sequence[int]:
+    """Индексы точек без пропусков"""
+    if _is_array(y) and (x is None or _is_array(x)):
+        mask = np.isfinite(y.astype(np.float64))
+        if x is not None:
+            mask &= np.isfinite(x.astype(np.float64))
+        return np.flatnonzero(mask)
+
+    def valid(value) -> bool:
+        return value is not None and not (isinstance(value, float) and not math.isfinite(value))
+
+    if x is None:
+        return [i for i, value in enumerate(y) if valid(value)]
+    return [i for i, (xv, yv) in enumerate(zip(x, y)) if valid(xv) and valid(yv)]
+
+
+def _bucket_edges(count: int, buckets: int) -> List[int]:
+    """Границы buckets корзин внутренних точек [1, count - 1)"""
+    step = (count - 2) / buckets
+    return [1 + int(i * step) for i in range(buckets)] + [count - 1]
+
+
+def lttb_indices(x: Optional[Sequence], y: Sequence, threshold: int) -> Sequence[int]:
+    """Индексы threshold точек по LTTB; x=None - равномерный шаг (позиции)"""
+    valid = _valid_indices(x, y)
+    count = len(valid)
+    if threshold >= count or threshold < 3:
+        return valid
+
+    if _is_array(valid):
+        ys = y[valid].astype(np.float64)
+        xs = x[valid].astype(np.float64) if x is not None else valid.astype(np.float64)
+    else:
+        ys = [float(y[i]) for i in valid]
+        xs = [float(x[i]) for i in valid] if x is not None else [float(i) for i in valid]
+    vectorized = _is_array(ys)
+
+    edges = _bucket_edges(count, threshold - 2)
+    selected = [0]
+    a = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        # Третья вершина - среднее следующей корзины (для последней - последняя точка)
+        if bucket + 2 < len(edges):
+            next_start, next_end = end, edges[bucket + 2]
+            if vectorized:
+                next_x, next_y = xs[next_start:next_end].mean(), ys[next_start:next_end].mean()
+            else:
+                size = next_end - next_start
+                next_x = sum(xs[next_start:next_end]) / size
+                next_y = sum(ys[next_start:next_end]) / size
+        else:
+            next_x, next_y = xs[count - 1], ys[count - 1]
+
+        ax, ay = xs[a], ys[a]
+        dx, dy = ax - next_x, next_y - ay
+        # Удвоенная площадь треугольника (a, точка, среднее следующей)
+        if vectorized:
+            area = np.abs(dx * (ys[start:end] - ay) + (xs[start:end] - ax) * dy)
+            a = start + int(area.argmax())
+        else:
+            a = max(range(start, end), key=lambda i: abs(dx * (ys[i] - ay) + (xs[i] - ax) * dy))
+        selected.append(a)
+    selected.append(count - 1)
+
+    if vectorized:
+        return valid[np.array(selected, dtype=np.int64)]
+    return [valid[i] for i in selected]
+
+
+def minmax_indices(y: Sequence, threshold: int) -> Sequence[int]:
+    """Индексы не более threshold точек: минимум и максимум каждой корзины"""
+    valid = _valid_indices(None, y)
+    count = len(valid)
+    if threshold >= count or threshold < 4:
+        return valid
+
+    vectorized = _is_array(valid)
+    ys = y[valid].astype(np.float64) if vectorized else [float(y[i]) for i in valid]
+
+    edges = _bucket_edges(count, (threshold - 2) // 2)
+    selected = [0]
+    for start, end in zip(edges, edges[1:]):
+        if vectorized:
+            chunk = ys[start:end]
+            low, high = start + int(chunk.argmin()), start + int(chunk.argmax())
+        else:
+            low = min(range(start, end), key=ys.__getitem__)
+            high = max(range(start, end), key=ys.__getitem__)
+        selected.extend(sorted({low, high}))
+    selected.append(count - 1)
+
+    if vectorized:
+        return valid[np.array(selected, dtype=np.int64)]
+    return [valid[i] for i in selected]
+
+
+def downsample_indices(x: Optional[Sequence], y: Sequence, threshold: int, method: str = "lttb") -> Sequence[int]:
+    if method == "lttb":
+        return lttb_indices(x, y, threshold)
+    if method == "minmax":
+        return minmax_indices(y, threshold)
+    raise ValueError(f"Неизвестный метод прореживания: {method} (доступны: {', '.join(DOWNSAMPLE_METHODS)})")
+
+
+def _uniform_indices(count: int, threshold: int) -> List[int]:
+    """Не более threshold равномерно расставленных индексов из count, с первым и последним"""
+    if threshold >= count:
+        return list(range(count))
+    if threshold < 2:
+        return [0][:threshold]
+    step = (count - 1) / (threshold - 1)
+    return [round(i * step) for i in range(threshold)]
+
+
+def _take(values: Sequence, indices: Sequence[int]) -> Sequence:
+    if _is_array(values):
+        return values[np.asarray(indices, dtype=np.int64)]
+    return [values[i] for i in indices]
+
+
+def downsample_spec(spec: ChartSpec, max_points: int, method: str = "lttb") -> Tuple[ChartSpec, DownsampleReport]:
+    """Новый ChartSpec, в котором ни один ряд не длиннее max_points, и отчет о сокращении
+
+    У точечной диаграммы каждый ряд прореживается по своим x. У bar и line
+    ряды делят категории: каждый ряд получает max_points / число рядов
+    точек, в диаграмму идет объединение выбранных индексов. Если на ряд
+    приходится меньше 4 точек (или у точечной диаграммы max_points < 4),
+    форму сохранить нельзя - берутся max_points равномерно расставленных
+    точек. Круговая диаграмма не прореживается.
+    """
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(f"Неизвестный метод прореживания: {method} (доступны: {', '.join(DOWNSAMPLE_METHODS)})")
+    original = spec.points
+    if spec.chart_type == "pie" or original <= max_points:
+        return spec, DownsampleReport(method, original, original)
+
+    if spec.chart_type == "scatter":
+        series = []
+        for item in spec.series:
+            if max_points < 4:
+                indices = _uniform_indices(len(item.values), max_points)
+            else:
+                indices = downsample_indices(item.x_values, item.values, max_points, method)
+            series.append(ChartSeries(item.name, _take(item.values, indices), _take(item.x_values, indices)))
+        reduced = replace(spec, series=series, _digest=None)
+    else:
+        # Категории-range (по умолчанию 1..N) - равномерный шаг, как позиции
+        numeric = not isinstance(spec.categories, range) and _is_numeric(spec.categories)
+        x = spec.categories if numeric else None
+        threshold = max_points // len(spec.series)
+        if threshold < 4:
+            indices = _uniform_indices(original, max_points)
+        else:
+            selected = set()
+            for item in spec.series:
+                xs = x[:len(item.values)] if x is not None else None
+                selected.update(int(i) for i in downsample_indices(xs, item.values, threshold, method))
+            indices = sorted(selected)
+        # Ряды короче категорий: выбранные индексы в пределах ряда - префикс списка
+        series = [ChartSeries(item.name, _take(item.values, [i for i in indices if i < len(item.values)]))
+                  for item in spec.series]
+        reduced = replace(spec, series=series, categories=_take(spec.categories, indices), _digest=None)
+    return reduced, DownsampleReport(method, original, reduced.points)
@@ -0,0 +1,395 @@
+# chart_module.py - НАТИВНЫЕ ДИАГРАММЫ POWERPOINT
+"""
+Столбчатые, линейные, круговые и точечные диаграммы (bar, line, pie,
+scatter) из словаря data или из столбцов - списков и массивов NumPy.
+
+XML части диаграммы не собирается деревом lxml и не хранится строкой:
+значения рядов читаются порциями по CHUNK_POINTS и кодируются сразу в один
+буфер байт. Книга Excel с теми же данными (минимальный SpreadsheetML:
+один лист, числа и строки inline) пишется так же порциями прямо в поток
+zip-архива. В памяти остаются только итоговые байты части и сжатой книги.
+
+Диаграммы одного типа с одинаковыми данными (SHA1 по значениям) ссылаются
+на одну часть пакета.
+"""
+
+from pptx.opc.constants import CONTENT_TYPE as CT, RELATIONSHIP_TYPE as RT
+from pptx.opc.package import Part
+from pptx.parts.chart import ChartPart
+from pptx.parts.embeddedpackage import EmbeddedXlsxPart
+from xml.sax.saxutils import escape
+from dataclasses import dataclass, field
+from itertools import zip_longest
+from typing import Dict, Iterator, List, Optional, Sequence
+import hashlib
+import io
+import math
+import zipfile
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+CHART_TYPES = ("bar", "line", "pie", "scatter")
+
+# Столько значений ряда читается и кодируется за раз
+CHUNK_POINTS = 8192
+
+_HEADER = (
+    "<?xml version='1.0' encoding='UTF-8' standalone='yes'?>\n"
+    '<c:chartSpace xmlns:c="http://schemas.openxmlformats.org/drawingml/2006/chart" '
+    'xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<c:date1904 val="0"/><c:roundedCorners val="0"/>'
+)
+
+_TEXT_PROPERTIES = (
+    '<c:txPr><a:bodyPr/><a:lstStyle/><a:p><a:pPr><a:defRPr sz="%d"/></a:pPr>'
+    '<a:endParaRPr lang="ru-RU"/></a:p></c:txPr>'
+)
+
+_CAT_AXIS = (
+    '<c:catAx><c:axId val="%d"/><c:scaling><c:orientation val="minMax"/></c:scaling><c:delete val="0"/>'
+    '<c:axPos val="b"/><c:majorTickMark val="out"/><c:minorTickMark val="none"/><c:tickLblPos val="nextTo"/>'
+    '<c:crossAx val="%d"/><c:crosses val="autoZero"/><c:auto val="1"/><c:lblAlgn val="ctr"/>'
+    '<c:lblOffset val="100"/><c:noMultiLvlLbl val="0"/></c:catAx>'
+)
+
+_VAL_AXIS = (
+    '<c:valAx><c:axId val="%d"/><c:scaling><c:orientation val="minMax"/></c:scaling><c:delete val="0"/>'
+    '<c:axPos val="%s"/>%s<c:numFmt formatCode="General" sourceLinked="1"/><c:majorTickMark val="out"/>'
+    '<c:minorTickMark val="none"/><c:tickLblPos val="nextTo"/><c:crossAx val="%d"/><c:crosses val="autoZero"/>'
+    '<c:crossBetween val="%s"/></c:valAx>'
+)
+
+_PT = '<c:pt idx="%d"><c:v>%r</c:v></c:pt>'
+_STR_PT = '<c:pt idx="%d"><c:v>%s</c:v></c:pt>'
+
+_AXIS_IDS = (500000001, 500000002)
+
+_XML_DECLARATION = "<?xml version='1.0' encoding='UTF-8' standalone='yes'?>\n"
+_SPREADSHEET_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_RELATIONSHIPS_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+_OFFICE_RELS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+# Постоянные части книги: все, кроме листа с данными
+_WORKBOOK_PARTS = (
+    ("[Content_Types].xml",
+     '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+     '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+     '<Default Extension="xml" ContentType="application/xml"/>'
+     '<Override PartName="/xl/workbook.xml" '
+     'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+     '<Override PartName="/xl/worksheets/sheet1.xml" '
+     'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+     '<Override PartName="/xl/styles.xml" '
+     'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/></Types>'),
+    ("_rels/.rels",
+     '<Relationships xmlns="%s"><Relationship Id="rId1" Type="%s/officeDocument" Target="xl/workbook.xml"/>'
+     '</Relationships>' % (_RELATIONSHIPS_NS, _OFFICE_RELS)),
+    ("xl/workbook.xml",
+     '<workbook xmlns="%s" xmlns:r="%s"><sheets><sheet name="Sheet1" sheetId="1" r:id="rId1"/></sheets>'
+     '</workbook>' % (_SPREADSHEET_NS, _OFFICE_RELS)),
+    ("xl/_rels/workbook.xml.rels",
+     '<Relationships xmlns="%s"><Relationship Id="rId1" Type="%s/worksheet" Target="worksheets/sheet1.xml"/>'
+     '<Relationship Id="rId2" Type="%s/styles" Target="styles.xml"/></Relationships>'
+     % (_RELATIONSHIPS_NS, _OFFICE_RELS, _OFFICE_RELS)),
+    ("xl/styles.xml",
+     '<styleSheet xmlns="%s"><fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+     '<fills count="1"><fill><patternFill patternType="none"/></fill></fills>'
+     '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+     '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+     '<cellXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/></cellXfs>'
+     '</styleSheet>' % _SPREADSHEET_NS),
+)
+
+
+@dataclass
+class ChartSeries:
+    """Ряд диаграммы; x_values - только у точечной"""
+    name: str
+    values: Sequence
+    x_values: Optional[Sequence] = None
+
+
+@dataclass
+class ChartSpec:
+    """Тип, категории и ряды диаграммы"""
+    chart_type: str
+    series: List[ChartSeries]
+    categories: Optional[Sequence] = None
+    title: Optional[str] = None
+    legend: Optional[bool] = None
+    font_size: int = 12
+    _digest: Optional[str] = field(default=None, repr=False, compare=False)
+
+    @property
+    def points(self) -> int:
+        return max((len(series.values) for series in self.series), default=0)
+
+    @property
+    def show_legend(self) -> bool:
+        if self.legend is not None:
+            return self.legend
+        return self.chart_type == "pie" or len(self.series) > 1
+
+    def digest(self) -> str:
+        """SHA1 по типу, подписям и всем значениям (считается один раз)"""
+        if self._digest is None:
+            digest = hashlib.sha1(repr((self.chart_type, self.title, self.legend, self.font_size)).encode())
+            columns = [self.categories] if self.categories is not None else []
+            for series in self.series:
+                digest.update(series.name.encode())
+                columns.extend([series.x_values, series.values] if series.x_values is not None else [series.values])
+            for column in columns:
+                digest.update(b"|%d|" % len(column))
+                for chunk in _iter_chunks(column):
+                    digest.update(repr(chunk).encode())
+            self._digest = digest.hexdigest()
+        return self._digest
+
+
+def _iter_chunks(values: Sequence) -> Iterator[list]:
+    """Значения порциями обычных списков Python (массив NumPy - через tolist() порции)"""
+    is_array = np is not None and isinstance(values, np.ndarray)
+    for start in range(0, len(values), CHUNK_POINTS):
+        chunk = values[start:start + CHUNK_POINTS]
+        yield chunk.tolist() if is_array else list(chunk)
+
+
+def _column(values) -> Sequence:
+    """Столбец данных как последовательность с len(): список, кортеж или массив NumPy - без копии"""
+    if isinstance(values, (list, tuple, range)) or (np is not None and isinstance(values, np.ndarray)):
+        return values
+    return list(values)
+
+
+def chart_spec(chart_type: str, data: Dict, title: Optional[str] = None, **kwargs) -> ChartSpec:
+    """Нормализует data в ChartSpec
+
+    - {категория: число, ...} - один ряд;
+    - {"categories": [...], "series": {имя: значения, ...}} - столбцы (списки или массивы NumPy);
+    - для scatter: {"x": xs, "y": ys} или {"series": {имя: (xs, ys), ...}}.
+    """
+    if chart_type not in CHART_TYPES:
+        raise ValueError(f"Неизвестный тип диаграммы: {chart_type} (доступны: {', '.join(CHART_TYPES)})")
+
+    if chart_type == "scatter":
+        if "series" in data:
+            series = [ChartSeries(str(name), _column(ys), _column(xs)) for name, (xs, ys) in data["series"].items()]
+        else:
+            series = [ChartSeries(title or "Ряд 1", _column(data["y"]), _column(data["x"]))]
+        categories = None
+    elif "series" in data:
+        series = [ChartSeries(str(name), _column(values)) for name, values in data["series"].items()]
+        categories = data.get("categories")
+        categories = _column(categories) if categories is not None else range(1, max(len(s.values) for s in series) + 1)
+    else:
+        categories = [str(key) for key in data]
+        series = [ChartSeries(title or "Значения", list(data.values()))]
+
+    for item in series:
+        if item.x_values is not None and len(item.x_values) != len(item.values):
+            raise ValueError(f"Ряд {item.name}: разная длина x ({len(item.x_values)}) и y ({len(item.values)})")
+    return ChartSpec(chart_type, series, categories, title, **kwargs)
+
+
+def _column_letter(index: int) -> str:
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _range(column: int, count: int) -> str:
+    letter = _column_letter(column)
+    return "Sheet1!$%s$2:$%s$%d" % (letter, letter, count + 1)
+
+
+def _iter_num_ref(formula: str, values: Sequence) -> Iterator[str]:
+    yield ('<c:numRef><c:f>%s</c:f><c:numCache><c:formatCode>General</c:formatCode><c:ptCount val="%d"/>'
+           % (formula, len(values)))
+    index = 0
+    for chunk in _iter_chunks(values):
+        # Пропуски (None, NaN) - пустые точки
+        yield "".join(_PT % (i, value) for i, value in enumerate(chunk, index)
+                      if value is not None and value == value and not math.isinf(value))
+        index += len(chunk)
+    yield '</c:numCache></c:numRef>'
+
+
+def _iter_str_ref(formula: str, values: Sequence) -> Iterator[str]:
+    yield '<c:strRef><c:f>%s</c:f><c:strCache><c:ptCount val="%d"/>' % (formula, len(values))
+    index = 0
+    for chunk in _iter_chunks(values):
+        yield "".join(_STR_PT % (i, escape(str(value))) for i, value in enumerate(chunk, index) if value is not None)
+        index += len(chunk)
+    yield '</c:strCache></c:strRef>'
+
+
+def _is_numeric(values: Sequence) -> bool:
+    if np is not None and isinstance(values, np.ndarray):
+        return values.dtype.kind in "iuf"
+    return all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in values[:CHUNK_POINTS])
+
+
+def iter_chart_xml(spec: ChartSpec, workbook_rid: Optional[str] = None) -> Iterator[str]:
+    """XML части диаграммы порциями строк (ни одна порция не больше CHUNK_POINTS точек)"""
+    chart_type = spec.chart_type
+    yield _HEADER
+    yield '<c:chart>'
+    if spec.title:
+        yield ('<c:title><c:tx><c:rich><a:bodyPr/><a:lstStyle/><a:p><a:r><a:rPr lang="ru-RU" b="1"/>'
+               '<a:t>%s</a:t></a:r></a:p></c:rich></c:tx><c:overlay val="0"/></c:title>'
+               '<c:autoTitleDeleted val="0"/>' % escape(spec.title))
+    else:
+        yield '<c:autoTitleDeleted val="1"/>'
+    yield '<c:plotArea><c:layout/>'
+    yield {
+        "bar": '<c:barChart><c:barDir val="col"/><c:grouping val="clustered"/><c:varyColors val="0"/>',
+        "line": '<c:lineChart><c:grouping val="standard"/><c:varyColors val="0"/>',
+        "pie": '<c:pieChart><c:varyColors val="1"/>',
+        "scatter": '<c:scatterChart><c:scatterStyle val="lineMarker"/><c:varyColors val="0"/>',
+    }[chart_type]
+
+    numeric_categories = spec.categories is not None and _is_numeric(spec.categories)
+    for index, series in enumerate(spec.series):
+        # Столбцы книги: категории в A, ряды - B, C, ...; у точечной - пары (x, y)
+        value_column = 2 * index + 1 if chart_type == "scatter" else index + 1
+        yield ('<c:ser><c:idx val="%d"/><c:order val="%d"/><c:tx><c:strRef><c:f>Sheet1!$%s$1</c:f>'
+               '<c:strCache><c:ptCount val="1"/><c:pt idx="0"><c:v>%s</c:v></c:pt></c:strCache></c:strRef></c:tx>'
+               % (index, index, _column_letter(value_column), escape(series.name)))
+        if chart_type == "scatter":
+            yield '<c:spPr><a:ln w="47625"><a:noFill/></a:ln></c:spPr><c:xVal>'
+            yield from _iter_num_ref(_range(value_column - 1, len(series.x_values)), series.x_values)
+            yield '</c:xVal><c:yVal>'
+            yield from _iter_num_ref(_range(value_column, len(series.values)), series.values)
+            yield '</c:yVal><c:smooth val="0"/></c:ser>'
+            continue
+        if chart_type == "line":
+            yield '<c:marker><c:symbol val="none"/></c:marker>'
+        elif chart_type == "bar":
+            yield '<c:invertIfNegative val="0"/>'
+        yield '<c:cat>'
+        categories = spec.categories
+        if numeric_categories:
+            yield from _iter_num_ref(_range(0, len(categories)), categories)
+        else:
+            yield from _iter_str_ref(_range(0, len(categories)), categories)
+        yield '</c:cat><c:val>'
+        yield from _iter_num_ref(_range(value_column, len(series.values)), series.values)
+        yield '</c:val>%s</c:ser>' % ('<c:smooth val="0"/>' if chart_type == "line" else '')
+
+    category_axis, value_axis = _AXIS_IDS
+    if chart_type == "bar":
+        yield '<c:gapWidth val="150"/><c:axId val="%d"/><c:axId val="%d"/></c:barChart>' % _AXIS_IDS
+    elif chart_type == "line":
+        yield '<c:marker val="1"/><c:axId val="%d"/><c:axId val="%d"/></c:lineChart>' % _AXIS_IDS
+    elif chart_type == "pie":
+        yield '<c:firstSliceAng val="0"/></c:pieChart>'
+    else:
+        yield '<c:axId val="%d"/><c:axId val="%d"/></c:scatterChart>' % _AXIS_IDS
+
+    if chart_type in ("bar", "line"):
+        yield _CAT_AXIS % (category_axis, value_axis)
+        yield _VAL_AXIS % (value_axis, "l", "<c:majorGridlines/>", category_axis, "between")
+    elif chart_type == "scatter":
+        yield _VAL_AXIS % (category_axis, "b", "", value_axis, "midCat")
+        yield _VAL_AXIS % (value_axis, "l", "<c:majorGridlines/>", category_axis, "midCat")
+    yield '</c:plotArea>'
+
+    if spec.show_legend:
+        yield '<c:legend><c:legendPos val="%s"/><c:overlay val="0"/></c:legend>' % ("r" if chart_type == "pie" else "b")
+    yield '<c:plotVisOnly val="1"/><c:dispBlanksAs val="gap"/></c:chart>'
+    yield _TEXT_PROPERTIES % (spec.font_size * 100)
+    if workbook_rid:
+        yield '<c:externalData r:id="%s"><c:autoUpdate val="0"/></c:externalData>' % workbook_rid
+    yield '</c:chartSpace>'
+
+
+def chart_xml_bytes(spec: ChartSpec, workbook_rid: Optional[str] = None) -> bytes:
+    """XML части диаграммы одним объектом bytes: порции кодируются сразу в буфер"""
+    buffer = io.BytesIO()
+    for chunk in iter_chart_xml(spec, workbook_rid):
+        buffer.write(chunk.encode("utf-8"))
+    return buffer.getvalue()
+
+
+def _cell_xml(value) -> str:
+    """Ячейка листа без адреса (позиция - по порядку в строке); пропуск - пустая ячейка"""
+    if value is None:
+        return "<c/>"
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return "<c><v>%r</v></c>" % value if value == value and not math.isinf(value) else "<c/>"
+    return '<c t="inlineStr"><is><t>%s</t></is></c>' % escape(str(value))
+
+
+def workbook_blob(spec: ChartSpec) -> bytes:
+    """Книга Excel с данными диаграммы; лист пишется порциями строк прямо в zip-поток"""
+    if spec.chart_type == "scatter":
+        columns = []
+        header = []
+        for series in spec.series:
+            columns.extend([series.x_values, series.values])
+            header.extend(["X", series.name])
+    else:
+        columns = [spec.categories] + [series.values for series in spec.series]
+        header = [None] + [series.name for series in spec.series]
+
+    stream = io.BytesIO()
+    with zipfile.ZipFile(stream, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, xml in _WORKBOOK_PARTS:
+            archive.writestr(name, _XML_DECLARATION + xml)
+        with archive.open("xl/worksheets/sheet1.xml", "w") as sheet:
+            sheet.write(('%s<worksheet xmlns="%s"><sheetData><row>%s</row>'
+                         % (_XML_DECLARATION, _SPREADSHEET_NS, "".join(map(_cell_xml, header)))).encode("utf-8"))
+            # Порции столбцов выровнены по CHUNK_POINTS: i-я порция каждого - одни и те же строки
+            for chunks in zip_longest(*map(_iter_chunks, columns), fillvalue=()):
+                sheet.write("".join("<row>%s</row>" % "".join(map(_cell_xml, row))
+                                    for row in zip_longest(*chunks)).encode("utf-8"))
+            sheet.write(b"</sheetData></worksheet>")
+    return stream.getvalue()
+
+
+class ChartEngine:
+    """Части диаграмм одного пакета: создание и кэш по SHA1 данных"""
+
+    def __init__(self, prs):
+        self.prs = prs
+        self._parts: Dict[str, Part] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def chart_part(self, spec: ChartSpec) -> Part:
+        """Часть пакета с диаграммой; для одинаковых данных - одна и та же"""
+        key = spec.digest()
+        part = self._parts.get(key)
+        if part is not None:
+            self.hits += 1
+            return part
+
+        self.misses += 1
+        package = self.prs.part.package
+        # Обычная Part, а не XmlPart: XML диаграммы не разбирается в дерево lxml
+        part = Part(package.next_partname(ChartPart.partname_template), CT.DML_CHART, package)
+        workbook_rid = part.relate_to(EmbeddedXlsxPart.new(workbook_blob(spec), package), RT.PACKAGE)
+        part.blob = chart_xml_bytes(spec, workbook_rid)
+        self._parts[key] = part
+        return part
+
+    def add_chart(self, slide, spec: ChartSpec, x: float, y: float, width: float, height: float):
+        """Добавляет диаграмму на слайд python-pptx и возвращает ее graphicFrame-фигуру"""
+        shapes = slide.shapes
+        r_id = slide.part.relate_to(self.chart_part(spec), RT.CHART)
+        graphic_frame = shapes._add_chart_graphicFrame(r_id, x, y, width, height)
+        return shapes._shape_factory(graphic_frame)
+
+    @property
+    def cache_info(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "parts": len(self._parts)}
+
+    def clear(self):
+        self._parts.clear()
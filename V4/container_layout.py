@@ -0,0 +1,235 @@
+# container_layout.py - РАСКЛАДКА ДОЧЕРНИХ ЭЛЕМЕНТОВ КОНТЕЙНЕРА
+"""
+Стратегии GRID / VERTICAL_STACK / HORIZONTAL_STACK: прямоугольники всех
+детей считаются одним проходом по массивам размеров. С NumPy проход
+векторный, без него - тот же расчет на списках. Вся арифметика целочисленная
+(EMU), поэтому обе ветки дают одинаковый результат.
+
+Если у детей заданы SizeConstraints (min/max, aspect_ratio, grow_priority),
+размеры по главной оси распределяет flex_sizes, как flexbox.
+"""
+
+from itertools import accumulate
+from operator import itemgetter
+from typing import List, Optional, Sequence, Tuple
+import math
+
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен
+    np = None
+
+Rect = Tuple[int, int, int, int]
+
+# Для маленьких контейнеров накладные расходы NumPy больше выигрыша
+NUMPY_MIN_CHILDREN = 32
+
+
+def _use_numpy(count: int, vectorized: Optional[bool]) -> bool:
+    if vectorized is None:
+        return np is not None and count >= NUMPY_MIN_CHILDREN
+    return vectorized and np is not None
+
+
+def is_constrained(constraints) -> bool:
+    """Отличаются ли SizeConstraints от значений по умолчанию"""
+    return bool(
+        constraints.min_width or constraints.max_width or constraints.min_height
+        or constraints.max_height or constraints.aspect_ratio or constraints.grow_priority != 1
+    )
+
+
+def flex_sizes(available: float, bases: Sequence[float], grows: Sequence[float],
+               mins: Optional[Sequence[Optional[float]]] = None,
+               maxs: Optional[Sequence[Optional[float]]] = None) -> List[int]:
+    """Размеры по главной оси, как flex-grow / flex-shrink
+
+    Размер ребенка - clamp(base + grow * t, min, max), общий для всех t
+    подбирается так, чтобы сумма размеров была равна available. Дети с
+    grow = 0 сохраняют base. Сумма кусочно-линейна по t, поэтому t находится
+    одним проходом по отсортированным точкам излома (min и max детей).
+    """
+    count = len(bases)
+    mins = mins or [None] * count
+    maxs = maxs or [None] * count
+    limits = []
+    events = []
+    # Сумма размеров = total + slope * t на текущем отрезке t
+    total = 0
+    for base, grow, low, high in zip(bases, grows, mins, maxs):
+        low = low or 0
+        high = math.inf if high is None else max(high, low)
+        limits.append((low, high))
+        if grow <= 0:
+            total += min(max(base, low), high)
+            continue
+        total += low
+        events.append(((low - base) / grow, base - low, grow))
+        if high != math.inf:
+            events.append(((high - base) / grow, high - base, -grow))
+
+    if total >= available:
+        t = -math.inf
+    else:
+        t = math.inf
+        slope = 0
+        for point, delta, slope_delta in sorted(events, key=itemgetter(0)):
+            if slope > 0 and total + slope * point >= available:
+                t = (available - total) / slope
+                break
+            total += delta
+            slope += slope_delta
+        else:
+            if slope > 0:
+                t = (available - total) / slope
+
+    sizes = []
+    for base, grow, (low, high) in zip(bases, grows, limits):
+        if grow <= 0:
+            size = base
+        elif t == math.inf:
+            size = high
+        elif t == -math.inf:
+            size = low
+        else:
+            size = base + grow * t
+        sizes.append(int(min(max(size, low), high)))
+    return sizes
+
+
+def _clamp(value: float, low: Optional[float], high: Optional[float]) -> float:
+    if high:
+        value = min(value, high)
+    if low:
+        value = max(value, low)
+    return value
+
+
+def grid_rects(area: Rect, widths: Sequence[Optional[float]], heights: Sequence[Optional[float]],
+               columns: Optional[int] = None, gap: float = 0,
+               vectorized: Optional[bool] = None, constraints: Optional[Sequence] = None) -> List[Rect]:
+    """Сетка: ячейки равного размера по строкам слева направо
+
+    Размер ребенка - заданный, но не больше ячейки; без размера - вся ячейка.
+    С constraints размер еще ограничивается min/max и вписывается в ячейку
+    с сохранением aspect_ratio. columns по умолчанию - ceil(sqrt(n)).
+    """
+    count = len(widths)
+    if not count:
+        return []
+    x0, y0, area_w, area_h = (int(v) for v in area)
+    gap = int(gap)
+    columns = max(1, min(int(columns or math.ceil(math.sqrt(count))), count))
+    rows = -(-count // columns)
+    cell_w = max(0, (area_w - gap * (columns - 1)) // columns)
+    cell_h = max(0, (area_h - gap * (rows - 1)) // rows)
+
+    if constraints is not None:
+        rects = []
+        for i, (w, h, limits) in enumerate(zip(widths, heights, constraints)):
+            w = _clamp(int(w or 0) or cell_w, limits.min_width, limits.max_width)
+            h = _clamp(int(h or 0) or cell_h, limits.min_height, limits.max_height)
+            w, h = min(w, cell_w), min(h, cell_h)
+            if limits.aspect_ratio:
+                w, h = min(w, h * limits.aspect_ratio), min(h, w / limits.aspect_ratio)
+            rects.append((x0 + (i % columns) * (cell_w + gap), y0 + (i // columns) * (cell_h + gap), int(w), int(h)))
+        return rects
+
+    if _use_numpy(count, vectorized):
+        index = np.arange(count, dtype=np.int64)
+        xs = x0 + (index % columns) * (cell_w + gap)
+        ys = y0 + (index // columns) * (cell_h + gap)
+        ws = np.minimum(_sizes_array(widths, cell_w), cell_w)
+        hs = np.minimum(_sizes_array(heights, cell_h), cell_h)
+        return list(zip(xs.tolist(), ys.tolist(), ws.tolist(), hs.tolist()))
+
+    return [
+        (x0 + (i % columns) * (cell_w + gap), y0 + (i // columns) * (cell_h + gap),
+         min(int(w or 0) or cell_w, cell_w), min(int(h or 0) or cell_h, cell_h))
+        for i, (w, h) in enumerate(zip(widths, heights))
+    ]
+
+
+def stack_rects(area: Rect, main_sizes: Sequence[Optional[float]], cross_sizes: Sequence[Optional[float]],
+                vertical: bool = True, gap: float = 0,
+                vectorized: Optional[bool] = None, constraints: Optional[Sequence] = None) -> List[Rect]:
+    """Стопка: дети друг за другом по главной оси (вниз или вправо)
+
+    Заданный размер по главной оси сохраняется, остаток места делится
+    поровну между детьми без размера (с constraints - по grow_priority
+    через flex_sizes). По поперечной оси - заданный размер, но не больше области.
+    """
+    count = len(main_sizes)
+    if not count:
+        return []
+    x0, y0, area_w, area_h = (int(v) for v in area)
+    gap = int(gap)
+    main_start, main_total = (y0, area_h) if vertical else (x0, area_w)
+    cross_start, cross_total = (x0, area_w) if vertical else (y0, area_h)
+
+    if constraints is not None:
+        main, cross = _solve_stack(main_total - gap * (count - 1), cross_total,
+                                   main_sizes, cross_sizes, vertical, constraints)
+        starts = [main_start + offset - size - gap
+                  for size, offset in zip(main, accumulate(size + gap for size in main))]
+    elif _use_numpy(count, vectorized):
+        main = _sizes_array(main_sizes, 0)
+        flexible = main == 0
+        n_flexible = int(flexible.sum())
+        if n_flexible:
+            share = max(0, (main_total - gap * (count - 1) - int(main.sum())) // n_flexible)
+            main = np.where(flexible, share, main)
+        steps = main + gap
+        starts = (main_start + np.cumsum(steps) - steps).tolist()
+        main = main.tolist()
+        cross = np.minimum(_sizes_array(cross_sizes, cross_total), cross_total).tolist()
+    else:
+        main = [int(size or 0) for size in main_sizes]
+        n_flexible = main.count(0)
+        if n_flexible:
+            share = max(0, (main_total - gap * (count - 1) - sum(main)) // n_flexible)
+            main = [size or share for size in main]
+        starts = [main_start + offset - size - gap
+                  for size, offset in zip(main, accumulate(size + gap for size in main))]
+        cross = [min(int(size or 0) or cross_total, cross_total) for size in cross_sizes]
+
+    if vertical:
+        return list(zip([cross_start] * count, starts, cross, main))
+    return list(zip(starts, [cross_start] * count, main, cross))
+
+
+def _solve_stack(available: int, cross_total: int, main_sizes, cross_sizes,
+                 vertical: bool, constraints) -> Tuple[List[int], List[int]]:
+    """Размеры детей стопки с учетом SizeConstraints"""
+    if vertical:
+        main_limits, cross_limits = ("min_height", "max_height"), ("min_width", "max_width")
+    else:
+        main_limits, cross_limits = ("min_width", "max_width"), ("min_height", "max_height")
+
+    bases, grows, mins, maxs, cross = [], [], [], [], []
+    for main_size, cross_size, limits in zip(main_sizes, cross_sizes, constraints):
+        cross_size = min(_clamp(int(cross_size or 0) or cross_total, *(getattr(limits, name) for name in cross_limits)),
+                         cross_total)
+        ratio = limits.aspect_ratio
+        if not main_size and ratio:
+            # Размер по главной оси следует из поперечного
+            main_size = cross_size / ratio if vertical else cross_size * ratio
+        cross.append(cross_size)
+        bases.append(int(main_size or 0))
+        grows.append(0 if main_size else limits.grow_priority)
+        mins.append(getattr(limits, main_limits[0]))
+        maxs.append(getattr(limits, main_limits[1]))
+
+    main = flex_sizes(available, bases, grows, mins, maxs)
+    for i, limits in enumerate(constraints):
+        ratio = limits.aspect_ratio
+        if ratio and main[i] != bases[i]:
+            # Главный размер уперся в min/max - поперечный пересчитывается по пропорции
+            cross[i] = int(min(main[i] * ratio if vertical else main[i] / ratio, cross_total))
+    return main, [int(size) for size in cross]
+
+
+def _sizes_array(sizes: Sequence[Optional[float]], default: int):
+    """Размеры детей массивом int64; None и 0 заменяются на default"""
+    array = np.array([size or 0 for size in sizes], dtype=np.float64).astype(np.int64)
+    return np.where(array > 0, array, default)
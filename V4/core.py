@@ -4,12 +4,11 @@ from .old_functions import (
     SizeConstraints, LayoutStrategy, ColorThemes, Inches, Pt, RGBColor,
     PP_ALIGN, MSO_SHAPE
 )
-from .layout_engine import SmartLayoutEngine
+from .layout_engine import SmartLayoutEngine, SlideLayoutState
 from .text_module import AdvancedTextModule
 from .graphics_module import GraphicsBuilder
 from .media_module import MediaManager
-from .styles_module import StyleSystem
-from pptx import Presentation
+from .styles_module import StyleSystem, StyleCompiler
 from pptx.enum.text import PP_ALIGN as PPTX_PP_ALIGN
 from pptx.enum.shapes import MSO_SHAPE as PPTX_MSO_SHAPE
 from typing import List, Dict, Optional, Tuple, Union
@@ -17,9 +16,17 @@ from typing import List, Dict, Optional, Tuple, Union
 class PresentationGenerator:
     def __init__(self, theme: str = "dark_pro", 
                  slide_width: float = Inches(13.333), 
-                 slide_height: float = Inches(7.5)):
+                 slide_height: float = Inches(7.5),
+                 render_backend: str = "pptx",
+                 template: Optional[str] = None):
+        # Модули рендера и пакета загружаются при создании генератора, а не при импорте core
+        from .render_backend import XmlRenderBackend, RENDER_BACKENDS
+        from .template_cache import new_presentation
         
-        self.prs = Presentation()
+        if render_backend not in RENDER_BACKENDS:
+            raise ValueError(f"Неизвестный backend рендера: {render_backend} (доступны: {', '.join(RENDER_BACKENDS)})")
+        
+        self.prs = new_presentation(template)
         self.prs.slide_width = slide_width
         self.prs.slide_height = slide_height
         
@@ -28,20 +35,53 @@ class PresentationGenerator:
         self.layout_engine = SmartLayoutEngine(slide_width, slide_height)
         self.text_module = AdvancedTextModule()
         self.graphics_builder = GraphicsBuilder()
-        self.media_manager = MediaManager()
+        self._media_manager = None
+        self._chart_engine = None
         self.style_system = StyleSystem(self.theme)
+        self.style_compiler = StyleCompiler()
+        self.render_backend = render_backend
+        self.xml_backend = XmlRenderBackend(self) if render_backend == "xml" else None
         
         self.slides = []
         self.current_slide = None
         self.elements_registry = {}
+        self.stream_writer = None
+        self.profiler = None
+        # Быстрая проверка перед save(): только пересечения и выход за слайд, без
+        # разбивки текста (полная - analyze_layout()); результат - в layout_report
+        self.analyze_on_save = True
+        self.layout_report = None
         
         print(f"🚀 Инициализирован генератор презентаций (тема: {theme})")
     
+    @property
+    def media_manager(self) -> MediaManager:
+        """Создается при первом обращении: папка с картинками сканируется, только когда нужна"""
+        if self._media_manager is None:
+            self._media_manager = MediaManager()
+        return self._media_manager
+    
+    @property
+    def chart_engine(self) -> 'ChartEngine':
+        """Части диаграмм этого пакета (одинаковые диаграммы ссылаются на одну часть)"""
+        if self._chart_engine is None:
+            from .chart_module import ChartEngine
+            self._chart_engine = ChartEngine(self.prs)
+        return self._chart_engine
+    
     def create_slide(self, title: str = "") -> 'Slide':
         slide_layout = self.prs.slide_layouts[6]  # Пустой layout
         slide_obj = Slide(self, slide_layout, title)
+        if self.profiler:
+            self.profiler.attach_slide(slide_obj)
+        
+        # Состояние компоновки отрендеренного предыдущего слайда больше не нужно
+        previous = self.current_slide
+        if previous is not None and previous._rendered is not None:
+            previous.release_layout_state()
         self.slides.append(slide_obj)
         self.current_slide = slide_obj
+        self.layout_engine.state = slide_obj.layout_state
         
         # Создаем фон и заголовок
         slide_obj._create_background()
@@ -87,6 +127,50 @@ class PresentationGenerator:
             
         return self.current_slide.add_element(element)
     
+    def add_table(self, data, headers: List[str] = None, x: float = None, y: float = None,
+                  width: float = None, height: float = None, paginate: bool = True,
+                  **kwargs) -> List[ContentElement]:
+        """Добавляет таблицу; строки, не поместившиеся по высоте, переносятся на новые слайды
+        
+        Слайды продолжения получают заголовок текущего с пометкой "(продолжение)",
+        таблица на них - ту же шапку, место и ширины столбцов. По умолчанию
+        таблица занимает слайд под заголовком.
+        """
+        if not self.current_slide:
+            raise ValueError("Сначала создайте слайд с create_slide()")
+        
+        slide = self.current_slide
+        x = Inches(0.5) if x is None else x
+        y = (Inches(1.3) if slide.title else Inches(0.5)) if y is None else y
+        width = self.prs.slide_width - x - Inches(0.5) if width is None else width
+        height = self.prs.slide_height - y - Inches(0.5) if height is None else height
+        
+        element = self.text_module.create_table(
+            data, headers, x=x, y=y, width=width, height=height, **kwargs
+        )
+        parts = self.text_module.paginate_table(element, width, height) if paginate else [element]
+        
+        added = []
+        for index, part in enumerate(parts):
+            if index:
+                self.create_slide(f"{slide.title} (продолжение)" if slide.title else "")
+            added.append(self.current_slide.add_element(part))
+        return added
+    
+    def add_chart(self, chart_type: str, data: Dict, x: float, y: float,
+                  width: float, height: float, **kwargs) -> ContentElement:
+        """Добавляет нативную диаграмму (bar, line, pie, scatter)
+        
+        max_points=N, downsample="lttb"|"minmax" - прореживание длинных рядов до N точек.
+        """
+        if not self.current_slide:
+            raise ValueError("Сначала создайте слайд с create_slide()")
+        
+        element = self.graphics_builder.create_chart(
+            chart_type=chart_type, data=data, x=x, y=y, width=width, height=height, **kwargs
+        )
+        return self.current_slide.add_element(element)
+    
     def add_image(self, image_path: str, x: float, y: float, 
                   width: float, height: float, **kwargs):
         """Добавляет изображение по полному пути"""
@@ -109,8 +193,92 @@ class PresentationGenerator:
         )
         return self.current_slide.add_element(element)
     
-    def save(self, filename: str) -> str:
-        self.prs.save(filename)
+    def render_parallel(self, max_workers: Optional[int] = None) -> 'PresentationGenerator':
+        """Рендерит все слайды в пуле процессов (вместо slide.render() для каждого)"""
+        from .parallel_render import render_slides_parallel
+        render_slides_parallel(self, self.slides, max_workers)
+        return self
+    
+    def open_stream(self, target, deterministic: bool = False) -> 'StreamingPackageWriter':
+        """Включает потоковое сохранение: каждый слайд пишется в target сразу после render()"""
+        from .package_writer import StreamingPackageWriter
+        self.stream_writer = StreamingPackageWriter(self.prs, target, deterministic)
+        if self.profiler:
+            self.profiler.attach(self)
+        return self.stream_writer
+    
+    def _stream_slide(self, slide_obj: 'Slide'):
+        if self.stream_writer:
+            self.stream_writer.write_slide(slide_obj.slide)
+            # Фигуры слайда уже в архиве и убраны из дерева - ссылки на них
+            # не нужны, компоновать на нем больше нечего
+            slide_obj._streamed = True
+            slide_obj._rendered = None
+            slide_obj.release_layout_state()
+    
+    def enable_profiling(self, trace: bool = True, print_on_save: bool = True) -> 'RenderProfiler':
+        """Включает замеры фаз рендера; таблица печатается после save()"""
+        from .profiler_module import RenderProfiler
+        if self.profiler is None:
+            self.profiler = RenderProfiler(trace=trace, print_on_save=print_on_save)
+        self.profiler.attach(self)
+        return self.profiler
+    
+    def disable_profiling(self) -> Optional['RenderProfiler']:
+        """Снимает замеры; собранные данные остаются в возвращаемом профайлере"""
+        profiler = self.profiler
+        if profiler:
+            profiler.detach(self)
+            self.profiler = None
+        return profiler
+    
+    def rerender(self) -> Dict[str, int]:
+        """Перерисовывает только измененные слайды; возвращает счетчики элементов"""
+        totals = {"patched": 0, "skipped": 0, "removed": 0, "slides_skipped": 0}
+        for slide in self.slides:
+            if not slide.is_dirty:
+                totals["skipped"] += len(slide.elements)
+                totals["slides_skipped"] += 1
+                continue
+            slide.render()
+            for key, value in slide.render_stats.items():
+                totals[key] += value
+        return totals
+    
+    def fit_fonts(self, uniform_siblings: bool = True) -> Dict[str, float]:
+        """Подбирает кегль всех текстовых элементов колоды одним пакетом (до рендера)"""
+        fitted = self.text_module.fit_all(self, uniform_siblings)
+        stats = self.text_module.fit_stats
+        print(f"🔤 Кегль подобран для {stats['elements']} текстов "
+              f"({stats['elements_per_second']:.0f} элементов/с)")
+        return fitted
+    
+    def analyze_layout(self, check_text: bool = True) -> 'LayoutReport':
+        """Ищет пересечения элементов и выход за границы слайда по всей колоде
+        
+        check_text=False пропускает проверку переполнения текста (разбивку на строки).
+        """
+        from .layout_analyzer import analyze_deck
+        self.layout_report = analyze_deck(self, check_text)
+        return self.layout_report
+    
+    def save(self, filename: Optional[str] = None, deterministic: bool = False):
+        if self.analyze_on_save:
+            report = self.analyze_layout(check_text=False)
+            if not report.ok:
+                print(report.summary())
+        
+        if self.stream_writer:
+            # Готовые слайды уже в архиве - дописываем остальное
+            self.stream_writer.close()
+            print("✅ Презентация сохранена в поток")
+            return filename
+        
+        if deterministic:
+            from .package_writer import save_package
+            save_package(self.prs, filename)
+        else:
+            self.prs.save(filename)
         print(f"✅ Презентация сохранена: {filename}")
         return filename
 
@@ -120,6 +288,32 @@ class Slide:
         self.slide = generator.prs.slides.add_slide(layout)
         self.title = title
         self.elements = []
+        # Результат последнего рендера: [(элемент, p:sp или None)]
+        self._rendered = None
+        # Границы последнего рендера; None - отпущены вместе с состоянием компоновки
+        self._rendered_bounds = None
+        self.render_stats = {"patched": 0, "skipped": 0, "removed": 0}
+        self._layout_state = None
+        # Слайд уже записан в поток (open_stream) - перерисовать его нельзя
+        self._streamed = False
+    
+    @property
+    def layout_state(self) -> SlideLayoutState:
+        """Занятые области и кэш раскладок этого слайда (берется из пула движка)"""
+        if self._layout_state is None:
+            self._layout_state = self.generator.layout_engine.acquire_state()
+        return self._layout_state
+    
+    def release_layout_state(self):
+        """Возвращает состояние компоновки в пул; при следующем рендере слайд получит чистое
+        
+        Границы последнего рендера тоже отпускаются: повторный рендер сравнит
+        новые границы с xfrm нарисованных фигур.
+        """
+        if self._layout_state is not None:
+            self.generator.layout_engine.release_state(self._layout_state)
+            self._layout_state = None
+        self._rendered_bounds = None
     
     def _create_background(self):
         """Создает фон слайда"""
@@ -168,51 +362,205 @@ class Slide:
         self.generator.elements_registry[element.id] = element
         return element
     
-    def render(self):
+    def iter_elements(self):
+        """Все элементы слайда вместе с вложенными, в порядке отрисовки"""
         for element in self.elements:
-            self._render_element(element)
+            yield from element.iter_subtree()
+    
+    @property
+    def shape_map(self) -> Dict[str, object]:
+        """id элемента -> отрендеренный p:sp (p:pic) в дереве слайда"""
+        if not self._rendered:
+            return {}
+        return {element.id: sp for element, sp in self._rendered if sp is not None}
+    
+    @property
+    def is_dirty(self) -> bool:
+        """Нужен ли слайду (пере)рендер"""
+        if self._streamed:
+            return any(element.is_dirty for element in self.iter_elements())
+        if self._rendered is None:
+            return True
+        elements = list(self.iter_elements())
+        if len(self._rendered) != len(elements):
+            return True
+        return any(
+            element is not rendered or element.is_dirty
+            for element, (rendered, _) in zip(elements, self._rendered)
+        )
+    
+    def title_area(self) -> Optional[Tuple]:
+        """Область заголовка слайда (None, если заголовка нет)"""
+        if not self.title:
+            return None
+        return (Inches(0.5), Inches(0.3), self.generator.prs.slide_width - Inches(1), Inches(0.8))
+    
+    def auto_place(self, alignment: str = "top_left") -> Dict[str, Tuple]:
+        """Размещает все элементы слайда без координат за один проход"""
+        occupied = [self.title_area()] if self.title else []
+        return self.generator.layout_engine.auto_place_elements(
+            self.elements, alignment=alignment, occupied=occupied
+        )
+    
+    def render(self):
+        """Первый вызов рендерит все элементы, повторный - только измененные"""
+        generator = self.generator
+        if self._streamed:
+            if not self.is_dirty:
+                return self
+            raise RuntimeError(
+                f"Слайд '{self.title}' уже записан в поток (open_stream) - "
+                "изменения после рендера в файл не попадут"
+            )
+        if any(element.x is None and element.y is None for element in self.elements):
+            self.auto_place()
+        
+        layout_engine = generator.layout_engine
+        with layout_engine.use_state(self.layout_state):
+            # Элементы вместе с вложенными и их границы - обход стеком, без рекурсии
+            tree = list(layout_engine.iter_tree(self.elements))
+            if self._rendered is not None:
+                self._rerender(tree)
+            else:
+                if generator.xml_backend:
+                    rendered = generator.xml_backend.render_slide(self, tree)
+                else:
+                    rendered = []
+                    for element, bounds in tree:
+                        shape = self._render_element(element, bounds)
+                        rendered.append((element, shape._element if shape is not None else None))
+                self._remember_render(rendered, tree)
+                generator._stream_slide(self)
+        
+        if self is not generator.current_slide:
+            self.release_layout_state()
         return self
     
-    def _render_element(self, element: ContentElement):
-        bounds = self.generator.layout_engine.calculate_bounds(element)
+    def _remember_render(self, rendered: List[Tuple[ContentElement, Optional[object]]],
+                         tree: List[Tuple[ContentElement, Optional[Tuple]]]):
+        for element, _ in rendered:
+            element.mark_clean()
+        self._rendered = rendered
+        # Границы на момент рендера: ребенок перерисовывается и тогда, когда сдвинулся родитель
+        self._rendered_bounds = {id(element): bounds for element, bounds in tree}
+    
+    def _rerender(self, tree: List[Tuple[ContentElement, Optional[Tuple]]]):
+        """Заменяет XML только у измененных (или сдвинутых) элементов, остальные фигуры не трогает"""
+        stats = self.render_stats = {"patched": 0, "skipped": 0, "removed": 0}
+        previous = {id(element): sp for element, sp in self._rendered}
+        rendered_bounds = self._rendered_bounds
+        rendered = []
+        
+        for element, bounds in tree:
+            known = id(element) in previous
+            old_sp = previous.pop(id(element), None)
+            if rendered_bounds is not None:
+                in_place = rendered_bounds.get(id(element)) == bounds
+            else:
+                in_place = self._shape_bounds(old_sp) == (tuple(map(int, bounds)) if bounds else None)
+            if known and not element.is_dirty and in_place:
+                stats["skipped"] += 1
+                rendered.append((element, old_sp))
+                continue
+            
+            rendered.append((element, self._patch_element(element, old_sp, bounds)))
+            stats["patched"] += 1
+        
+        # Элементы, удаленные из слайда после прошлого рендера
+        for old_sp in previous.values():
+            if old_sp is not None:
+                self._remove_shape_element(old_sp)
+                stats["removed"] += 1
+        
+        self._remember_render(rendered, tree)
+        return self
+    
+    @staticmethod
+    def _shape_bounds(sp) -> Optional[Tuple[int, int, int, int]]:
+        """Границы нарисованной фигуры по ее xfrm (None - фигуры нет)"""
+        if sp is None:
+            return None
+        xfrm = sp.xpath("./p:spPr/a:xfrm | ./p:xfrm | ./p:grpSpPr/a:xfrm")
+        if not xfrm:
+            return None
+        off, ext = xfrm[0].xpath("./a:off")[0], xfrm[0].xpath("./a:ext")[0]
+        return (int(off.get("x")), int(off.get("y")), int(ext.get("cx")), int(ext.get("cy")))
+    
+    def _patch_element(self, element: ContentElement, old_sp, bounds: Optional[Tuple] = None):
+        """Строит фигуру элемента заново и ставит ее на место старой (с тем же id)"""
+        if bounds is None:
+            bounds = self.generator.layout_engine.calculate_bounds(element)
         if not bounds:
-            return
+            if old_sp is not None:
+                self._remove_shape_element(old_sp)
+            return None
+        
+        x, y, width, height = bounds
+        sp_tree = self.slide.shapes._spTree
+        old_id = old_sp.xpath("./*[1]/p:cNvPr")[0].id if old_sp is not None else None
+        
+        if element.type in (ContentType.IMAGE, ContentType.CHART):
+            render = self._render_image_element if element.type == ContentType.IMAGE else self._render_chart_element
+            shape = render(element, x, y, width, height)
+            new_sp = shape._element if shape is not None else None
+            if new_sp is not None and old_id is not None:
+                new_sp.xpath("./*[1]/p:cNvPr")[0].id = old_id
+        else:
+            from .render_backend import XmlRenderBackend
+            backend = self.generator.xml_backend or XmlRenderBackend(self.generator)
+            new_sp = backend.build_element(
+                element, old_id or sp_tree.max_shape_id + 1, x, y, width, height
+            )
+            if new_sp is not None and old_sp is None:
+                XmlRenderBackend._insert(sp_tree, new_sp)
+        
+        if old_sp is not None:
+            if new_sp is not None:
+                old_sp.addprevious(new_sp)
+            self._remove_shape_element(old_sp)
+        return new_sp
+    
+    def _remove_shape_element(self, sp):
+        """Удаляет фигуру; у картинки освобождает связь с медиа-частью"""
+        sp.getparent().remove(sp)
+        for r_id in sp.xpath(".//a:blip/@r:embed | .//c:chart/@r:id"):
+            self.slide.part.drop_rel(r_id)
+    
+    def _render_element(self, element: ContentElement, bounds: Optional[Tuple] = None):
+        if bounds is None:
+            bounds = self.generator.layout_engine.calculate_bounds(element)
+        if not bounds:
+            return None
             
         x, y, width, height = bounds
+        shape = None
         
         if element.type == ContentType.TEXT:
-            self._render_text_element(element, x, y, width, height)
+            shape = self._render_text_element(element, x, y, width, height)
         elif element.type == ContentType.SHAPE:
-            self._render_shape_element(element, x, y, width, height)
+            shape = self._render_shape_element(element, x, y, width, height)
         elif element.type == ContentType.CONTAINER:
-            self._render_container_element(element, x, y, width, height)
+            shape = self._render_container_element(element, x, y, width, height)
         elif element.type == ContentType.IMAGE:
-            self._render_image_element(element, x, y, width, height)
+            shape = self._render_image_element(element, x, y, width, height)
+        elif element.type == ContentType.TABLE:
+            shape = self._render_table_element(element, x, y, width, height)
+        elif element.type == ContentType.CHART:
+            shape = self._render_chart_element(element, x, y, width, height)
         
         self.generator.layout_engine.reserve_area(x, y, width, height)
+        return shape
     
     def _render_text_element(self, element: ContentElement, x: float, y: float, 
                            width: float, height: float):
         shape = self.slide.shapes.add_shape(PPTX_MSO_SHAPE.RECTANGLE, x, y, width, height)
         self._apply_element_styles(shape, element)
         
-        text_frame = shape.text_frame
-        text_frame.clear()
-        
         font_size = self.generator.text_module.calculate_font_size(element, width, height)
-        
         text_style = element.style.text_style or TextStyle()
-        text_frame.vertical_anchor = text_style.vertical_align
-        p = text_frame.paragraphs[0]
-        p.alignment = text_style.align
-        
-        run = p.add_run()
-        run.text = element.content if isinstance(element.content, str) else str(element.content)
-        run.font.size = Pt(font_size)
-        run.font.bold = text_style.bold
-        run.font.italic = text_style.italic
-        if text_style.font_color:
-            run.font.color.rgb = text_style.font_color
+        text = element.content if isinstance(element.content, str) else str(element.content)
+        self.generator.style_compiler.apply_text(shape, text_style, text, font_size)
+        return shape
     
     def _render_shape_element(self, element: ContentElement, x: float, y: float,
                             width: float, height: float):
@@ -221,58 +569,52 @@ class Slide:
         )
         shape = self.slide.shapes.add_shape(shape_type, x, y, width, height)
         self._apply_element_styles(shape, element)
+        return shape
     
     def _render_container_element(self, element: ContentElement, x: float, y: float,
                                 width: float, height: float):
         shape = self.slide.shapes.add_shape(PPTX_MSO_SHAPE.RECTANGLE, x, y, width, height)
         self._apply_element_styles(shape, element)
+        return shape
+    
+    def _render_table_element(self, element: ContentElement, x: float, y: float,
+                            width: float, height: float):
+        """Таблица - XML всех ячеек строкой и один разбор, без прокси-вызовов на ячейку"""
+        from .render_backend import XmlRenderBackend
+        sp_tree = self.slide.shapes._spTree
+        backend = self.generator.xml_backend or XmlRenderBackend(self.generator)
+        frame = backend.build_element(element, sp_tree.max_shape_id + 1, x, y, width, height)
+        XmlRenderBackend._insert(sp_tree, frame)
+        return self.slide.shapes._shape_factory(frame)
+    
+    def _render_chart_element(self, element: ContentElement, x: float, y: float,
+                            width: float, height: float):
+        """Диаграмма - связь с (возможно общей) частью диаграммы и graphicFrame"""
+        return self.generator.chart_engine.add_chart(self.slide, element.content["spec"], x, y, width, height)
     
     def _render_image_element(self, element: ContentElement, x: float, y: float,
                             width: float, height: float):
         """Рендерит изображение"""
+        return self._add_picture(element.content, x, y, width, height, element.content)
+    
+    def _add_picture(self, image_file, x: float, y: float, width: float, height: float,
+                     label: str = ""):
+        """Добавляет картинку из пути или потока, при ошибке - заглушку"""
         try:
-            self.slide.shapes.add_picture(element.content, x, y, width, height)
+            return self.slide.shapes.add_picture(image_file, x, y, width, height)
         except Exception as e:
-            print(f"⚠️  Ошибка загрузки изображения {element.content}: {e}")
+            print(f"⚠️  Ошибка загрузки изображения {label}: {e}")
             # Fallback - placeholder
             placeholder = self.slide.shapes.add_shape(PPTX_MSO_SHAPE.RECTANGLE, x, y, width, height)
             placeholder.fill.solid()
             placeholder.fill.fore_color.rgb = self.generator.theme["secondary"]
+            return placeholder
     
     def _apply_element_styles(self, shape, element: ContentElement):
         """Безопасное применение стилей к элементу"""
         try:
-            # Фон
-            if element.style.background_color:
-                shape.fill.solid()
-                shape.fill.fore_color.rgb = element.style.background_color
-            else:
-                shape.fill.background()
-            
-            # Граница
-            if element.style.border and element.style.border.color:
-                shape.line.color.rgb = element.style.border.color
-                
-                # Безопасное преобразование ширины границы
-                if element.style.border.width:
-                    try:
-                        # Преобразуем точки в EMU (1 point = 12700 EMU)
-                        width_value = element.style.border.width
-                        if hasattr(width_value, 'pt'):  # Если это объект Pt
-                            width_emu = int(width_value.pt * 12700)
-                        else:  # Если это число
-                            width_emu = int(width_value * 12700)
-                        
-                        # Проверяем диапазон (0-20116800 EMU)
-                        width_emu = max(0, min(20116800, width_emu))
-                        shape.line.width = width_emu
-                        
-                    except (ValueError, TypeError) as e:
-                        print(f"⚠️  Ошибка установки ширины границы: {e}")
-                        shape.line.width = 12700  # Значение по умолчанию: 1 точка
-            else:
-                shape.line.fill.background()
-                
+            # Фон и граница - копия XML, скомпилированного для этого сочетания стилей
+            self.generator.style_compiler.apply(shape, element.style)
         except Exception as e:
             print(f"⚠️  Ошибка применения стилей: {e}")
             # Устанавливаем базовые стили в случае ошибки
@@ -0,0 +1,456 @@
+# font_metrics.py - ИЗМЕРЕНИЕ ТЕКСТА ПО МЕТРИКАМ ШРИФТА
+"""
+Ширина строки считается по ширинам глифов (advance width), а не по
+"символам на дюйм". Метрики берутся из TTF/OTF-файла (таблицы head, hhea,
+hmtx, cmap), если шрифт найден в системе или зарегистрирован через
+register_font(), иначе - из встроенных таблиц для Calibri (шрифт темы
+шаблона по умолчанию) и Arial. Во встроенных таблицах латиница - ширины
+шрифта в 1/1000 em, кириллица - по латинским буквам близкой формы,
+полужирное начертание - через общий коэффициент; это приближение.
+
+Ширина строки в единицах шрифта не зависит от кегля, поэтому LRU-кэш хранит
+ее по (шрифт, начертание, строка), а кегль только масштабирует результат.
+Кернинг не учитывается.
+
+fit_many() подбирает кегли сразу для многих текстов: по массивам ширин
+текстов и прямоугольников для всех кеглей-кандидатов считаются верхняя
+граница (нижняя оценка числа строк) и гарантированно подходящий кегль
+(текст в одну строку). Точный перенос по словам нужен только текстам,
+у которых эти границы расходятся.
+"""
+
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import math
+import os
+import struct
+
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен
+    np = None
+
+# Текст, кегль которого подбирается в fit_many: (текст, ширина, высота, мин. кегль, макс. кегль, шрифт, bold)
+FitBox = Tuple[str, float, float, float, float, str, bool]
+
+EMU_PER_POINT = 12700
+
+# Внутренние поля надписи PowerPoint по умолчанию (bodyPr lIns/rIns и tIns/bIns)
+DEFAULT_INSET_X = 91440
+DEFAULT_INSET_Y = 45720
+
+DEFAULT_FONT = "Calibri"
+
+# Где искать файлы шрифтов
+FONT_DIRS = (
+    "/usr/share/fonts", "/usr/local/share/fonts", os.path.expanduser("~/.fonts"),
+    os.path.expanduser("~/.local/share/fonts"), "/Library/Fonts", "/System/Library/Fonts",
+    os.path.join(os.environ.get("WINDIR", "C:\\Windows"), "Fonts"),
+)
+
+# Имя шрифта -> (обычный, полужирный) варианты имени файла; Carlito и Liberation
+# метрически совместимы с Calibri и Arial/Times New Roman
+FONT_FILES = {
+    "Calibri": (("calibri.ttf", "Carlito-Regular.ttf"), ("calibrib.ttf", "Carlito-Bold.ttf")),
+    "Arial": (("arial.ttf", "LiberationSans-Regular.ttf"), ("arialbd.ttf", "LiberationSans-Bold.ttf")),
+    "Times New Roman": (("times.ttf", "LiberationSerif-Regular.ttf"), ("timesbd.ttf", "LiberationSerif-Bold.ttf")),
+}
+
+# Встроенные таблицы: ширины в 1/1000 em для символов строки по порядку
+_LATIN = " !\"#$%&'()*+,-./0123456789:;<=>?@ABCDEFGHIJKLMNOPQRSTUVWXYZ[\\]^_`abcdefghijklmnopqrstuvwxyz{|}~"
+_BUNDLED_WIDTHS = {
+    "Calibri": (
+        226, 326, 401, 498, 507, 715, 682, 221, 303, 303, 498, 498, 250, 306, 252, 386,
+        507, 507, 507, 507, 507, 507, 507, 507, 507, 507, 268, 268, 498, 498, 498, 463,
+        894, 579, 544, 533, 615, 488, 459, 631, 623, 252, 319, 520, 420, 855, 646, 662,
+        517, 673, 543, 459, 487, 642, 567, 890, 519, 487, 468, 307, 386, 307, 498, 498,
+        291, 479, 525, 423, 525, 498, 305, 471, 525, 230, 239, 455, 230, 799, 525, 527,
+        525, 525, 349, 391, 335, 525, 452, 715, 433, 453, 395, 314, 460, 314, 498,
+    ),
+    "Arial": (
+        278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+        556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+        1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+        667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+        333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+        556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+    ),
+}
+
+# Кириллица во встроенных таблицах: ширина буквы = ширина латинской строки справа
+_CYRILLIC_ANALOGS = {
+    "а": "a", "б": "b", "в": "v", "г": "r", "д": "d", "е": "e", "ё": "e", "ж": "w", "з": "s",
+    "и": "u", "й": "u", "к": "k", "л": "n", "м": "w", "н": "n", "о": "o", "п": "n", "р": "p",
+    "с": "c", "т": "c", "у": "y", "ф": "m", "х": "x", "ц": "n", "ч": "h", "ш": "m", "щ": "m",
+    "ъ": "b", "ы": "bl", "ь": "b", "э": "e", "ю": "lo", "я": "a",
+    "А": "A", "Б": "B", "В": "B", "Г": "L", "Д": "D", "Е": "E", "Ё": "E", "Ж": "W", "З": "S",
+    "И": "N", "Й": "N", "К": "K", "Л": "P", "М": "M", "Н": "H", "О": "O", "П": "H", "Р": "P",
+    "С": "C", "Т": "T", "У": "Y", "Ф": "O", "Х": "X", "Ц": "H", "Ч": "P", "Ш": "W", "Щ": "W",
+    "Ъ": "B", "Ы": "BI", "Ь": "B", "Э": "C", "Ю": "IO", "Я": "R",
+}
+
+# Типографские знаки во встроенных таблицах
+_PUNCTUATION_ANALOGS = {
+    "—": "mm", "–": "n", "«": "<", "»": ">", "…": "...", "•": "o", "·": ".", "№": "N.",
+    "“": "\"", "”": "\"", "„": ",,", "‘": "'", "’": "'", "\u00a0": " ", "\t": "    ",
+}
+
+# Полужирное начертание во встроенных таблицах шире примерно на столько
+_BUNDLED_BOLD_FACTOR = 1.06
+
+# Межстрочный интервал во встроенных таблицах (одинарный интервал PowerPoint)
+_BUNDLED_LINE_HEIGHT = 1.22
+
+
+class FontMetrics:
+    """Ширины глифов шрифта в единицах units_per_em"""
+
+    def __init__(self, name: str, units_per_em: int, advances: Dict[int, int],
+                 default_advance: int, line_height: float):
+        self.name = name
+        self.units_per_em = units_per_em
+        self.advances = advances
+        self.default_advance = default_advance
+        # Высота строки в долях кегля
+        self.line_height = line_height
+
+    def units(self, text: str) -> int:
+        """Ширина строки в единицах шрифта"""
+        advances, default = self.advances, self.default_advance
+        return sum(advances.get(ord(char), default) for char in text)
+
+    @classmethod
+    def from_ttf(cls, path: str, name: Optional[str] = None) -> 'FontMetrics':
+        """Метрики из файла TrueType/OpenType (для .ttc - первый шрифт коллекции)"""
+        with open(path, "rb") as f:
+            data = f.read()
+
+        offset = struct.unpack_from(">I", data, 12)[0] if data[:4] == b"ttcf" else 0
+        num_tables = struct.unpack_from(">H", data, offset + 4)[0]
+        tables = {}
+        for i in range(num_tables):
+            tag, _, table_offset, _ = struct.unpack_from(">4sIII", data, offset + 12 + 16 * i)
+            tables[tag] = table_offset
+        missing = [tag.decode() for tag in (b"head", b"hhea", b"hmtx", b"cmap") if tag not in tables]
+        if missing:
+            raise ValueError(f"В шрифте '{path}' нет таблиц: {', '.join(missing)}")
+
+        units_per_em = struct.unpack_from(">H", data, tables[b"head"] + 18)[0]
+        ascender, descender, line_gap = struct.unpack_from(">hhh", data, tables[b"hhea"] + 4)
+        num_metrics = struct.unpack_from(">H", data, tables[b"hhea"] + 34)[0]
+        glyph_advances = [struct.unpack_from(">H", data, tables[b"hmtx"] + 4 * i)[0] for i in range(num_metrics)]
+
+        def advance(glyph: int) -> int:
+            return glyph_advances[min(glyph, num_metrics - 1)]
+
+        advances = {code: advance(glyph) for code, glyph in _read_cmap(data, tables[b"cmap"]) if glyph}
+        default_advance = advances.get(ord("n"), units_per_em // 2)
+        line_height = (ascender - descender + line_gap) / units_per_em
+        return cls(name or os.path.splitext(os.path.basename(path))[0], units_per_em,
+                   advances, default_advance, line_height)
+
+    @classmethod
+    def bundled(cls, name: str, bold: bool = False) -> 'FontMetrics':
+        """Метрики из встроенной таблицы (неизвестный шрифт - как Calibri)"""
+        widths = _BUNDLED_WIDTHS.get(name, _BUNDLED_WIDTHS[DEFAULT_FONT])
+        scale = _BUNDLED_BOLD_FACTOR if bold else 1.0
+        latin = {char: round(width * scale) for char, width in zip(_LATIN, widths)}
+        advances = {ord(char): width for char, width in latin.items()}
+        for analogs in (_CYRILLIC_ANALOGS, _PUNCTUATION_ANALOGS):
+            for char, analog in analogs.items():
+                advances[ord(char)] = sum(latin[c] for c in analog)
+        return cls(name, 1000, advances, latin["n"], _BUNDLED_LINE_HEIGHT)
+
+
+def _read_cmap(data: bytes, cmap_offset: int) -> Iterable[Tuple[int, int]]:
+    """Пары (код символа, номер глифа) из лучшей Unicode-подтаблицы cmap"""
+    num_subtables = struct.unpack_from(">H", data, cmap_offset + 2)[0]
+    best = None
+    best_rank = None
+    for i in range(num_subtables):
+        platform, encoding, offset = struct.unpack_from(">HHI", data, cmap_offset + 4 + 8 * i)
+        subtable = cmap_offset + offset
+        fmt = struct.unpack_from(">H", data, subtable)[0]
+        if fmt not in (4, 12) or not (platform == 0 or (platform == 3 and encoding in (1, 10))):
+            continue
+        rank = (fmt == 12, platform == 3)
+        if best_rank is None or rank > best_rank:
+            best, best_rank = (fmt, subtable), rank
+    if best is None:
+        return []
+
+    fmt, subtable = best
+    if fmt == 12:
+        num_groups = struct.unpack_from(">I", data, subtable + 12)[0]
+        pairs = []
+        for i in range(num_groups):
+            start, end, glyph = struct.unpack_from(">III", data, subtable + 16 + 12 * i)
+            pairs.extend((code, glyph + code - start) for code in range(start, end + 1))
+        return pairs
+
+    seg_count = struct.unpack_from(">H", data, subtable + 6)[0] // 2
+    ends_at = subtable + 14
+    starts_at = ends_at + 2 * seg_count + 2
+    deltas_at = starts_at + 2 * seg_count
+    range_offsets_at = deltas_at + 2 * seg_count
+    pairs = []
+    for seg in range(seg_count):
+        end = struct.unpack_from(">H", data, ends_at + 2 * seg)[0]
+        start = struct.unpack_from(">H", data, starts_at + 2 * seg)[0]
+        delta = struct.unpack_from(">h", data, deltas_at + 2 * seg)[0]
+        range_offset = struct.unpack_from(">H", data, range_offsets_at + 2 * seg)[0]
+        for code in range(start, min(end, 0xFFFE) + 1):
+            if range_offset == 0:
+                glyph = (code + delta) & 0xFFFF
+            else:
+                glyph = struct.unpack_from(">H", data, range_offsets_at + 2 * seg + range_offset + 2 * (code - start))[0]
+                if glyph:
+                    glyph = (glyph + delta) & 0xFFFF
+            pairs.append((code, glyph))
+    return pairs
+
+
+class TextMeasurer:
+    """Ширина текста, перенос по словам и подбор кегля под прямоугольник
+
+    Размеры - в EMU, кегль - в пунктах.
+    """
+
+    def __init__(self, maxsize: int = 65536):
+        self.maxsize = maxsize
+        self.font_files: Dict[Tuple[str, bool], str] = {}
+        self._fonts: Dict[Tuple[str, bool], FontMetrics] = {}
+        self._system_fonts: Optional[Dict[str, str]] = None
+        # Сколько точных переносов понадобилось последнему fit_many()
+        self.exact_checks = 0
+        self._reset_caches()
+
+    def _reset_caches(self):
+        self._units = lru_cache(maxsize=self.maxsize)(self._measure_units)
+
+    def __getstate__(self):
+        # Кэш на lru_cache не сериализуется - воркеры строят свой
+        return {"maxsize": self.maxsize, "font_files": self.font_files}
+
+    def __setstate__(self, state):
+        self.__init__(state["maxsize"])
+        self.font_files.update(state["font_files"])
+
+    # --- шрифты ---
+
+    def register_font(self, name: str, path: str, bold: bool = False):
+        """Метрики шрифта name (начертания bold) брать из файла path"""
+        self.font_files[(name, bold)] = path
+        self._fonts.pop((name, bold), None)
+        self._units.cache_clear()
+
+    def metrics(self, font_name: str = DEFAULT_FONT, bold: bool = False) -> FontMetrics:
+        key = (font_name, bold)
+        metrics = self._fonts.get(key)
+        if metrics is None:
+            path = self.font_files.get(key) or self._find_font_file(font_name, bold)
+            try:
+                metrics = FontMetrics.from_ttf(path, font_name) if path else None
+            except (OSError, ValueError, struct.error) as e:
+                print(f"⚠️  Не удалось прочитать шрифт {path}: {e}")
+                metrics = None
+            if metrics is None:
+                metrics = FontMetrics.bundled(font_name, bold)
+            self._fonts[key] = metrics
+        return metrics
+
+    def _find_font_file(self, font_name: str, bold: bool) -> Optional[str]:
+        names = FONT_FILES.get(font_name)
+        if not names:
+            return None
+        if self._system_fonts is None:
+            self._system_fonts = {}
+            for font_dir in FONT_DIRS:
+                for root, _, files in os.walk(font_dir):
+                    for file_name in files:
+                        self._system_fonts.setdefault(file_name.lower(), os.path.join(root, file_name))
+        for file_name in names[1 if bold else 0]:
+            path = self._system_fonts.get(file_name.lower())
+            if path:
+                return path
+        return None
+
+    # --- измерение ---
+
+    def _measure_units(self, font_name: str, bold: bool, text: str) -> int:
+        return self.metrics(font_name, bold).units(text)
+
+    def text_width(self, text: str, font_size: float, font_name: str = DEFAULT_FONT, bold: bool = False) -> int:
+        """Ширина строки в EMU"""
+        metrics = self.metrics(font_name, bold)
+        return int(self._units(font_name, bold, text) * font_size * EMU_PER_POINT / metrics.units_per_em)
+
+    def line_height(self, font_size: float, font_name: str = DEFAULT_FONT, bold: bool = False) -> int:
+        """Высота строки в EMU при одинарном интервале"""
+        return int(self.metrics(font_name, bold).line_height * font_size * EMU_PER_POINT)
+
+    def count_lines(self, text: str, width: float, font_size: float,
+                    font_name: str = DEFAULT_FONT, bold: bool = False) -> int:
+        """Число строк при переносе по словам в ширину width (EMU)
+
+        Слово шире строки PowerPoint разрывает по символам - оно занимает
+        ceil(ширина слова / ширина строки) строк.
+        """
+        metrics = self.metrics(font_name, bold)
+        limit = width * metrics.units_per_em / (font_size * EMU_PER_POINT) if font_size > 0 else 0
+        return self._wrap(self._paragraph_units(text, font_name, bold), self._units(font_name, bold, " "), limit)
+
+    def _paragraph_units(self, text: str, font_name: str, bold: bool) -> List[List[int]]:
+        """Ширины слов каждого абзаца в единицах шрифта"""
+        units = self._units
+        return [[units(font_name, bold, word) for word in paragraph.split()] for paragraph in text.split("\n")]
+
+    @staticmethod
+    def _wrap(paragraphs: List[List[int]], space: int, limit: float) -> int:
+        """Жадный перенос слов известной ширины в строки ширины limit"""
+        if limit <= 0:
+            return math.inf
+        lines = 0
+        for words in paragraphs:
+            lines += 1
+            current = None
+            for word_width in words:
+                if current is not None and current + space + word_width <= limit:
+                    current += space + word_width
+                    continue
+                if current is not None:
+                    lines += 1
+                current = word_width
+                if word_width > limit:
+                    extra = math.ceil(word_width / limit) - 1
+                    lines += extra
+                    current = word_width - extra * limit
+        return lines
+
+    def fits(self, text: str, width: float, height: float, font_size: float,
+             font_name: str = DEFAULT_FONT, bold: bool = False) -> bool:
+        """Помещается ли текст кеглем font_size в прямоугольник width x height (EMU)"""
+        lines = self.count_lines(text, width, font_size, font_name, bold)
+        return lines * self.line_height(font_size, font_name, bold) <= height
+
+    def fit_font_size(self, text: str, width: float, height: float, min_size: float, max_size: float,
+                      font_name: str = DEFAULT_FONT, bold: bool = False, step: float = 0.5) -> float:
+        """Наибольший кегль из [min_size, max_size] с шагом step, при котором текст помещается
+
+        Бинарный поиск: помещаемость монотонна по кеглю. Если не помещается
+        даже min_size, возвращается min_size.
+        """
+        if max_size <= min_size:
+            return min_size
+        low, high = 0, int((max_size - min_size) / step)
+        if self.fits(text, width, height, min_size + high * step, font_name, bold):
+            return min_size + high * step
+        # Инвариант: кегль low помещается (или это минимум), high - нет
+        while high - low > 1:
+            middle = (low + high) // 2
+            if self.fits(text, width, height, min_size + middle * step, font_name, bold):
+                low = middle
+            else:
+                high = middle
+        return min_size + low * step
+
+    def fit_many(self, boxes: Sequence[FitBox], step: float = 0.5,
+                 vectorized: Optional[bool] = None) -> List[float]:
+        """fit_font_size() для всех boxes разом; результат тот же, что по одному"""
+        if not boxes:
+            return []
+        totals, spaces, paragraphs, single, units_per_em, line_factors, steps = [], [], [], [], [], [], []
+        words = []
+        for text, _, _, min_size, max_size, font_name, bold in boxes:
+            metrics = self.metrics(font_name, bold)
+            space = self._units(font_name, bold, " ")
+            paragraph_units = self._paragraph_units(text, font_name, bold)
+            count = sum(len(paragraph) for paragraph in paragraph_units)
+            words.append(paragraph_units)
+            totals.append(sum(map(sum, paragraph_units)) + space * max(count - 1, 0))
+            spaces.append(space)
+            paragraphs.append(len(paragraph_units))
+            single.append(len(paragraph_units) == 1)
+            units_per_em.append(metrics.units_per_em)
+            line_factors.append(metrics.line_height)
+            steps.append(max(int((max_size - min_size) / step), 0))
+
+        if vectorized is None:
+            vectorized = np is not None and len(boxes) >= 32
+        bounds = self._fit_bounds_numpy if vectorized and np is not None else self._fit_bounds
+        lows, highs = bounds(boxes, step, totals, spaces, paragraphs, single, units_per_em, line_factors, steps)
+
+        def fits(index: int, size: float) -> bool:
+            _, width, height, _, _, _, _ = boxes[index]
+            self.exact_checks += 1
+            lines = self._wrap(words[index], spaces[index], width * units_per_em[index] / (size * EMU_PER_POINT))
+            return lines * int(line_factors[index] * size * EMU_PER_POINT) <= height
+
+        sizes = []
+        self.exact_checks = 0
+        for index, (box, low, high) in enumerate(zip(boxes, lows, highs)):
+            min_size = box[3]
+            # Нижняя оценка числа строк обычно точна - сначала проверяется верхняя граница
+            if high > low and fits(index, min_size + high * step):
+                low = high
+            # Кегль low помещается (или это минимум), high - нет
+            low = max(low, 0)
+            while high - low > 1:
+                middle = (low + high) // 2
+                if fits(index, min_size + middle * step):
+                    low = middle
+                else:
+                    high = middle
+            sizes.append(min_size + low * step)
+        return sizes
+
+    @staticmethod
+    def _fit_bounds(boxes, step, totals, spaces, paragraphs, single, units_per_em, line_factors, steps):
+        """Для каждого текста: (наибольший точно подходящий шаг, наибольший возможный шаг), -1 - нет такого"""
+        lows, highs = [], []
+        for (_, width, height, min_size, _, _, _), total, space, lines_min, one_line, upem, factor, count in zip(
+                boxes, totals, spaces, paragraphs, single, units_per_em, line_factors, steps):
+            low = high = -1
+            for k in range(count + 1):
+                size = min_size + k * step
+                limit = width * upem / (size * EMU_PER_POINT)
+                line = int(factor * size * EMU_PER_POINT)
+                if limit <= 0:
+                    break
+                # На каждом переносе теряется не больше одного пробела
+                lines = max(lines_min, math.ceil((total + space) / (limit + space) - 1e-9))
+                if lines * line > height:
+                    break
+                high = k
+                if one_line and total <= limit and line <= height:
+                    low = k
+            lows.append(low)
+            highs.append(high)
+        return lows, highs
+
+    @staticmethod
+    def _fit_bounds_numpy(boxes, step, totals, spaces, paragraphs, single, units_per_em, line_factors, steps):
+        """_fit_bounds() одной матрицей (текст x кегль-кандидат)"""
+        widths = np.array([box[1] for box in boxes], dtype=np.float64)[:, None]
+        heights = np.array([box[2] for box in boxes], dtype=np.float64)[:, None]
+        steps = np.array(steps)
+        candidates = np.arange(int(steps.max()) + 1)[None, :]
+        sizes = np.array([box[3] for box in boxes], dtype=np.float64)[:, None] + candidates * step
+        totals = np.array(totals, dtype=np.float64)[:, None]
+        spaces = np.array(spaces, dtype=np.float64)[:, None]
+
+        limit = widths * np.array(units_per_em, dtype=np.float64)[:, None] / (sizes * EMU_PER_POINT)
+        line = np.floor(np.array(line_factors)[:, None] * sizes * EMU_PER_POINT)
+        lines = np.maximum(np.array(paragraphs)[:, None], np.ceil((totals + spaces) / (limit + spaces) - 1e-9))
+        valid = (candidates <= steps[:, None]) & (limit > 0)
+        possible = valid & (lines * line <= heights)
+        exact = possible & np.array(single)[:, None] & (totals <= limit) & (line <= heights)
+        # Условия монотонны по кеглю - число подходящих кандидатов дает наибольший
+        return (exact.sum(axis=1) - 1).tolist(), (possible.sum(axis=1) - 1).tolist()
+
+    def cache_clear(self):
+        self._units.cache_clear()
+
+    @property
+    def cache_info(self):
+        return self._units.cache_info()
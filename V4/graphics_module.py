@@ -1,5 +1,7 @@
 # graphics_module.py - ИНФОГРАФИКА И ДИАГРАММЫ
 from .old_functions import ContentElement, ContentType, ElementStyle, BorderStyle, RGBColor, Inches, Pt
+from .chart_module import CHART_TYPES, chart_spec
+from .chart_downsample import downsample_spec
 from typing import Dict, List
 from pptx.enum.shapes import MSO_SHAPE
 
@@ -29,7 +31,40 @@ class GraphicsBuilder:
     
     def create_chart(self, chart_type: str, data: Dict, x: float = None, y: float = None,
                     width: float = None, height: float = None, **kwargs) -> ContentElement:
-        """Создает диаграмму (заглушка)"""
+        """Создает нативную диаграмму PowerPoint (bar, line, pie, scatter)
+        
+        data - словарь {категория: число} или столбцы
+        {"categories": [...], "series": {имя: значения}} (списки или массивы NumPy);
+        для scatter - {"x": xs, "y": ys} или {"series": {имя: (xs, ys)}}.
+        kwargs: title, legend, font_size.
+        max_points - ряды длиннее прореживаются до стольких точек методом
+        downsample ("lttb" или "minmax"); отчет - в metadata["downsample"].
+        """
+        if chart_type not in CHART_TYPES:
+            return self._create_chart_stub(chart_type, data, x, y, width, height)
+        
+        max_points = kwargs.pop('max_points', None)
+        method = kwargs.pop('downsample', 'lttb')
+        spec = chart_spec(chart_type, data, **kwargs)
+        metadata = {}
+        if max_points:
+            spec, report = downsample_spec(spec, max_points, method)
+            metadata["downsample"] = report
+            if self.debug and report.reduced:
+                print(f"📉 Диаграмма {chart_type}: {report.original} → {report.kept} точек "
+                      f"({method}, в {report.ratio:.1f} раза меньше)")
+        
+        return ContentElement(
+            id=f"chart_{chart_type}_{id(spec)}",
+            type=ContentType.CHART,
+            content={"chart_type": chart_type, "spec": spec},
+            x=x, y=y, width=width, height=height,
+            metadata=metadata
+        )
+    
+    def _create_chart_stub(self, chart_type: str, data: Dict, x: float = None, y: float = None,
+                           width: float = None, height: float = None) -> ContentElement:
+        """Неизвестный тип диаграммы - текстовое представление данных"""
         print(f"⚠️  Диаграммы типа '{chart_type}' еще не реализованы")
         
         # Создаем текстовое представление данных
@@ -0,0 +1,270 @@
+# layout_analyzer.py - ПРОВЕРКА МАКЕТА КОЛОДЫ ПЕРЕД СОХРАНЕНИЕМ
+"""
+Берет итоговые границы всех элементов каждого слайда (включая вложенные
+и заголовок) и ищет попарные пересечения и выход за холст слайда.
+
+Пересечения ищутся пространственным хешем: прямоугольник записывается в ячейки
+сетки, которые покрывает, и сравнивается только с соседями по ячейкам (на маленьких слайдах - просто
+перебором пар). Пара, найденная в нескольких общих ячейках, засчитывается
+один раз - в ячейке левого верхнего угла их пересечения. Прямоугольники на много ячеек (фоны,
+большие контейнеры) проверяются отдельно простым перебором. Родитель и его
+потомки пересекаются по построению и в отчет не попадают.
+
+Для текстовых элементов разбивка на строки (как у PowerPoint) при
+выбранном кегле показывает, вылезет ли текст за нижний край фигуры.
+Перед save() (analyze_on_save) проверяется только геометрия - разбивка
+текста заметно дороже и выполняется по явному analyze_layout().
+"""
+
+from .old_functions import ContentElement, ContentType
+from .layout_engine import SlideLayoutState
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional, Sequence, Tuple
+import math
+import time
+
+Rect = Tuple[float, float, float, float]
+
+# Прямоугольник, покрывающий больше ячеек, проверяется перебором
+MAX_CELLS_PER_RECT = 64
+
+# На слайде из нескольких десятков элементов перебор пар быстрее сетки
+BRUTE_FORCE_MAX_RECTS = 48
+
+# Условный id заголовка слайда в отчете
+TITLE_ID = "<title>"
+
+
+@dataclass(frozen=True)
+class Overlap:
+    """Пересечение двух элементов одного слайда"""
+    slide_index: int
+    first_id: str
+    second_id: str
+    first_type: str
+    second_type: str
+    intersection: Rect
+
+    @property
+    def area(self) -> float:
+        return self.intersection[2] * self.intersection[3]
+
+
+@dataclass(frozen=True)
+class Overflow:
+    """Элемент, выходящий за холст слайда; margins - насколько по сторонам (left, top, right, bottom)"""
+    slide_index: int
+    element_id: str
+    element_type: str
+    bounds: Rect
+    margins: Tuple[float, float, float, float]
+
+
+@dataclass(frozen=True)
+class TextOverflow:
+    """Текст, который при выбранном кегле не помещается в фигуру по высоте"""
+    slide_index: int
+    element_id: str
+    font_size: float
+    lines: int
+    overflow: int
+
+
+@dataclass
+class LayoutReport:
+    """Результат проверки колоды"""
+    slides: int = 0
+    elements: int = 0
+    overlaps: List[Overlap] = field(default_factory=list)
+    overflows: List[Overflow] = field(default_factory=list)
+    text_overflows: List[TextOverflow] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.overlaps and not self.overflows and not self.text_overflows
+
+    def by_slide(self) -> Dict[int, Dict[str, list]]:
+        """Проблемы, сгруппированные по номеру слайда"""
+        grouped: Dict[int, Dict[str, list]] = {}
+        for kind in ("overlaps", "overflows", "text_overflows"):
+            for problem in getattr(self, kind):
+                slide = grouped.setdefault(problem.slide_index, {"overlaps": [], "overflows": [], "text_overflows": []})
+                slide[kind].append(problem)
+        return grouped
+
+    def as_dict(self) -> Dict:
+        return {
+            "slides": self.slides,
+            "elements": self.elements,
+            "seconds": self.seconds,
+            "overlaps": [asdict(overlap) for overlap in self.overlaps],
+            "overflows": [asdict(overflow) for overflow in self.overflows],
+            "text_overflows": [asdict(overflow) for overflow in self.text_overflows],
+        }
+
+    def summary(self) -> str:
+        if self.ok:
+            return f"✅ Макет: {self.elements} элементов на {self.slides} слайдах без пересечений и выходов за слайд"
+        slides = len(self.by_slide())
+        return (f"⚠️  Макет: пересечений {len(self.overlaps)}, за границей слайда {len(self.overflows)}, "
+                f"текст не помещается {len(self.text_overflows)} (слайдов с проблемами: {slides} из {self.slides})")
+
+
+def find_overlaps(rects: Sequence[Rect], cell_size: Optional[float] = None) -> List[Tuple[int, int]]:
+    """Пары индексов (i, j), i < j, строго пересекающихся прямоугольников (касание - не пересечение)"""
+    count = len(rects)
+    if count < 2:
+        return []
+    if count <= BRUTE_FORCE_MAX_RECTS and cell_size is None:
+        return _overlaps_brute_force(rects)
+
+    if cell_size is None:
+        # Примерно один прямоугольник на ячейку охватывающей области
+        left = min(rect[0] for rect in rects)
+        top = min(rect[1] for rect in rects)
+        right = max(rect[0] + rect[2] for rect in rects)
+        bottom = max(rect[1] + rect[3] for rect in rects)
+        cell_size = math.sqrt(max(right - left, 1) * max(bottom - top, 1) / count)
+    cell = max(1, int(cell_size))
+
+    pairs = []
+    large = []
+    grid: Dict[Tuple[int, int], List[int]] = {}
+    for i, (x, y, w, h) in enumerate(rects):
+        if w <= 0 or h <= 0:
+            continue
+        first_col, last_col = int(x // cell), int((x + w - 1) // cell)
+        first_row, last_row = int(y // cell), int((y + h - 1) // cell)
+        if (last_col - first_col + 1) * (last_row - first_row + 1) > MAX_CELLS_PER_RECT:
+            large.append(i)
+            continue
+        single = first_col == last_col and first_row == last_row
+        right, bottom = x + w, y + h
+        for col in range(first_col, last_col + 1):
+            for row in range(first_row, last_row + 1):
+                bucket = grid.get((col, row))
+                if bucket is None:
+                    grid[(col, row)] = [i]
+                    continue
+                for j in bucket:
+                    ox, oy, ow, oh = rects[j]
+                    if ox < right and x < ox + ow and oy < bottom and y < oy + oh:
+                        # Пара из нескольких общих ячеек - только в ячейке угла пересечения
+                        if single or (int(max(x, ox) // cell) == col and int(max(y, oy) // cell) == row):
+                            pairs.append((j, i))
+                bucket.append(i)
+
+    # Большие прямоугольники - перебором против всех остальных
+    large_set = set(large)
+    for i in large:
+        x, y, w, h = rects[i]
+        right, bottom = x + w, y + h
+        for j, (ox, oy, ow, oh) in enumerate(rects):
+            if j == i or (j in large_set and j < i) or ow <= 0 or oh <= 0:
+                continue
+            if ox < right and x < ox + ow and oy < bottom and y < oy + oh:
+                pairs.append((min(i, j), max(i, j)))
+    return pairs
+
+
+def _overlaps_brute_force(rects: Sequence[Rect]) -> List[Tuple[int, int]]:
+    pairs = []
+    for i, (x, y, w, h) in enumerate(rects):
+        if w <= 0 or h <= 0:
+            continue
+        right, bottom = x + w, y + h
+        for j in range(i + 1, len(rects)):
+            ox, oy, ow, oh = rects[j]
+            if ox < right and x < ox + ow and oy < bottom and y < oy + oh and ow > 0 and oh > 0:
+                pairs.append((i, j))
+    return pairs
+
+
+def _intersection(a: Rect, b: Rect) -> Rect:
+    x, y = max(a[0], b[0]), max(a[1], b[1])
+    return (x, y, min(a[0] + a[2], b[0] + b[2]) - x, min(a[1] + a[3], b[1] + b[3]) - y)
+
+
+def analyze_slide(slide_index: int, tree: List[Tuple[ContentElement, Optional[Rect]]],
+                  canvas: Rect, title_area: Optional[Rect] = None, report: Optional[LayoutReport] = None) -> LayoutReport:
+    """Проверяет один слайд по парам (элемент, границы) в порядке отрисовки"""
+    report = report if report is not None else LayoutReport()
+    elements, rects = [], []
+    # Поддерево элемента в порядке отрисовки - непрерывный отрезок [i, subtree_end[i])
+    subtree_end = []
+    open_ancestors = []
+    for index, (element, bounds) in enumerate(tree):
+        parent = element.parent
+        while open_ancestors and parent is not elements[open_ancestors[-1]]:
+            subtree_end[open_ancestors.pop()] = index
+        subtree_end.append(index + 1)
+        open_ancestors.append(index)
+        elements.append(element)
+        rects.append(tuple(bounds) if bounds else (0, 0, 0, 0))
+    for index in open_ancestors:
+        subtree_end[index] = len(tree)
+
+    if title_area:
+        rects.append(tuple(title_area))
+        subtree_end.append(len(rects))
+
+    def describe(index: int) -> Tuple[str, str]:
+        if index == len(elements):
+            return TITLE_ID, "title"
+        return elements[index].id, elements[index].type.value
+
+    report.slides += 1
+    report.elements += len(tree)
+
+    for i, j in find_overlaps(rects):
+        if i < j < subtree_end[i]:
+            continue  # j - потомок i
+        (first_id, first_type), (second_id, second_type) = describe(i), describe(j)
+        report.overlaps.append(Overlap(slide_index, first_id, second_id, first_type, second_type,
+                                       _intersection(rects[i], rects[j])))
+
+    canvas_x, canvas_y, canvas_w, canvas_h = canvas
+    canvas_right, canvas_bottom = canvas_x + canvas_w, canvas_y + canvas_h
+    for index, (x, y, w, h) in enumerate(rects):
+        if w <= 0 or h <= 0:
+            continue
+        if x < canvas_x or y < canvas_y or x + w > canvas_right or y + h > canvas_bottom:
+            margins = (max(0, canvas_x - x), max(0, canvas_y - y),
+                       max(0, x + w - canvas_right), max(0, y + h - canvas_bottom))
+            report.overflows.append(Overflow(slide_index, *describe(index), (x, y, w, h), margins))
+    return report
+
+
+def analyze_deck(generator, check_text: bool = True) -> LayoutReport:
+    """Проверяет все слайды PresentationGenerator по итоговым границам элементов
+    
+    check_text=False - только геометрия (пересечения и выход за слайд), без разбивки текста.
+    """
+    start = time.perf_counter()
+    report = LayoutReport()
+    layout_engine = generator.layout_engine
+    canvas = (0, 0, generator.prs.slide_width, generator.prs.slide_height)
+    # Общее временное состояние: не трогаем состояния слайдов и не берем их из пула
+    scratch = SlideLayoutState()
+    with layout_engine.use_state(scratch):
+        for slide_index, slide in enumerate(generator.slides):
+            scratch.clear()
+            tree = list(layout_engine.iter_tree(slide.elements))
+            analyze_slide(slide_index, tree, canvas, slide.title_area(), report)
+            if check_text:
+                _check_text(slide_index, tree, generator.text_module, report)
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+def _check_text(slide_index: int, tree: List[Tuple[ContentElement, Optional[Rect]]],
+                text_module, report: LayoutReport):
+    """Переполнение текстовых фигур по предсказанной разбивке на строки"""
+    for element, bounds in tree:
+        if element.type != ContentType.TEXT or not bounds or not isinstance(element.content, str):
+            continue
+        layout = text_module.predict_text(element, bounds[2], bounds[3])
+        if not layout.fits:
+            report.text_overflows.append(TextOverflow(slide_index, element.id, layout.font_size,
+                                                      layout.line_count, layout.overflow))
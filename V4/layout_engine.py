@@ -1,22 +1,202 @@
 # layout_engine.py - УМНАЯ СИСТЕМА КОМПОНОВКИ
-from .old_functions import Inches, ContentElement
-from typing import Tuple, Optional, List
+from .old_functions import Inches, ContentElement, LayoutStrategy
+from .spatial_index import OccupiedAreas
+from .placement import MaxRectsPlacer
+from .container_layout import grid_rects, stack_rects, is_constrained
+from typing import Dict, Tuple, Optional, List
+import contextlib
+
+
+def _non_empty(rect: Tuple) -> Tuple:
+    """Прямоугольник ребенка или (), если ему не хватило места"""
+    return rect if rect and rect[2] > 0 and rect[3] > 0 else ()
+
+
+class SlideLayoutState:
+    """Состояние компоновки одного слайда: занятые области и кэш раскладок контейнеров"""
+    
+    __slots__ = ("occupied_areas", "layout_cache")
+    
+    def __init__(self):
+        self.occupied_areas = OccupiedAreas()
+        # id контейнера -> (контейнер, ключ, прямоугольники детей)
+        self.layout_cache: Dict[int, Tuple] = {}
+    
+    def clear(self):
+        self.occupied_areas.clear()
+        self.layout_cache.clear()
+
 
 class SmartLayoutEngine:
-    """Умная система компоновки элементов на слайде"""
+    """Умная система компоновки элементов на слайде
+    
+    Занятые области и кэш раскладок хранятся в SlideLayoutState активного
+    слайда (state), а не в движке: у каждого слайда свое состояние, которое
+    после рендера возвращается в пул и достается следующему слайду.
+    """
     
     def __init__(self, slide_width: float, slide_height: float):
         self.slide_width = slide_width
         self.slide_height = slide_height
-        self.occupied_areas = []
         self.safe_margin = Inches(0.5)
+        # Авторазмещение: зазор между элементами и размер элемента без width/height
+        self.auto_spacing = Inches(0.1)
+        self.auto_size = (Inches(3), Inches(1))
+        # Состояние вне слайдов (движок сам по себе) и пул освобожденных состояний
+        self._default_state = SlideLayoutState()
+        self.state = self._default_state
+        self._state_pool: List[SlideLayoutState] = []
+        self.max_pooled_states = 8
+        self.layout_cache_hits = 0
+        self.layout_cache_misses = 0
+    
+    @property
+    def occupied_areas(self) -> OccupiedAreas:
+        """Зарезервированные области активного слайда с пространственным индексом"""
+        return self.state.occupied_areas
+    
+    @occupied_areas.setter
+    def occupied_areas(self, areas):
+        # Присваивание списка (например, [] для сброса) пересобирает индекс
+        self.state.occupied_areas = areas if isinstance(areas, OccupiedAreas) else OccupiedAreas(areas)
+    
+    def acquire_state(self) -> SlideLayoutState:
+        """Чистое состояние для нового слайда (из пула, если есть)"""
+        if self._state_pool:
+            return self._state_pool.pop()
+        return SlideLayoutState()
+    
+    def release_state(self, state: SlideLayoutState):
+        """Очищает состояние слайда и возвращает его в пул"""
+        if state is self.state:
+            self.state = self._default_state
+        state.clear()
+        if len(self._state_pool) < self.max_pooled_states:
+            self._state_pool.append(state)
+    
+    @contextlib.contextmanager
+    def use_state(self, state: SlideLayoutState):
+        """Временно делает state активным (на время рендера слайда)"""
+        previous = self.state
+        self.state = state
+        try:
+            yield state
+        finally:
+            self.state = previous
     
     def calculate_bounds(self, element: ContentElement, parent_bounds: Optional[Tuple] = None) -> Optional[Tuple]:
-        """Вычисляет границы элемента"""
-        if element.layout_strategy == "manual":
-            return self._calculate_manual_bounds(element, parent_bounds)
+        """Вычисляет границы элемента
+        
+        parent_bounds - область для детей (см. calculate_child_bounds). Ребенок
+        контейнера с GRID/VSTACK/HSTACK получает свою ячейку раскладки
+        родителя; для всех детей сразу дешевле вызвать layout_children.
+        """
+        parent = element.parent
+        if parent_bounds and parent is not None and self._strategy(parent) is not LayoutStrategy.MANUAL:
+            for child, rect in zip(parent.children, self._arrange(parent, parent_bounds)):
+                if child is element:
+                    return rect
         return self._calculate_manual_bounds(element, parent_bounds)
     
+    def layout_children(self, container: ContentElement, bounds: Optional[Tuple] = None,
+                        vectorized: Optional[bool] = None) -> List[Tuple]:
+        """Границы всех детей контейнера за один проход по его стратегии
+        
+        Дети раскладываются внутри bounds контейнера минус style.padding,
+        зазор - metadata['gap'] (по умолчанию style.margin), число колонок
+        сетки - metadata['columns']. При MANUAL каждый ребенок считается
+        относительно области контейнера, как в calculate_bounds.
+        """
+        if not container.children:
+            return []
+        if bounds is None:
+            bounds = self.calculate_bounds(container)
+        return self._arrange(container, self.calculate_child_bounds(bounds, container.style.padding), vectorized)
+    
+    def iter_tree(self, elements: List[ContentElement]):
+        """Пары (элемент, границы) для элементов и всех их потомков в порядке отрисовки
+        
+        Родитель идет перед детьми, дети - в порядке children. Обход стеком,
+        без рекурсии, поэтому глубина дерева не ограничена. Дети элемента
+        без границ и дети, которым не хватило места (ширина или высота
+        не больше 0), получают пустые границы () и не рисуются.
+        """
+        return self._walk([(element, None) for element in reversed(elements)])
+    
+    def layout_tree(self, root: ContentElement, bounds: Optional[Tuple] = None) -> Dict[str, Tuple]:
+        """Границы всех элементов дерева {id: (x, y, width, height)}
+        
+        Раскладка контейнера берется из кэша, пока не изменились его область,
+        он сам и его дети, поэтому после правки заново решаются только
+        затронутые поддеревья.
+        """
+        return {element.id: rect for element, rect in self._walk([(root, bounds)])}
+    
+    def _walk(self, stack: List[Tuple]):
+        while stack:
+            element, bounds = stack.pop()
+            if bounds is None:
+                bounds = self.calculate_bounds(element)
+            yield element, bounds
+            children = element.children
+            if not children:
+                continue
+            if bounds:
+                rects = self.layout_children(element, bounds)
+                stack.extend(zip(reversed(children), map(_non_empty, reversed(rects))))
+            else:
+                stack.extend((child, ()) for child in reversed(children))
+    
+    def clear_layout_cache(self):
+        self.state.layout_cache.clear()
+    
+    def _arrange(self, container: ContentElement, area: Tuple, vectorized: Optional[bool] = None) -> List[Tuple]:
+        children = container.children
+        key = (tuple(area), container.revision, tuple(child.revision for child in children))
+        layout_cache = self.state.layout_cache
+        cached = layout_cache.get(id(container))
+        if cached is not None and cached[0] is container and cached[1] == key:
+            self.layout_cache_hits += 1
+            return cached[2]
+        
+        self.layout_cache_misses += 1
+        rects = self._solve(container, area, vectorized)
+        layout_cache[id(container)] = (container, key, rects)
+        return rects
+    
+    def _solve(self, container: ContentElement, area: Tuple, vectorized: Optional[bool] = None) -> List[Tuple]:
+        children = container.children
+        gap = container.metadata.get('gap', container.style.margin)
+        strategy = self._strategy(container)
+        constraints = [child.constraints for child in children]
+        if not any(is_constrained(limits) for limits in constraints):
+            constraints = None  # Без ограничений - быстрый (векторный) путь
+        
+        if strategy is LayoutStrategy.GRID:
+            return grid_rects(
+                area, [child.width for child in children], [child.height for child in children],
+                container.metadata.get('columns'), gap, vectorized, constraints
+            )
+        if strategy is LayoutStrategy.VERTICAL_STACK:
+            return stack_rects(
+                area, [child.height for child in children], [child.width for child in children],
+                True, gap, vectorized, constraints
+            )
+        if strategy is LayoutStrategy.HORIZONTAL_STACK:
+            return stack_rects(
+                area, [child.width for child in children], [child.height for child in children],
+                False, gap, vectorized, constraints
+            )
+        return [self._calculate_manual_bounds(child, area) for child in children]
+    
+    @staticmethod
+    def _strategy(element: ContentElement) -> LayoutStrategy:
+        # Стратегия может быть задана и строкой ("grid", "vstack", ...)
+        try:
+            return LayoutStrategy(element.layout_strategy)
+        except ValueError:
+            return LayoutStrategy.MANUAL
+    
     def _calculate_manual_bounds(self, element: ContentElement, parent_bounds: Optional[Tuple]) -> Tuple:
         """Ручное размещение"""
         if parent_bounds:
@@ -37,17 +217,111 @@ class SmartLayoutEngine:
         """Резервирует область как занятую"""
         self.occupied_areas.append((x, y, width, height))
     
+    def query_overlaps(self, rect: Tuple) -> List[Tuple]:
+        """Зарезервированные области, пересекающие rect (x, y, width, height)"""
+        return self.occupied_areas.query_overlaps(rect)
+    
+    def nearest_free(self, rect: Tuple, bounds: Optional[Tuple] = None) -> Optional[Tuple]:
+        """Ближайшее свободное место для rect (по умолчанию - в пределах безопасной зоны слайда)"""
+        if bounds is None:
+            bounds = (
+                self.safe_margin, self.safe_margin,
+                self.slide_width - 2 * self.safe_margin, self.slide_height - 2 * self.safe_margin
+            )
+        return self.occupied_areas.nearest_free(rect, bounds)
+    
+    def remove(self, rect: Tuple) -> bool:
+        """Освобождает ранее зарезервированную область"""
+        return self.occupied_areas.remove(rect)
+    
     def calculate_child_bounds(self, parent_bounds: Tuple, padding: float) -> Tuple:
-        """Вычисляет границы для дочернего элемента"""
+        """Вычисляет границы для дочернего элемента (размеры не меньше 0)"""
         parent_x, parent_y, parent_w, parent_h = parent_bounds
         return (
             parent_x + padding,
             parent_y + padding,
-            parent_w - 2 * padding,
-            parent_h - 2 * padding
+            max(parent_w - 2 * padding, 0),
+            max(parent_h - 2 * padding, 0)
         )
     
-    def auto_place_element(self, element: ContentElement, relative_to=None, alignment="top_left"):
-        """Автоматическое размещение (заглушка для будущей реализации)"""
-        print("⚠️  Автоматическое размещение еще не реализовано, используется ручное")
-        return self._calculate_manual_bounds(element, None)
\ No newline at end of file
+    def auto_place_element(self, element: ContentElement, relative_to=None, alignment="top_left") -> Optional[Tuple]:
+        """Ставит элемент в ближайшее к якорю свободное место и резервирует его"""
+        placed = self.auto_place_elements([element], relative_to, alignment, force=True)
+        if element.id in placed:
+            return placed[element.id]
+        print(f"⚠️  Нет свободного места для '{element.id}', используется ручное размещение")
+        return self._calculate_manual_bounds(element, None)
+    
+    def auto_place_elements(self, elements: List[ContentElement], relative_to=None,
+                            alignment: str = "top_left", occupied=None,
+                            force: bool = False) -> Dict[str, Tuple]:
+        """Пакетное размещение: все элементы без координат за один проход MaxRects
+        
+        occupied - занятые области (по умолчанию - зарезервированные в движке;
+        тогда найденные места тоже резервируются). Элементы с координатами
+        считаются занятыми. Для отдельного элемента выравнивание и соседа
+        можно задать в metadata['alignment'] / metadata['relative_to'].
+        Возвращает {id элемента: (x, y, width, height)}.
+        """
+        reserve = occupied is None
+        obstacles = list(self.occupied_areas if occupied is None else occupied)
+        pending = []
+        for element in elements:
+            if force or (element.x is None and element.y is None):
+                pending.append(element)
+            else:
+                obstacles.append(self._calculate_manual_bounds(element, None))
+        if not pending:
+            return {}
+        
+        sizes = [self._auto_size(element) for element in pending]
+        # Все размеры известны заранее: места меньше самого мелкого элемента можно не хранить
+        min_size = (min(width for width, _ in sizes), min(height for _, height in sizes))
+        placer = MaxRectsPlacer(self._safe_area(), obstacles, self.auto_spacing, min_size)
+        placed = {}
+        for element, (width, height) in zip(pending, sizes):
+            anchor = element.metadata.get('relative_to', relative_to)
+            rect = placer.place(
+                width, height,
+                element.metadata.get('alignment', alignment),
+                self._anchor_rect(anchor, elements)
+            )
+            if rect is None:
+                continue
+            element.x, element.y, element.width, element.height = rect
+            placed[element.id] = rect
+            if reserve:
+                self.reserve_area(*rect)
+        return placed
+    
+    def _safe_area(self) -> Tuple:
+        return (
+            self.safe_margin, self.safe_margin,
+            self.slide_width - 2 * self.safe_margin, self.slide_height - 2 * self.safe_margin
+        )
+    
+    def _auto_size(self, element: ContentElement) -> Tuple[float, float]:
+        """Размер элемента без координат: заданный, иначе из ограничений, иначе по умолчанию"""
+        constraints = element.constraints
+        width = element.width or constraints.min_width or self.auto_size[0]
+        if constraints.max_width:
+            width = min(width, constraints.max_width)
+        height = element.height
+        if not height and constraints.aspect_ratio:
+            height = width / constraints.aspect_ratio
+        height = height or constraints.min_height or self.auto_size[1]
+        if constraints.max_height:
+            height = min(height, constraints.max_height)
+        return int(width), int(height)
+    
+    def _anchor_rect(self, anchor, elements: List[ContentElement]) -> Optional[Tuple]:
+        """relative_to: прямоугольник, ContentElement или id элемента из elements"""
+        if anchor is None or isinstance(anchor, tuple):
+            return anchor
+        if isinstance(anchor, str):
+            anchor = next((element for element in elements if element.id == anchor), None)
+            if anchor is None:
+                return None
+        if anchor.x is None and anchor.y is None:
+            return None
+        return self._calculate_manual_bounds(anchor, None)
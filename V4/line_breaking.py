@@ -0,0 +1,446 @@
+# line_breaking.py - РАЗБИВКА ТЕКСТА НА СТРОКИ И ПЕРЕНОСЫ
+"""
+Разбивка абзаца на строки по ширинам из TextMeasurer:
+- "greedy" - жадно, как переносит PowerPoint (по пробелам, слово шире
+  строки - по символам); по этой модели предсказывается переполнение;
+- "optimal" - алгоритм Кнута-Пласса: минимум суммы "плохости" строк по
+  всему абзацу (ровный правый край, меньше висящих коротких строк).
+
+Обе модели могут переносить слова по слогам. Места переноса в русских
+словах даются правилами по классам букв (гласные, согласные, й/ь/ъ);
+вместо них можно загрузить TeX-паттерны Лианга (например hyph-ru.pat.txt).
+
+Ширины элементов абзаца в единицах шрифта не зависят от кегля, поэтому
+кэшируются по абзацу; разбивка кэшируется по (абзац, ширина строки в
+единицах шрифта). При подборе кегля заново разбиваются только абзацы,
+которые перестали помещаться в одну строку, а ширины слов не пересчитываются.
+"""
+
+from .font_metrics import TextMeasurer, DEFAULT_FONT, EMU_PER_POINT
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+import math
+
+HYPHEN = "-"
+
+_VOWELS = set("аеёиоуыэюяaeiouy")
+_SPECIAL = set("йьъ")
+
+# Правила переноса: (классы букв слева, классы справа) от места переноса;
+# g - гласная, s - согласная, x - й/ь/ъ, a - любая буква
+_RUSSIAN_RULES = (("x", "aa"), ("g", "ga"), ("sg", "sg"), ("gs", "sg"), ("sg", "ssg"), ("gss", "ssg"))
+
+# Штрафы Кнута-Пласса
+LINE_PENALTY = 10
+HYPHEN_PENALTY = 50
+DOUBLE_HYPHEN_DEMERITS = 3000
+MAX_BADNESS = 10000
+RAGGED_STRETCH = 0.25
+
+
+def _letter_class(char: str) -> str:
+    char = char.lower()
+    if char in _VOWELS:
+        return "g"
+    if char in _SPECIAL:
+        return "x"
+    return "s" if char.isalpha() else ""
+
+
+class Hyphenator:
+    """Допустимые места переноса в слове (индексы, перед которыми можно разорвать)"""
+
+    def __init__(self, patterns: Optional[Dict[str, Tuple[int, ...]]] = None,
+                 left_min: int = 2, right_min: int = 2, maxsize: int = 65536):
+        self.patterns = patterns
+        self.left_min = left_min
+        self.right_min = right_min
+        self.maxsize = maxsize
+        self._reset_caches()
+
+    def _reset_caches(self):
+        self.positions = lru_cache(maxsize=self.maxsize)(self._positions)
+
+    def __getstate__(self):
+        # Кэш на lru_cache не сериализуется - воркеры строят свой
+        return {"patterns": self.patterns, "left_min": self.left_min,
+                "right_min": self.right_min, "maxsize": self.maxsize}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    @classmethod
+    def from_tex_patterns(cls, path: str, **kwargs) -> 'Hyphenator':
+        """Паттерны Лианга из файла TeX (по одному паттерну на строку или через пробел)"""
+        patterns = {}
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.split("%", 1)[0]
+                for pattern in line.split():
+                    if pattern.startswith("\\") or pattern in "{}":
+                        continue
+                    letters = "".join(char for char in pattern if not char.isdigit())
+                    values, digit = [], 0
+                    for char in pattern:
+                        if char.isdigit():
+                            digit = int(char)
+                        else:
+                            values.append(digit)
+                            digit = 0
+                    values.append(digit)
+                    patterns[letters] = tuple(values)
+        return cls(patterns, **kwargs)
+
+    def _positions(self, word: str) -> Tuple[int, ...]:
+        # Кавычки, скобки и знаки препинания по краям слова ("(презентация),")
+        # не переносятся - переносы ищутся в буквенной середине
+        start, end = 0, len(word)
+        while start < end and not word[start].isalpha():
+            start += 1
+        while end > start and not word[end - 1].isalpha():
+            end -= 1
+        letters = word[start:end].lower()
+        if len(letters) < self.left_min + self.right_min or not letters.isalpha():
+            return ()
+        if self.patterns is not None:
+            positions = self._liang(letters)
+        else:
+            positions = self._rules(letters)
+        return tuple(start + i for i in positions if self.left_min <= i <= len(letters) - self.right_min)
+
+    @staticmethod
+    def _rules(word: str) -> List[int]:
+        classes = "".join(_letter_class(char) for char in word)
+        if len(classes) != len(word):
+            return []
+        # Правила применяются по очереди; совпадение не должно накрывать
+        # перенос, найденный раньше (иначе "пре-зе-н-та-ция")
+        positions = set()
+        for left, right in _RUSSIAN_RULES:
+            size = len(left) + len(right)
+            for start in range(len(word) - size + 1):
+                end = start + size
+                if _matches(classes[start:start + len(left)], left) and _matches(classes[start + len(left):end], right) \
+                        and not any(start < position < end for position in positions):
+                    positions.add(start + len(left))
+        return sorted(positions)
+
+    def _liang(self, word: str) -> List[int]:
+        dotted = "." + word + "."
+        values = [0] * (len(dotted) + 1)
+        longest = max(map(len, self.patterns)) if self.patterns else 0
+        for start in range(len(dotted)):
+            for end in range(start + 1, min(len(dotted), start + longest) + 1):
+                pattern = self.patterns.get(dotted[start:end])
+                if pattern:
+                    for offset, value in enumerate(pattern):
+                        values[start + offset] = max(values[start + offset], value)
+        # values[i + 1] - значение между буквами word[i - 1] и word[i]
+        return [i for i in range(1, len(word)) if values[i + 1] % 2]
+
+    def hyphenate(self, word: str, hyphen: str = "\u00ad") -> str:
+        """Слово с мягкими переносами (или другим символом hyphen) в допустимых местах"""
+        pieces, previous = [], 0
+        for position in self.positions(word):
+            pieces.append(word[previous:position])
+            previous = position
+        pieces.append(word[previous:])
+        return hyphen.join(pieces)
+
+
+def _matches(classes: str, pattern: str) -> bool:
+    return len(classes) == len(pattern) and all(p == "a" or p == c for c, p in zip(classes, pattern))
+
+
+@dataclass
+class TextLayout:
+    """Предсказанная разбивка текста в прямоугольнике"""
+    lines: List[str]
+    font_size: float
+    line_height: int
+    width: float
+    height: float
+
+    @property
+    def line_count(self) -> int:
+        return len(self.lines)
+
+    @property
+    def text_height(self) -> int:
+        return self.line_count * self.line_height
+
+    @property
+    def overflow(self) -> int:
+        """На сколько EMU текст не помещается по высоте (0 - помещается)"""
+        return max(0, self.text_height - int(self.height))
+
+    @property
+    def fits(self) -> bool:
+        return self.overflow == 0
+
+
+# Элементы абзаца Кнута-Пласса: (вид, ширина, растяжение, сжатие, штраф, флаг переноса, текст)
+_BOX, _GLUE, _PENALTY = 0, 1, 2
+Item = Tuple[int, int, float, float, float, bool, str]
+
+
+class LineBreaker:
+    """Разбивка абзацев на строки с кэшем по абзацам"""
+
+    def __init__(self, measurer: Optional[TextMeasurer] = None, hyphenator: Optional[Hyphenator] = None,
+                 maxsize: int = 16384):
+        self.measurer = measurer or TextMeasurer()
+        self.hyphenator = hyphenator or Hyphenator()
+        self.maxsize = maxsize
+        self._reset_caches()
+
+    def _reset_caches(self):
+        self._words = lru_cache(maxsize=self.maxsize)(self._build_words)
+        self._items = lru_cache(maxsize=self.maxsize)(self._build_items)
+        self._breaks = lru_cache(maxsize=self.maxsize)(self._break_paragraph)
+
+    def __getstate__(self):
+        # Кэш на lru_cache не сериализуется - воркеры строят свой
+        return {"measurer": self.measurer, "hyphenator": self.hyphenator, "maxsize": self.maxsize}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    # --- предсказание ---
+
+    def layout(self, text: str, width: float, height: float, font_size: float,
+               font_name: str = DEFAULT_FONT, bold: bool = False,
+               method: str = "greedy", hyphenate: bool = False) -> TextLayout:
+        """Строки текста в прямоугольнике width x height (EMU) кеглем font_size"""
+        lines = []
+        limit = self._limit(width, font_size, font_name, bold)
+        for paragraph in text.split("\n"):
+            lines.extend(self.break_lines(paragraph, limit, font_name, bold, method, hyphenate))
+        return TextLayout(lines, font_size, self.measurer.line_height(font_size, font_name, bold), width, height)
+
+    def count_lines(self, text: str, width: float, font_size: float, font_name: str = DEFAULT_FONT,
+                    bold: bool = False, method: str = "greedy", hyphenate: bool = False) -> int:
+        limit = self._limit(width, font_size, font_name, bold)
+        return sum(len(self.break_lines(paragraph, limit, font_name, bold, method, hyphenate))
+                   for paragraph in text.split("\n"))
+
+    def fit_font_size(self, text: str, width: float, height: float, min_size: float, max_size: float,
+                      font_name: str = DEFAULT_FONT, bold: bool = False, method: str = "greedy",
+                      hyphenate: bool = False, step: float = 0.5) -> float:
+        """Наибольший кегль из [min_size, max_size], при котором разбивка помещается по высоте"""
+        def fits(size: float) -> bool:
+            lines = self.count_lines(text, width, size, font_name, bold, method, hyphenate)
+            return lines * self.measurer.line_height(size, font_name, bold) <= height
+
+        low, high = 0, int((max_size - min_size) / step) if max_size > min_size else 0
+        if fits(min_size + high * step):
+            return min_size + high * step
+        while high - low > 1:
+            middle = (low + high) // 2
+            if fits(min_size + middle * step):
+                low = middle
+            else:
+                high = middle
+        return min_size + low * step
+
+    def _limit(self, width: float, font_size: float, font_name: str, bold: bool) -> float:
+        """Ширина строки в единицах шрифта - ключ кэша разбивки"""
+        if font_size <= 0:
+            return 0
+        metrics = self.measurer.metrics(font_name, bold)
+        return width * metrics.units_per_em / (font_size * EMU_PER_POINT)
+
+    def break_lines(self, paragraph: str, limit: float, font_name: str = DEFAULT_FONT, bold: bool = False,
+                    method: str = "greedy", hyphenate: bool = False) -> Tuple[str, ...]:
+        """Строки абзаца при ширине строки limit (в единицах шрифта)"""
+        words = self._words(paragraph, font_name, bold)
+        if not words:
+            return ("",)
+        space = self.measurer._units(font_name, bold, " ")
+        total = sum(width for _, width in words) + space * (len(words) - 1)
+        if total <= limit:
+            # Абзац в одну строку - разбивка от ширины не зависит
+            return (" ".join(word for word, _ in words),)
+        return self._breaks(paragraph, font_name, bold, limit, method, hyphenate)
+
+    # --- кэшируемые части ---
+
+    def _build_words(self, paragraph: str, font_name: str, bold: bool) -> Tuple[Tuple[str, int], ...]:
+        units = self.measurer._units
+        return tuple((word, units(font_name, bold, word)) for word in paragraph.split())
+
+    def _break_paragraph(self, paragraph: str, font_name: str, bold: bool, limit: float,
+                         method: str, hyphenate: bool) -> Tuple[str, ...]:
+        if limit <= 0:
+            return tuple(word for word, _ in self._words(paragraph, font_name, bold))
+        if method == "optimal":
+            lines = self._knuth_plass(self._items(paragraph, font_name, bold, hyphenate), limit)
+            if lines is not None:
+                return lines
+        elif method != "greedy":
+            raise ValueError(f"Неизвестный способ разбивки: {method}")
+        return self._greedy(paragraph, font_name, bold, limit, hyphenate)
+
+    def _pieces(self, word: str, font_name: str, bold: bool, hyphenate: bool) -> List[Tuple[str, int]]:
+        """Слоги слова с ширинами (без переноса - слово целиком)"""
+        positions = self.hyphenator.positions(word) if hyphenate else ()
+        units = self.measurer._units
+        bounds = (0,) + tuple(positions) + (len(word),)
+        return [(word[start:end], units(font_name, bold, word[start:end])) for start, end in zip(bounds, bounds[1:])]
+
+    # --- жадная разбивка ---
+
+    def _greedy(self, paragraph: str, font_name: str, bold: bool, limit: float, hyphenate: bool) -> Tuple[str, ...]:
+        units = self.measurer._units
+        space = units(font_name, bold, " ")
+        hyphen = units(font_name, bold, HYPHEN)
+        lines: List[str] = []
+        current: List[str] = []
+        current_width = 0
+        for word, word_width in self._words(paragraph, font_name, bold):
+            while True:
+                gap = space if current else 0
+                if current_width + gap + word_width <= limit:
+                    current.append(word)
+                    current_width += gap + word_width
+                    break
+                if hyphenate:
+                    # Самый длинный префикс по слогам, который помещается с дефисом
+                    prefix, prefix_width = "", 0
+                    for piece, piece_width in self._pieces(word, font_name, bold, True)[:-1]:
+                        if current_width + gap + prefix_width + piece_width + hyphen > limit:
+                            break
+                        prefix += piece
+                        prefix_width += piece_width
+                    if prefix:
+                        current.append(prefix + HYPHEN)
+                        lines.append(" ".join(current))
+                        current, current_width = [], 0
+                        word = word[len(prefix):]
+                        word_width = units(font_name, bold, word)
+                        continue
+                if current:
+                    lines.append(" ".join(current))
+                    current, current_width = [], 0
+                    continue
+                # Слово шире строки - PowerPoint рвет его по символам
+                head = self._longest_prefix(word, limit, font_name, bold)
+                lines.append(head)
+                word = word[len(head):]
+                word_width = units(font_name, bold, word)
+        if current:
+            lines.append(" ".join(current))
+        return tuple(lines)
+
+    def _longest_prefix(self, word: str, limit: float, font_name: str, bold: bool) -> str:
+        advances = self.measurer.metrics(font_name, bold)
+        width = 0
+        for i, char in enumerate(word):
+            width += advances.units(char)
+            if width > limit:
+                return word[:max(i, 1)]
+        return word
+
+    # --- Кнут-Пласс ---
+
+    def _build_items(self, paragraph: str, font_name: str, bold: bool, hyphenate: bool) -> Tuple[Item, ...]:
+        units = self.measurer._units
+        space = units(font_name, bold, " ")
+        hyphen = units(font_name, bold, HYPHEN)
+        items: List[Item] = []
+        for index, (word, _) in enumerate(self._words(paragraph, font_name, bold)):
+            if index:
+                # Текст выровнен влево: пробелы не растягиваются и не сжимаются
+                items.append((_GLUE, space, 0, 0, 0, False, " "))
+            pieces = self._pieces(word, font_name, bold, hyphenate)
+            for number, (piece, piece_width) in enumerate(pieces):
+                if number:
+                    items.append((_PENALTY, hyphen, 0, 0, HYPHEN_PENALTY, True, HYPHEN))
+                items.append((_BOX, piece_width, 0, 0, 0, False, piece))
+        # Последняя строка может быть сколь угодно короткой
+        items.append((_GLUE, 0, math.inf, 0, 0, False, ""))
+        items.append((_PENALTY, 0, 0, 0, -math.inf, False, ""))
+        return tuple(items)
+
+    def _knuth_plass(self, items: Sequence[Item], limit: float) -> Optional[Tuple[str, ...]]:
+        """Оптимальные места разрыва; None, если строку шире limit не избежать"""
+        count = len(items)
+        # Префиксные суммы ширины, растяжения и сжатия
+        widths, stretches, shrinks = [0] * (count + 1), [0.0] * (count + 1), [0.0] * (count + 1)
+        for i, (kind, width, stretch, shrink, _, _, _) in enumerate(items):
+            is_space = kind != _PENALTY
+            widths[i + 1] = widths[i] + (width if is_space else 0)
+            stretches[i + 1] = stretches[i] + (stretch if kind == _GLUE else 0)
+            shrinks[i + 1] = shrinks[i] + (shrink if kind == _GLUE else 0)
+
+        def line_start(position: int) -> int:
+            # После разрыва пробелы и необязательные штрафы отбрасываются
+            i = position + 1 if position >= 0 else 0
+            while i < count and items[i][0] != _BOX and items[i][4] != -math.inf:
+                i += 1
+            return i
+
+        # Активный узел: позиция разрыва -> (сумма штрафов, предыдущий разрыв, начало строки, разрыв по переносу)
+        active: Dict[int, Tuple[float, int, int, bool]] = {-1: (0.0, -2, 0, False)}
+        best: Dict[int, Tuple[float, int, bool]] = {}
+        for b, (kind, width, _, _, penalty, flagged, _) in enumerate(items):
+            if kind == _BOX or (kind == _GLUE and (b == 0 or items[b - 1][0] != _BOX)) or penalty == math.inf:
+                continue
+            candidate = None
+            for a, (demerits, _, start, a_flagged) in list(active.items()):
+                natural = widths[b] - widths[start] + (width if kind == _PENALTY else 0)
+                if natural < limit:
+                    # Неровность правого края: как \rightskip в TeX, каждой строке
+                    # разрешено недотянуть RAGGED_STRETCH ширины при badness 100
+                    stretch = stretches[b] - stretches[start] + limit * RAGGED_STRETCH
+                    ratio = (limit - natural) / stretch
+                elif natural > limit:
+                    shrink = shrinks[b] - shrinks[start]
+                    ratio = (limit - natural) / shrink if shrink > 0 else -math.inf
+                else:
+                    ratio = 0.0
+                if ratio < -1 or penalty == -math.inf:
+                    del active[a]
+                if ratio < -1:
+                    continue
+                badness = MAX_BADNESS if ratio == math.inf else min(MAX_BADNESS, 100 * abs(ratio) ** 3)
+                if penalty >= 0:
+                    line_demerits = (LINE_PENALTY + badness) ** 2 + penalty ** 2
+                elif penalty > -math.inf:
+                    line_demerits = (LINE_PENALTY + badness) ** 2 - penalty ** 2
+                else:
+                    line_demerits = (LINE_PENALTY + badness) ** 2
+                if flagged and a_flagged:
+                    line_demerits += DOUBLE_HYPHEN_DEMERITS
+                total = demerits + line_demerits
+                if candidate is None or total < candidate[0]:
+                    candidate = (total, a)
+            if candidate is not None:
+                active[b] = (candidate[0], candidate[1], line_start(b), flagged)
+                best[b] = (candidate[0], candidate[1], flagged)
+            if not active:
+                return None
+
+        end = count - 1
+        if end not in best:
+            return None
+        breaks = []
+        position = end
+        while position >= 0:
+            breaks.append(position)
+            position = best[position][1]
+        breaks.reverse()
+
+        lines = []
+        start = 0
+        for position in breaks:
+            text = "".join(items[i][6] for i in range(start, position) if items[i][0] != _PENALTY).rstrip()
+            if items[position][0] == _PENALTY and items[position][5]:
+                text += HYPHEN
+            lines.append(text)
+            start = line_start(position)
+        return tuple(lines)
+
+    def cache_clear(self):
+        self._reset_caches()
@@ -16,12 +16,26 @@ import math
 
 # ===== СКОПИРОВАННЫЕ КЛАССЫ ИЗ ПРЕДЫДУЩИХ ВЕРСИЙ =====
 
+class RevisionTracked:
+    """Счетчик изменений публичных полей - основа инкрементального рендера"""
+    
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if not name.startswith('_'):
+            object.__setattr__(self, '_revision', self.__dict__.get('_revision', 0) + 1)
+    
+    def touch(self):
+        """Помечает объект измененным (для правок внутри dict/list, которые не отслеживаются)"""
+        object.__setattr__(self, '_revision', self.__dict__.get('_revision', 0) + 1)
+
 class ContentType(Enum):
     TEXT = "text"
     IMAGE = "image"
     SHAPE = "shape"
     CONTAINER = "container"
     INFOGRAPHIC = "infographic"
+    TABLE = "table"
+    CHART = "chart"
 
 class LayoutStrategy(Enum):
     MANUAL = "manual"
@@ -30,7 +44,7 @@ class LayoutStrategy(Enum):
     HORIZONTAL_STACK = "hstack"
 
 @dataclass
-class SizeConstraints:
+class SizeConstraints(RevisionTracked):
     min_width: Optional[float] = None
     max_width: Optional[float] = None
     min_height: Optional[float] = None
@@ -39,13 +53,13 @@ class SizeConstraints:
     grow_priority: int = 1
 
 @dataclass
-class BorderStyle:
+class BorderStyle(RevisionTracked):
     color: Optional[RGBColor] = None
     width: float = Pt(1)
     radius: Optional[float] = None
 
 @dataclass
-class TextStyle:
+class TextStyle(RevisionTracked):
     font_size: Optional[float] = None
     font_color: Optional[RGBColor] = None
     bold: bool = False
@@ -54,7 +68,7 @@ class TextStyle:
     vertical_align: int = 1
 
 @dataclass
-class ElementStyle:
+class ElementStyle(RevisionTracked):
     background_color: Optional[RGBColor] = None
     border: Optional[BorderStyle] = None
     text_style: Optional[TextStyle] = None
@@ -62,7 +76,7 @@ class ElementStyle:
     margin: float = Inches(0.05)
 
 @dataclass
-class ContentElement:
+class ContentElement(RevisionTracked):
     id: str
     type: ContentType
     content: Union[str, Dict, List]
@@ -80,7 +94,36 @@ class ContentElement:
     def add_child(self, child: 'ContentElement'):
         child.parent = self
         self.children.append(child)
+        self.touch()
         return self
+    
+    def iter_subtree(self):
+        """Элемент и все его потомки, родитель перед детьми (обход стеком, без рекурсии)"""
+        stack = [self]
+        while stack:
+            element = stack.pop()
+            yield element
+            stack.extend(reversed(element.children))
+    
+    @property
+    def revision(self) -> Tuple[int, int, int, int, int]:
+        """Версия элемента вместе со стилями и ограничениями: меняется при любой правке полей"""
+        style = self.style
+        return (
+            self.__dict__.get('_revision', 0),
+            style.__dict__.get('_revision', 0),
+            style.border.__dict__.get('_revision', 0) if style.border else 0,
+            style.text_style.__dict__.get('_revision', 0) if style.text_style else 0,
+            self.constraints.__dict__.get('_revision', 0),
+        )
+    
+    @property
+    def is_dirty(self) -> bool:
+        """Изменился ли элемент с последнего рендера"""
+        return self.__dict__.get('_rendered_revision') != self.revision
+    
+    def mark_clean(self):
+        self._rendered_revision = self.revision
 
 # ===== СИСТЕМА ТЕМ (из предыдущих версий) =====
 
@@ -188,7 +231,7 @@ def create_container_element(x: float = None, y: float = None,
 
 # Экспорт всего для обратной совместимости
 __all__ = [
-    'ContentElement', 'ContentType', 'ElementStyle', 'TextStyle', 
+    'RevisionTracked', 'ContentElement', 'ContentType', 'ElementStyle', 'TextStyle', 
     'BorderStyle', 'SizeConstraints', 'LayoutStrategy',
     'ColorThemes', 'create_text_element', 'create_shape_element', 
     'create_container_element', 'Inches', 'Pt', 'RGBColor', 
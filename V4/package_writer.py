@@ -0,0 +1,165 @@
+# package_writer.py - СОХРАНЕНИЕ .PPTX: ДЕТЕРМИНИРОВАННОЕ И ПОТОКОВОЕ
+"""
+Запись OPC-пакета без текущего времени в заголовках ZIP
+(одинаковое содержимое дает побайтно одинаковый файл) и потоковая запись,
+при которой готовые слайды и их картинки уходят в ZIP сразу,
+а не сериализуются всей колодой в конце.
+"""
+
+from pptx.opc.constants import CONTENT_TYPE as CT
+from pptx.opc.oxml import serialize_part_xml
+from pptx.opc.package import XmlPart
+from pptx.opc.packuri import CONTENT_TYPES_URI, PACKAGE_URI
+from pptx.opc.serialized import PackageWriter, _ContentTypesItem
+from pptx.parts.image import ImagePart
+from typing import IO, Union
+import time
+import zipfile
+
+# Минимальная дата, которую допускает формат ZIP
+FIXED_ZIP_DATE = (1980, 1, 1, 0, 0, 0)
+
+
+def _zip_info(membername: str, deterministic: bool) -> zipfile.ZipInfo:
+    date_time = FIXED_ZIP_DATE if deterministic else time.localtime(time.time())[:6]
+    info = zipfile.ZipInfo(membername, date_time=date_time)
+    info.compress_type = zipfile.ZIP_DEFLATED
+    info.external_attr = 0o600 << 16
+    return info
+
+
+class _FixedTimeZipWriter:
+    """Аналог _ZipPkgWriter из python-pptx с фиксированной датой записей"""
+
+    def __init__(self, pkg_file: Union[str, IO[bytes]]):
+        self._zipf = zipfile.ZipFile(pkg_file, "w", compression=zipfile.ZIP_DEFLATED)
+
+    def __enter__(self) -> '_FixedTimeZipWriter':
+        return self
+
+    def __exit__(self, *exc):
+        self._zipf.close()
+
+    def write(self, pack_uri, blob: bytes):
+        self._zipf.writestr(_zip_info(pack_uri.membername, True), blob)
+
+
+class DeterministicPackageWriter(PackageWriter):
+    """PackageWriter, пишущий части через _FixedTimeZipWriter"""
+
+    def _write(self):
+        with _FixedTimeZipWriter(self._pkg_file) as phys_writer:
+            self._write_content_types_stream(phys_writer)
+            self._write_pkg_rels(phys_writer)
+            self._write_parts(phys_writer)
+
+
+def save_package(prs, pkg_file: Union[str, IO[bytes]]):
+    """Сохраняет Presentation детерминированно (путь или файловый объект)"""
+    package = prs.part.package
+    DeterministicPackageWriter.write(pkg_file, package._rels, tuple(package.iter_parts()))
+
+
+class _WriteOnlyStream:
+    """Обертка для потоков без seek/tell/flush (pipe, тело HTTP-ответа)"""
+
+    def __init__(self, stream):
+        self._stream = stream
+
+    def write(self, data: bytes) -> int:
+        self._stream.write(data)
+        return len(data)
+
+    def flush(self):
+        flush = getattr(self._stream, "flush", None)
+        if flush:
+            flush()
+
+
+class _FlushedImagePart(ImagePart):
+    """ImagePart, уже записанная в поток: хранит только SHA1 и исходный размер"""
+
+    @property
+    def _native_size(self):
+        return self._flushed_native_size
+
+
+class StreamingPackageWriter:
+    """Потоковая запись .pptx в файл, pipe или любой объект с write()
+
+    write_slide() пишет готовый слайд и его картинки и освобождает их память,
+    close() дописывает остальные части пакета, связи и [Content_Types].xml.
+    """
+
+    def __init__(self, prs, target: Union[str, IO[bytes]], deterministic: bool = False):
+        self.prs = prs
+        self.deterministic = deterministic
+        if not isinstance(target, str) and not (hasattr(target, "seekable") and target.seekable()):
+            target = _WriteOnlyStream(target)
+        self._zipf = zipfile.ZipFile(target, "w", compression=zipfile.ZIP_DEFLATED)
+        self._written = set()
+        self.closed = False
+
+    def write_slide(self, slide):
+        """Пишет слайд python-pptx вместе с его картинками и диаграммами"""
+        slide_part = slide.part
+        for rel in slide_part.rels.values():
+            if rel.is_external:
+                continue
+            target = rel.target_part
+            if isinstance(target, ImagePart):
+                self._write_part(target)
+                self._release_image(target)
+            elif target.content_type == CT.DML_CHART and not isinstance(target, XmlPart):
+                # Диаграмма ChartEngine - готовые байты: пишем вместе с книгой и освобождаем
+                self._write_chart(target)
+
+        self._write_part(slide_part)
+
+        # Фигуры больше не нужны - в пакете остается пустое дерево слайда
+        sp_tree = slide_part._element.cSld.spTree
+        for shape_elm in list(sp_tree.iter_shape_elms()):
+            sp_tree.remove(shape_elm)
+
+    def close(self):
+        """Дописывает оставшиеся части и закрывает архив"""
+        if self.closed:
+            return
+
+        package = self.prs.part.package
+        parts = tuple(package.iter_parts())
+        for part in parts:
+            self._write_part(part)
+
+        self._write(PACKAGE_URI.rels_uri, package._rels.xml)
+        self._write(CONTENT_TYPES_URI, serialize_part_xml(_ContentTypesItem.xml_for(parts)))
+        self._zipf.close()
+        self.closed = True
+
+    def _write(self, pack_uri, blob: bytes):
+        self._zipf.writestr(_zip_info(pack_uri.membername, self.deterministic), blob)
+
+    def _write_part(self, part):
+        if part.partname in self._written:
+            return
+        self._write(part.partname, part.blob)
+        if part._rels:
+            self._write(part.partname.rels_uri, part.rels.xml)
+        self._written.add(part.partname)
+
+    def _write_chart(self, chart_part):
+        parts = [chart_part] + [rel.target_part for rel in chart_part.rels.values() if not rel.is_external]
+        for part in parts:
+            if part.partname not in self._written:
+                self._write_part(part)
+                part.blob = b""
+
+    @staticmethod
+    def _release_image(image_part: ImagePart):
+        """Оставляет у записанной картинки только то, что нужно для дедупликации"""
+        if isinstance(image_part, _FlushedImagePart):
+            return
+        image_part.sha1  # lazyproperty - значение кэшируется в экземпляре
+        image_part._flushed_native_size = image_part._native_size
+        image_part.__class__ = _FlushedImagePart
+        image_part._blob = b""
@@ -0,0 +1,229 @@
+# parallel_render.py - ПАРАЛЛЕЛЬНЫЙ РЕНДЕР СЛАЙДОВ
+"""
+Компоновка (границы всех элементов, включая вложенные) считается в родительском
+процессе, а пары (элемент, границы) слайдов делятся на порции и рендерятся
+в ProcessPoolExecutor.
+Воркер возвращает XML-фрагменты фигур и байты картинок (по одному разу на SHA1),
+родительский процесс вставляет их в слайды по порядку. Диаграммы (их части
+общие для всего пакета) строит родительский процесс на своем месте в порядке слоев. Связи, типы содержимого
+и дедупликацию медиа выполняет пакет python-pptx, поэтому результат не зависит
+от числа воркеров.
+"""
+
+from .old_functions import ContentElement, ContentType, RGBColor
+from pptx.shapes.picture import Picture
+from pptx.util import Length, Inches, Centipoints, Cm, Emu, Mm, Pt
+from .render_backend import XmlRenderBackend
+from .profiler_module import without_probes
+from collections import ChainMap
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Optional, Tuple
+import copy
+import copyreg
+import hashlib
+import io
+import os
+import pickle
+
+# RGBColor (tuple с конструктором r, g, b) и единицы длины (int, конструктор
+# которых пересчитывает значение в EMU) стандартный pickle восстанавливает неверно.
+# Редукторы действуют только при сериализации заданий воркерам (_dumps),
+# общая таблица copyreg процесса не меняется
+_REDUCERS = {RGBColor: lambda color: (RGBColor, tuple(color))}
+for _length_type in (Inches, Centipoints, Cm, Emu, Mm, Pt):
+    _REDUCERS[_length_type] = lambda length: (Length, (int(length),))
+
+
+class _RenderContext:
+    """Модули генератора, которые нужны XmlRenderBackend внутри воркера"""
+
+    def __init__(self, text_module, graphics_builder, style_compiler):
+        self.text_module = text_module
+        self.graphics_builder = graphics_builder
+        self.style_compiler = style_compiler
+
+
+def _read_media(image_path: str, media: Dict[str, bytes]) -> Optional[str]:
+    """Читает картинку и возвращает ее SHA1 (None, если файл недоступен)"""
+    try:
+        with open(image_path, "rb") as f:
+            blob = f.read()
+    except (OSError, TypeError):
+        return None
+
+    digest = hashlib.sha1(blob).hexdigest()
+    media.setdefault(digest, blob)
+    return digest
+
+
+def _detached(element: ContentElement) -> ContentElement:
+    """Копия элемента без parent/children: воркеру дерево не нужно,
+    а глубокое дерево pickle сериализует рекурсивно"""
+    clone = copy.copy(element)
+    clone.__dict__.update(parent=None, children=[])
+    if element.type == ContentType.CHART:
+        # Данные диаграммы воркеру не нужны - ее строит родительский процесс
+        clone.__dict__.update(content=None)
+    return clone
+
+
+def _render_chunk(context: _RenderContext, jobs: List[Tuple[int, int, List[Tuple[ContentElement, Tuple]]]]):
+    """Рендерит порцию слайдов: [(индекс слайда, первый id фигуры, [(элемент, границы)])]"""
+    backend = XmlRenderBackend(context)
+    media = {}
+    results = []
+
+    for slide_index, next_id, tree in jobs:
+        ops = []
+        fragments = []
+        indices = []
+
+        for index, (element, bounds) in enumerate(tree):
+            if not bounds:
+                continue
+
+            x, y, width, height = bounds
+
+            if element.type == ContentType.IMAGE:
+                if fragments:
+                    ops.append(("xml", "".join(fragments), indices))
+                    fragments = []
+                    indices = []
+                digest = _read_media(element.content, media)
+                ops.append(("image", digest, element.content, bounds, index))
+                next_id += 1
+            elif element.type == ContentType.CHART:
+                if fragments:
+                    ops.append(("xml", "".join(fragments), indices))
+                    fragments = []
+                    indices = []
+                ops.append(("chart", bounds, index))
+                next_id += 1
+            else:
+                fragment = backend.build_element_xml(element, next_id, x, y, width, height)
+                if fragment:
+                    fragments.append(fragment)
+                    indices.append(index)
+                    next_id += 1
+
+        if fragments:
+            ops.append(("xml", "".join(fragments), indices))
+        results.append((slide_index, ops))
+
+    return results, media
+
+
+def _dumps(payload) -> bytes:
+    buffer = io.BytesIO()
+    pickler = pickle.Pickler(buffer, pickle.HIGHEST_PROTOCOL)
+    pickler.dispatch_table = ChainMap(_REDUCERS, copyreg.dispatch_table)
+    pickler.dump(payload)
+    return buffer.getvalue()
+
+
+def _render_pickled(payload: bytes):
+    """Точка входа воркера: (контекст, порция), сериализованные _dumps()"""
+    return _render_chunk(*pickle.loads(payload))
+
+
+def _split_jobs(jobs: list, num_chunks: int) -> List[list]:
+    """Делит задания на непрерывные порции примерно равного размера"""
+    num_chunks = max(1, min(num_chunks, len(jobs)))
+    size, extra = divmod(len(jobs), num_chunks)
+    chunks = []
+    start = 0
+    for i in range(num_chunks):
+        end = start + size + (1 if i < extra else 0)
+        chunks.append(jobs[start:end])
+        start = end
+    return chunks
+
+
+def render_slides_parallel(generator, slides: list, max_workers: Optional[int] = None):
+    """Рендерит slides генератора в пуле процессов и собирает результат в его презентацию"""
+    max_workers = max_workers or os.cpu_count() or 1
+
+    # Уже отрендеренные слайды обновляются на месте (перерисовываются только
+    # измененные элементы), в пул уходят только новые - иначе фигуры удвоятся.
+    # Записанные в поток слайды render() пропускает или отклоняет с ошибкой
+    fresh = []
+    for slide in slides:
+        if slide._rendered is not None or slide._streamed:
+            slide.render()
+        else:
+            fresh.append(slide)
+    slides = fresh
+
+    for slide in slides:
+        if any(element.x is None and element.y is None for element in slide.elements):
+            slide.auto_place()
+
+    # Компоновка - здесь же, в состоянии каждого слайда; воркеры только строят XML
+    layout_engine = generator.layout_engine
+    trees = []
+    for slide in slides:
+        with layout_engine.use_state(slide.layout_state):
+            tree = list(layout_engine.iter_tree(slide.elements))
+            for _, bounds in tree:
+                if bounds:
+                    layout_engine.reserve_area(*bounds)
+        trees.append(tree)
+
+    jobs = [
+        (index, slide.slide.shapes._spTree.max_shape_id + 1,
+         [(_detached(element), bounds) for element, bounds in tree])
+        for index, (slide, tree) in enumerate(zip(slides, trees))
+    ]
+    if not jobs:
+        return
+
+    # Обертки профайлера не сериализуются - воркеры получают модули без них
+    context = _RenderContext(without_probes(generator.text_module),
+                             generator.graphics_builder, without_probes(generator.style_compiler))
+
+    if max_workers == 1:
+        chunk_results = [_render_chunk(context, jobs)]
+    else:
+        chunks = _split_jobs(jobs, max_workers * 4)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            chunk_results = list(executor.map(_render_pickled, [_dumps((context, chunk)) for chunk in chunks]))
+
+    _merge(generator, slides, trees, chunk_results)
+
+
+def _merge(generator, slides: list, trees: list, chunk_results: list):
+    """Вставляет результаты воркеров в слайды в исходном порядке"""
+    media = {}
+    for _, chunk_media in chunk_results:
+        media.update(chunk_media)
+
+    for results, _ in chunk_results:
+        for slide_index, ops in results:
+            slide = slides[slide_index]
+            tree = trees[slide_index]
+            sp_tree = slide.slide.shapes._spTree
+            shapes = [None] * len(tree)
+
+            for op in ops:
+                if op[0] == "xml":
+                    for index, sp in zip(op[2], XmlRenderBackend._flush(sp_tree, [op[1]])):
+                        shapes[index] = sp
+                elif op[0] == "chart":
+                    _, (x, y, width, height), index = op
+                    chart = slide._render_chart_element(tree[index][0], x, y, width, height)
+                    shapes[index] = chart._element
+                else:
+                    _, digest, image_path, (x, y, width, height), index = op
+                    # Картинка с тем же SHA1 уже в пакете - python-pptx переиспользует ее часть
+                    image_file = io.BytesIO(media[digest]) if digest else image_path
+                    picture = slide._add_picture(image_file, x, y, width, height, image_path)
+                    if isinstance(picture, Picture) and digest:
+                        # Из потока python-pptx берет имя "image.<ext>" - возвращаем имя файла
+                        picture._element.nvPicPr.cNvPr.set("descr", os.path.basename(image_path))
+                    if picture is not None:
+                        shapes[index] = picture._element
+
+            slide._remember_render([(element, sp) for (element, _), sp in zip(tree, shapes)], tree)
+            generator._stream_slide(slide)
+            if slide is not generator.current_slide:
+                slide.release_layout_state()
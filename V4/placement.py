@@ -0,0 +1,183 @@
+# placement.py - АВТОМАТИЧЕСКОЕ РАЗМЕЩЕНИЕ (MAXRECTS)
+"""
+Свободное место слайда хранится как список максимальных свободных
+прямоугольников (MaxRects). Занятая область режет пересекающие ее свободные
+прямоугольники на части слева/справа/сверху/снизу, вложенные части
+отбрасываются. Новый элемент ставится в ту точку свободного прямоугольника,
+которая ближе всего к якорю выравнивания.
+
+Прямоугольники меньше min_size (самого мелкого из размещаемых) не
+хранятся - в них ничего не поместится, поэтому свободных остается столько,
+сколько вдоль границы заполненной части, а не сколько элементов размещено.
+Новую часть может содержать только свободный прямоугольник, касающийся
+занятой области, - с ними и сравнивается. Для find() на каждую точку якоря
+ведется куча свободных прямоугольников по расстоянию от якоря: перебор идет
+от ближних и останавливается, как только расстояние больше лучшего
+найденного.
+"""
+
+from typing import Dict, List, Optional, Tuple
+import heapq
+import itertools
+import math
+
+Rect = Tuple[float, float, float, float]
+
+# Выравнивание -> (доля ширины, доля высоты) точки якоря на контейнере
+ALIGNMENTS = {
+    "top_left": (0.0, 0.0), "top": (0.5, 0.0), "top_right": (1.0, 0.0),
+    "left": (0.0, 0.5), "center": (0.5, 0.5), "right": (1.0, 0.5),
+    "bottom_left": (0.0, 1.0), "bottom": (0.5, 1.0), "bottom_right": (1.0, 1.0),
+}
+
+# Относительно другого элемента точка самого элемента зеркальна якорю:
+# "right" - левый край элемента у правого края соседа, "bottom_left" - под ним слева и т.д.
+RELATIVE_POINTS = {
+    "top_left": (0.0, 1.0), "top": (0.5, 1.0), "top_right": (1.0, 1.0),
+    "left": (1.0, 0.5), "center": (0.5, 0.5), "right": (0.0, 0.5),
+    "bottom_left": (0.0, 0.0), "bottom": (0.5, 0.0), "bottom_right": (1.0, 0.0),
+}
+
+# Сколько куч по точкам якоря держать (relative_to дает новый якорь на каждого соседа)
+MAX_ANCHORS = 16
+
+
+def _contains(outer: Rect, inner: Rect) -> bool:
+    return (outer[0] <= inner[0] and outer[1] <= inner[1]
+            and inner[0] + inner[2] <= outer[0] + outer[2]
+            and inner[1] + inner[3] <= outer[1] + outer[3])
+
+
+def _distance(point: Tuple[float, float], rect: Rect) -> float:
+    """Расстояние от точки до прямоугольника (0 - внутри)"""
+    dx = max(rect[0] - point[0], 0, point[0] - rect[0] - rect[2])
+    dy = max(rect[1] - point[1], 0, point[1] - rect[1] - rect[3])
+    return math.hypot(dx, dy)
+
+
+class MaxRectsPlacer:
+    """Размещение прямоугольников в области bounds в обход занятых"""
+
+    def __init__(self, bounds: Rect, occupied=(), spacing: float = 0, min_size: Tuple[float, float] = (0, 0)):
+        self.bounds = tuple(bounds)
+        self.spacing = spacing
+        # Свободные прямоугольники уже или ниже min_size не хранятся: в них ничего не поместится
+        self.min_width, self.min_height = min_size
+        self._free: Dict[int, Rect] = {}
+        self._ids = itertools.count()
+        # Точка якоря -> куча (расстояние до свободного прямоугольника, id); удаленные id пропускаются
+        self._anchors: Dict[Tuple[float, float], List[Tuple[float, int]]] = {}
+        self._add_free(self.bounds)
+        for rect in occupied:
+            self.occupy(rect)
+
+    @property
+    def free(self) -> List[Rect]:
+        """Максимальные свободные прямоугольники"""
+        return list(self._free.values())
+
+    def _add_free(self, rect: Rect):
+        item_id = next(self._ids)
+        self._free[item_id] = rect
+        for anchor, heap in self._anchors.items():
+            heapq.heappush(heap, (_distance(anchor, rect), item_id))
+
+    def _anchor_heap(self, anchor: Tuple[float, float]) -> List[Tuple[float, int]]:
+        heap = self._anchors.get(anchor)
+        # Куча пересобирается, когда удаленных записей в ней больше, чем живых
+        if heap is None or len(heap) > 2 * len(self._free) + 32:
+            if heap is None and len(self._anchors) >= MAX_ANCHORS:
+                del self._anchors[next(iter(self._anchors))]
+            heap = [(_distance(anchor, rect), item_id) for item_id, rect in self._free.items()]
+            heapq.heapify(heap)
+            self._anchors[anchor] = heap
+        return heap
+
+    def occupy(self, rect: Rect):
+        """Вычитает rect (с отступом spacing) из свободных прямоугольников"""
+        s = self.spacing
+        x, y, w, h = rect[0] - s, rect[1] - s, rect[2] + 2 * s, rect[3] + 2 * s
+        right, bottom = x + w, y + h
+
+        pieces = []
+        # Касающиеся rect краем: только они могут содержать новые части (часть идет вдоль края rect)
+        touching = []
+        for item_id, free in list(self._free.items()):
+            fx, fy, fw, fh = free
+            f_right, f_bottom = fx + fw, fy + fh
+            if fx > right or x > f_right or fy > bottom or y > f_bottom:
+                continue
+            if not (fx < right and x < f_right and fy < bottom and y < f_bottom):
+                touching.append(free)
+                continue
+            del self._free[item_id]
+            if x > fx:
+                pieces.append((fx, fy, x - fx, fh))
+            if right < f_right:
+                pieces.append((right, fy, f_right - right, fh))
+            if y > fy:
+                pieces.append((fx, fy, fw, y - fy))
+            if bottom < f_bottom:
+                pieces.append((fx, bottom, fw, f_bottom - bottom))
+
+        # Новые части проверяются против друг друга и касающихся - старые между собой уже максимальны
+        unique = []
+        for piece in pieces:
+            if piece[2] <= 0 or piece[3] <= 0 or piece[2] < self.min_width or piece[3] < self.min_height:
+                continue
+            if any(_contains(other, piece) for other in unique) or any(_contains(other, piece) for other in touching):
+                continue
+            unique = [other for other in unique if not _contains(piece, other)]
+            unique.append(piece)
+        for piece in unique:
+            self._add_free(piece)
+
+    def find(self, width: float, height: float, alignment: str = "top_left",
+             relative_to: Optional[Rect] = None) -> Optional[Rect]:
+        """Свободное место размера width x height, ближайшее к якорю; None, если не помещается"""
+        fx_anchor, fy_anchor = ALIGNMENTS.get(alignment, ALIGNMENTS["top_left"])
+        if relative_to is None:
+            container = self.bounds
+            fx_point, fy_point = fx_anchor, fy_anchor
+        else:
+            container = relative_to
+            fx_point, fy_point = RELATIVE_POINTS.get(alignment, RELATIVE_POINTS["top_left"])
+
+        # Положение, при котором точка элемента совпадает с якорем
+        target_x = int(container[0] + fx_anchor * container[2] - fx_point * width)
+        target_y = int(container[1] + fy_anchor * container[3] - fy_point * height)
+
+        # Точка элемента лежит внутри свободного прямоугольника, поэтому расстояние от якоря
+        # до прямоугольника - нижняя граница оценки (с запасом на округление target)
+        anchor = (container[0] + fx_anchor * container[2], container[1] + fy_anchor * container[3])
+        heap = self._anchor_heap(anchor)
+        items = self._free
+        best = None
+        best_score = None
+        # Записи извлекаются по возрастанию расстояния: удаленные выбрасываются, живые возвращаются
+        seen = []
+        while heap and (best_score is None or heap[0][0] <= best_score[0] + 2):
+            entry = heapq.heappop(heap)
+            free = items.get(entry[1])
+            if free is None:
+                continue
+            seen.append(entry)
+            fx, fy, fw, fh = free
+            if fw < width or fh < height:
+                continue
+            x = min(max(target_x, fx), fx + fw - width)
+            y = min(max(target_y, fy), fy + fh - height)
+            score = (math.hypot(x - target_x, y - target_y), y, x)
+            if best_score is None or score < best_score:
+                best, best_score = (x, y, width, height), score
+        for entry in seen:
+            heapq.heappush(heap, entry)
+        return best
+
+    def place(self, width: float, height: float, alignment: str = "top_left",
+              relative_to: Optional[Rect] = None) -> Optional[Rect]:
+        """find() + occupy() найденного места"""
+        rect = self.find(width, height, alignment, relative_to)
+        if rect is not None:
+            self.occupy(rect)
+        return rect
@@ -0,0 +1,250 @@
+# profiler_module.py - ПРОФИЛИРОВАНИЕ ГОРЯЧИХ ПУТЕЙ РЕНДЕРА
+"""
+Таймеры и счетчики по фазам конвейера (create_slide, calculate_bounds,
+calculate_font_size, add_picture, save ...) и по ContentType элементов.
+
+Замеры ставятся обертками на экземпляры модулей генератора при включении
+и снимаются при выключении - выключенный профайлер ничего не стоит.
+"""
+
+from .old_functions import ContentElement
+from typing import Callable, Dict, List, Optional, Tuple
+import copy
+import functools
+import json
+import os
+import threading
+import time
+
+# Фазы генератора и модулей: (атрибут генератора или None, метод, фаза, индекс аргумента-элемента)
+GENERATOR_PROBES = (
+    (None, "create_slide", "create_slide", None),
+    (None, "render_parallel", "render_parallel", None),
+    (None, "save", "save", None),
+    ("layout_engine", "calculate_bounds", "calculate_bounds", 0),
+    ("text_module", "calculate_font_size", "calculate_font_size", 0),
+    ("style_compiler", "apply", "style_apply", None),
+    ("style_compiler", "apply_text", "style_apply_text", None),
+    ("xml_backend", "render_slide", "xml_render_slide", None),
+    ("xml_backend", "build_element_xml", "build_element_xml", 0),
+    ("stream_writer", "write_slide", "stream_slide", None),
+)
+
+# Фазы слайда
+SLIDE_PROBES = (
+    ("render", "render_slide", None),
+    ("_render_element", "render_element", 0),
+    ("_add_picture", "add_picture", None),
+    ("_apply_element_styles", "apply_styles", 1),
+)
+
+_PROBES_ATTR = "_profiler_probes"
+
+
+class RenderProfiler:
+    """Собирает время и число вызовов по фазам и по типам элементов"""
+
+    def __init__(self, trace: bool = True, print_on_save: bool = True):
+        self.trace = trace
+        self.print_on_save = print_on_save
+        self.enabled = False
+        self.reset()
+
+    def reset(self):
+        # (фаза, тип элемента или None) -> [count, total, min, max] в секундах
+        self._stats: Dict[Tuple[str, Optional[str]], List[float]] = {}
+        self._events: List[Tuple[str, Optional[str], float, float, int]] = []
+        self._origin = time.perf_counter()
+
+    def record(self, phase: str, content_type: Optional[str], start: float, duration: float):
+        """Добавляет один замер (время в секундах от perf_counter)"""
+        stat = self._stats.get((phase, content_type))
+        if stat is None:
+            self._stats[(phase, content_type)] = [1, duration, duration, duration]
+        else:
+            stat[0] += 1
+            stat[1] += duration
+            if duration < stat[2]:
+                stat[2] = duration
+            if duration > stat[3]:
+                stat[3] = duration
+
+        if self.trace:
+            self._events.append((phase, content_type, start, duration, threading.get_ident()))
+
+    def wrap(self, func: Callable, phase: str, element_arg: Optional[int] = None) -> Callable:
+        """Оборачивает функцию замером; element_arg - позиция ContentElement в аргументах"""
+        record = self.record
+        perf_counter = time.perf_counter
+
+        @functools.wraps(func)
+        def probe(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                content_type = None
+                if element_arg is not None and len(args) > element_arg:
+                    element = args[element_arg]
+                    if isinstance(element, ContentElement):
+                        content_type = element.type.name
+                record(phase, content_type, start, perf_counter() - start)
+
+        return probe
+
+    # --- установка и снятие оберток ---
+
+    def install(self, target, method: str, phase: str, element_arg: Optional[int] = None):
+        """Ставит обертку на метод экземпляра target (атрибут экземпляра перекрывает класс)"""
+        if target is None:
+            return
+        probes = target.__dict__.setdefault(_PROBES_ATTR, set())
+        if method in probes:
+            return
+        setattr(target, method, self.wrap(getattr(target, method), phase, element_arg))
+        probes.add(method)
+
+    def attach(self, generator):
+        """Ставит замеры на генератор, его модули и уже созданные слайды"""
+        for owner, method, phase, element_arg in GENERATOR_PROBES:
+            target = generator if owner is None else getattr(generator, owner, None)
+            self.install(target, method, phase, element_arg)
+        self._print_after_save(generator)
+        for slide in generator.slides:
+            self.attach_slide(slide)
+        self.enabled = True
+
+    def _print_after_save(self, generator):
+        timed_save = generator.save
+        if getattr(timed_save, "_prints_profile", False):
+            return
+
+        @functools.wraps(timed_save)
+        def save(*args, **kwargs):
+            result = timed_save(*args, **kwargs)
+            if self.print_on_save:
+                self.print_table()
+            return result
+
+        save._prints_profile = True
+        generator.save = save
+
+    def attach_slide(self, slide):
+        for method, phase, element_arg in SLIDE_PROBES:
+            self.install(slide, method, phase, element_arg)
+
+    def detach(self, generator):
+        """Снимает все обертки - методы снова берутся из классов"""
+        owners = {probe[0] for probe in GENERATOR_PROBES}
+        targets = [generator if owner is None else getattr(generator, owner, None) for owner in owners]
+        for target in targets + list(generator.slides):
+            strip_probes(target)
+        self.enabled = False
+
+    # --- результаты ---
+
+    def as_dict(self) -> Dict:
+        """{'phases': {фаза: статистика}, 'content_types': {тип: {фаза: статистика}}}"""
+        phases: Dict[str, List[float]] = {}
+        content_types: Dict[str, Dict[str, Dict]] = {}
+
+        for (phase, content_type), stat in self._stats.items():
+            total = phases.get(phase)
+            if total is None:
+                phases[phase] = list(stat)
+            else:
+                total[0] += stat[0]
+                total[1] += stat[1]
+                total[2] = min(total[2], stat[2])
+                total[3] = max(total[3], stat[3])
+            if content_type is not None:
+                content_types.setdefault(content_type, {})[phase] = _stat_dict(stat)
+
+        return {
+            "phases": {phase: _stat_dict(stat) for phase, stat in phases.items()},
+            "content_types": content_types,
+        }
+
+    def to_json(self, path: Optional[str] = None, indent: int = 2) -> str:
+        """Статистика в JSON (и запись в файл, если указан path)"""
+        data = json.dumps(self.as_dict(), ensure_ascii=False, indent=indent)
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(data)
+        return data
+
+    def to_chrome_trace(self, path: Optional[str] = None) -> Dict:
+        """События в формате Chrome Trace (chrome://tracing, Perfetto)"""
+        pid = os.getpid()
+        events = []
+        for phase, content_type, start, duration, tid in self._events:
+            event = {
+                "name": phase,
+                "cat": content_type or "phase",
+                "ph": "X",
+                "ts": round((start - self._origin) * 1e6, 3),
+                "dur": round(duration * 1e6, 3),
+                "pid": pid,
+                "tid": tid,
+            }
+            if content_type:
+                event["args"] = {"content_type": content_type}
+            events.append(event)
+
+        trace = {"traceEvents": events, "displayTimeUnit": "ms"}
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(trace, f)
+        return trace
+
+    def format_table(self) -> str:
+        """Таблица фаз, отсортированная по суммарному времени"""
+        data = self.as_dict()
+        header = f"{'Фаза':<28}{'вызовов':>10}{'всего, мс':>12}{'среднее, мс':>14}{'макс, мс':>11}"
+        lines = [header, "-" * len(header)]
+
+        rows = sorted(data["phases"].items(), key=lambda item: item[1]["total_ms"], reverse=True)
+        for phase, stat in rows:
+            lines.append(_table_row(phase, stat))
+            for content_type, type_phases in sorted(data["content_types"].items()):
+                if phase in type_phases:
+                    lines.append(_table_row(f"  {content_type}", type_phases[phase]))
+
+        return "\n".join(lines)
+
+    def print_table(self):
+        print("📊 Профиль рендера:")
+        print(self.format_table())
+
+
+def strip_probes(target):
+    """Удаляет обертки профайлера с экземпляра"""
+    if target is None:
+        return
+    for method in target.__dict__.pop(_PROBES_ATTR, ()):
+        target.__dict__.pop(method, None)
+
+
+def without_probes(target):
+    """Поверхностная копия без оберток (например, для передачи в воркеры)"""
+    if target is None or _PROBES_ATTR not in target.__dict__:
+        return target
+    clone = copy.copy(target)
+    strip_probes(clone)
+    return clone
+
+
+def _stat_dict(stat: List[float]) -> Dict[str, float]:
+    count, total, minimum, maximum = stat
+    return {
+        "count": int(count),
+        "total_ms": total * 1000,
+        "mean_ms": total * 1000 / count,
+        "min_ms": minimum * 1000,
+        "max_ms": maximum * 1000,
+    }
+
+
+def _table_row(name: str, stat: Dict[str, float]) -> str:
+    return (f"{name:<28}{stat['count']:>10}{stat['total_ms']:>12.2f}"
+            f"{stat['mean_ms']:>14.4f}{stat['max_ms']:>11.3f}")
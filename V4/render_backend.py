@@ -0,0 +1,229 @@
+# render_backend.py - ПАКЕТНАЯ ГЕНЕРАЦИЯ XML СЛАЙДА
+"""
+Альтернативный рендерер: вместо цепочки прокси-вызовов python-pptx
+(add_shape -> fill.solid() -> fore_color.rgb -> line.width ...) строит
+XML-фрагменты p:sp для всех элементов слайда и вставляет их в p:spTree
+одной операцией разбора. Результат совпадает с рендером через python-pptx.
+
+Таблица (p:graphicFrame) строится так же - XML всех ячеек одной строкой,
+без прокси-вызовов на каждую ячейку; этим же путем таблицы рендерит и
+backend "pptx".
+"""
+
+from .old_functions import ContentElement, ContentType, TextStyle, Pt
+from .table_layout import TableLayout
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import nsdecls, qn
+from pptx.enum.shapes import MSO_SHAPE
+from pptx.shapes.autoshape import AutoShapeType
+from xml.sax.saxutils import escape
+from typing import List, Dict, Optional, Sequence, Tuple
+import re
+
+RENDER_BACKENDS = ("pptx", "xml")
+
+_SP_TEMPLATE = (
+    '<p:sp><p:nvSpPr><p:cNvPr id="%d" name="%s"/><p:cNvSpPr/><p:nvPr/></p:nvSpPr>'
+    '<p:spPr><a:xfrm><a:off x="%d" y="%d"/><a:ext cx="%d" cy="%d"/></a:xfrm>'
+    '<a:prstGeom prst="%s"><a:avLst/></a:prstGeom>%s</p:spPr>'
+    '<p:style><a:lnRef idx="1"><a:schemeClr val="accent1"/></a:lnRef>'
+    '<a:fillRef idx="3"><a:schemeClr val="accent1"/></a:fillRef>'
+    '<a:effectRef idx="2"><a:schemeClr val="accent1"/></a:effectRef>'
+    '<a:fontRef idx="minor"><a:schemeClr val="lt1"/></a:fontRef></p:style>'
+    '<p:txBody>%s<a:lstStyle/>%s</p:txBody></p:sp>'
+)
+
+_TABLE_TEMPLATE = (
+    '<p:graphicFrame><p:nvGraphicFramePr><p:cNvPr id="%d" name="Table %d"/>'
+    '<p:cNvGraphicFramePr><a:graphicFrameLocks noGrp="1"/></p:cNvGraphicFramePr><p:nvPr/></p:nvGraphicFramePr>'
+    '<p:xfrm><a:off x="%d" y="%d"/><a:ext cx="%d" cy="%d"/></p:xfrm>'
+    '<a:graphic><a:graphicData uri="http://schemas.openxmlformats.org/drawingml/2006/table"><a:tbl>'
+    '<a:tblPr firstRow="%d" bandRow="1"><a:tableStyleId>{5C22544A-7EE6-4342-B048-85BDC9FD1C3A}</a:tableStyleId></a:tblPr>'
+    '<a:tblGrid>%s</a:tblGrid>%s</a:tbl></a:graphicData></a:graphic></p:graphicFrame>'
+)
+
+_EMPTY_BODY = ('<a:bodyPr rtlCol="0" anchor="ctr"/>', '<a:p><a:pPr algn="ctr"/></a:p>')
+
+_CTRL_CHARS = re.compile(r"([\x00-\x08\x0B-\x1F])")
+
+
+def escape_text(text: str) -> str:
+    """Экранирует управляющие символы так же, как python-pptx, и XML-спецсимволы"""
+    text = _CTRL_CHARS.sub(lambda match: "_x%04X_" % ord(match.group(1)), text)
+    return escape(text)
+
+
+def _table_row_xml(row: Sequence[str], height: int, r_pr: str, empty: str) -> str:
+    cells = []
+    for text in row:
+        if not text:
+            paragraphs = empty
+        elif "\n" in text:
+            paragraphs = "".join(
+                '<a:p><a:r>%s<a:t>%s</a:t></a:r></a:p>' % (r_pr, escape_text(line)) if line else empty
+                for line in text.split("\n")
+            )
+        else:
+            paragraphs = '<a:p><a:r>%s<a:t>%s</a:t></a:r></a:p>' % (r_pr, escape_text(text))
+        cells.append('<a:tc><a:txBody><a:bodyPr/><a:lstStyle/>%s</a:txBody><a:tcPr/></a:tc>' % paragraphs)
+    return '<a:tr h="%d">%s</a:tr>' % (height, "".join(cells))
+
+
+def table_xml(shape_id: int, x: float, y: float, headers: Optional[Sequence[str]],
+              rows: Sequence[Sequence[str]], layout: TableLayout, color: Optional[str] = None) -> str:
+    """XML-фрагмент p:graphicFrame таблицы; шапка - жирным, размеры - из layout"""
+    size = Pt(layout.font_size).centipoints
+    fill = '<a:solidFill><a:srgbClr val="%s"/></a:solidFill>' % color if color else ''
+    r_pr = '<a:rPr lang="ru-RU" sz="%d" dirty="0">%s</a:rPr>' % (size, fill)
+    empty = '<a:p><a:endParaRPr lang="ru-RU" sz="%d" dirty="0"/></a:p>' % size
+    parts = []
+    if headers:
+        header_r_pr = '<a:rPr lang="ru-RU" sz="%d" b="1" dirty="0">%s</a:rPr>' % (size, fill)
+        parts.append(_table_row_xml(headers, layout.header_height, header_r_pr, empty))
+    parts.extend(_table_row_xml(row, height, r_pr, empty) for row, height in zip(rows, layout.row_heights))
+    grid = "".join('<a:gridCol w="%d"/>' % width for width in layout.column_widths)
+    return _TABLE_TEMPLATE % (shape_id, shape_id - 1, int(x), int(y), layout.width, layout.height,
+                              1 if headers else 0, grid, "".join(parts))
+
+
+class XmlRenderBackend:
+    """Пакетный рендер элементов слайда через XML-фрагменты"""
+
+    def __init__(self, generator):
+        self.generator = generator
+        self._shape_types: Dict[MSO_SHAPE, Tuple[str, str]] = {}
+
+    def render_slide(self, slide, tree: List[Tuple[ContentElement, Optional[Tuple]]]) -> List[Tuple[ContentElement, Optional[object]]]:
+        """Рендерит элементы слайда, вставляя фигуры в p:spTree пачками
+
+        tree - пары (элемент, границы) в порядке отрисовки (SmartLayoutEngine.iter_tree).
+        Возвращает пары (элемент, p:sp или None, если фигура не создана) в том же порядке.
+        """
+        sp_tree = slide.slide.shapes._spTree
+        next_id = sp_tree.max_shape_id + 1
+        fragments = []
+        pending = []
+        shapes = [None] * len(tree)
+
+        for index, (element, bounds) in enumerate(tree):
+            if not bounds:
+                continue
+
+            x, y, width, height = bounds
+
+            if element.type in (ContentType.IMAGE, ContentType.CHART):
+                # Картинкам и диаграммам нужны связи с частями пакета - оставляем путь
+                # python-pptx, предварительно сбросив накопленные фигуры ради порядка слоев
+                for pending_index, sp in zip(pending, self._flush(sp_tree, fragments)):
+                    shapes[pending_index] = sp
+                fragments = []
+                pending = []
+                if element.type == ContentType.IMAGE:
+                    shape = slide._render_image_element(element, x, y, width, height)
+                else:
+                    shape = slide._render_chart_element(element, x, y, width, height)
+                shapes[index] = shape._element if shape is not None else None
+                next_id = sp_tree.max_shape_id + 1
+            else:
+                fragment = self.build_element_xml(element, next_id, x, y, width, height)
+                if fragment:
+                    fragments.append(fragment)
+                    pending.append(index)
+                    next_id += 1
+
+            self.generator.layout_engine.reserve_area(x, y, width, height)
+
+        for pending_index, sp in zip(pending, self._flush(sp_tree, fragments)):
+            shapes[pending_index] = sp
+        return [(element, sp) for (element, _), sp in zip(tree, shapes)]
+
+    def build_element(self, element: ContentElement, shape_id: int,
+                      x: float, y: float, width: float, height: float):
+        """Возвращает готовый (не вставленный в слайд) p:sp элемента или None"""
+        fragment = self.build_element_xml(element, shape_id, x, y, width, height)
+        if not fragment:
+            return None
+        return parse_xml('<p:spTree %s>%s</p:spTree>' % (nsdecls("a", "p"), fragment))[0]
+
+    def build_element_xml(self, element: ContentElement, shape_id: int,
+                          x: float, y: float, width: float, height: float) -> str:
+        """Возвращает XML-фрагмент p:sp для элемента или пустую строку"""
+        if element.type == ContentType.TEXT:
+            shape_type = MSO_SHAPE.RECTANGLE
+            body = self._text_body_xml(element, width, height)
+        elif element.type == ContentType.SHAPE:
+            shape_type = self.generator.graphics_builder._get_shape_type(
+                element.content.get('shape_type', 'rectangle') if isinstance(element.content, dict) else 'rectangle'
+            )
+            body = _EMPTY_BODY
+        elif element.type == ContentType.CONTAINER:
+            shape_type = MSO_SHAPE.RECTANGLE
+            body = _EMPTY_BODY
+        elif element.type == ContentType.TABLE:
+            return self._table_xml(element, shape_id, x, y, width, height)
+        else:
+            return ""
+
+        basename, prst = self._shape_type_info(shape_type)
+        name = escape("%s %d" % (basename, shape_id - 1), {'"': "&quot;"})
+        return _SP_TEMPLATE % (
+            shape_id, name, int(x), int(y), int(width), int(height), prst,
+            self._style_xml(element), body[0], body[1]
+        )
+
+    def _table_xml(self, element: ContentElement, shape_id: int,
+                   x: float, y: float, width: float, height: float) -> str:
+        """Таблица с размерами по измеренному тексту ячеек"""
+        layout = self.generator.text_module.table_layout(element, width)
+        text_style = element.style.text_style
+        color = str(text_style.font_color) if text_style and text_style.font_color else None
+        return table_xml(shape_id, x, y, element.content.get('headers'), element.content['rows'], layout, color)
+
+    def _shape_type_info(self, shape_type: MSO_SHAPE) -> Tuple[str, str]:
+        """Кэширует basename и prst для типа фигуры"""
+        info = self._shape_types.get(shape_type)
+        if info is None:
+            autoshape_type = AutoShapeType(shape_type)
+            info = (autoshape_type.basename, autoshape_type.prst)
+            self._shape_types[shape_type] = info
+        return info
+
+    def _style_xml(self, element: ContentElement) -> str:
+        """Заливка и граница - аналог Slide._apply_element_styles"""
+        return self.generator.style_compiler.compile(element.style).xml
+
+    def _text_body_xml(self, element: ContentElement, width: float, height: float) -> Tuple[str, str]:
+        """bodyPr и абзац текстового элемента - аналог Slide._render_text_element"""
+        font_size = self.generator.text_module.calculate_font_size(element, width, height)
+        compiled = self.generator.style_compiler.compile_text(element.style.text_style or TextStyle())
+
+        if compiled.anchor is not None:
+            body_pr = '<a:bodyPr rtlCol="0" anchor="%s"/>' % compiled.anchor
+        else:
+            body_pr = '<a:bodyPr rtlCol="0"/>'
+        r_pr = compiled.r_pr_xml.replace(' sz="0"', ' sz="%d"' % Pt(font_size).centipoints, 1)
+
+        text = element.content if isinstance(element.content, str) else str(element.content)
+        paragraph = '<a:p>%s<a:r>%s<a:t>%s</a:t></a:r></a:p>' % (compiled.p_pr_xml, r_pr, escape_text(text))
+        return body_pr, paragraph
+
+    @staticmethod
+    def _flush(sp_tree, fragments: List[str]) -> list:
+        """Разбирает накопленные фрагменты одним вызовом и переносит их в p:spTree"""
+        if not fragments:
+            return []
+
+        batch = parse_xml('<p:spTree %s>%s</p:spTree>' % (nsdecls("a", "p"), "".join(fragments)))
+        inserted = list(batch)
+        for sp in inserted:
+            XmlRenderBackend._insert(sp_tree, sp)
+        return inserted
+
+    @staticmethod
+    def _insert(sp_tree, sp):
+        """Добавляет фигуру в конец p:spTree (перед p:extLst, как python-pptx)"""
+        ext_lst = sp_tree.find(qn("p:extLst"))
+        if ext_lst is not None:
+            ext_lst.addprevious(sp)
+        else:
+            sp_tree.append(sp)
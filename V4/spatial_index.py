@@ -0,0 +1,162 @@
+# spatial_index.py - ПРОСТРАНСТВЕННЫЙ ИНДЕКС ЗАНЯТЫХ ОБЛАСТЕЙ
+"""
+Равномерная сетка для прямоугольников (x, y, width, height) в EMU.
+Каждый прямоугольник записывается во все ячейки, которые он покрывает,
+поэтому запрос пересечений смотрит только ячейки запроса, а не весь список.
+"""
+
+from .old_functions import Inches
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+import math
+
+Rect = Tuple[float, float, float, float]
+
+
+def rects_overlap(a: Rect, b: Rect) -> bool:
+    """Пересекаются ли прямоугольники (касание краями - не пересечение)"""
+    return a[0] < b[0] + b[2] and b[0] < a[0] + a[2] and a[1] < b[1] + b[3] and b[1] < a[1] + a[3]
+
+
+class OccupiedAreas:
+    """Занятые области слайда: список в порядке резервирования + сетка ячеек
+
+    Ведет себя как список прямоугольников (итерация, len, индекс, append),
+    поэтому код, читавший SmartLayoutEngine.occupied_areas, работает как раньше.
+    """
+
+    def __init__(self, areas=(), cell_size: float = Inches(1)):
+        self.cell_size = int(cell_size)
+        self._items: Dict[int, Rect] = {}
+        self._cells: Dict[Tuple[int, int], Set[int]] = {}
+        self._next_id = 0
+        for area in areas:
+            self.append(area)
+
+    # --- интерфейс списка ---
+
+    def append(self, rect: Rect):
+        rect = tuple(rect)
+        item_id = self._next_id
+        self._next_id += 1
+        self._items[item_id] = rect
+        for cell in self._cells_for(rect):
+            self._cells.setdefault(cell, set()).add(item_id)
+
+    def __iter__(self) -> Iterator[Rect]:
+        return iter(self._items.values())
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __getitem__(self, index):
+        return list(self._items.values())[index]
+
+    def __eq__(self, other) -> bool:
+        return list(self) == list(other)
+
+    def __repr__(self) -> str:
+        return f"OccupiedAreas({list(self)!r})"
+
+    def clear(self):
+        self._items.clear()
+        self._cells.clear()
+
+    def copy(self) -> 'OccupiedAreas':
+        return OccupiedAreas(self, self.cell_size)
+
+    # --- запросы ---
+
+    def query_overlaps(self, rect: Rect) -> List[Rect]:
+        """Занятые области, пересекающие rect (в порядке резервирования)"""
+        return [self._items[item_id] for item_id in self._overlapping_ids(rect)]
+
+    def remove(self, rect: Rect) -> bool:
+        """Освобождает одну область, равную rect; False, если такой нет"""
+        rect = tuple(rect)
+        for item_id in self._candidate_ids(rect):
+            if self._items[item_id] == rect:
+                for cell in self._cells_for(rect):
+                    bucket = self._cells[cell]
+                    bucket.discard(item_id)
+                    if not bucket:
+                        del self._cells[cell]
+                del self._items[item_id]
+                return True
+        return False
+
+    def nearest_free(self, rect: Rect, bounds: Rect) -> Optional[Rect]:
+        """Ближайшее к rect положение того же размера внутри bounds без пересечений
+
+        Кандидаты по Y - исходный y, края bounds и края занятых областей.
+        Для каждой полосы [y, y + height) свободные промежутки по X берутся
+        из областей, попавших в полосу; перебор останавливается, когда
+        сдвиг по Y уже больше лучшего найденного расстояния.
+        """
+        x0, y0, width, height = rect
+        bx, by, bw, bh = bounds
+        if width > bw or height > bh:
+            return None
+
+        min_x, max_x = bx, bx + bw - width
+        min_y, max_y = by, by + bh - height
+        ys = {min(max(y0, min_y), max_y), min_y, max_y}
+        for _, oy, _, oh in self._items.values():
+            ys.update((oy + oh, oy - height))
+        ys = sorted((y for y in ys if min_y <= y <= max_y), key=lambda y: abs(y - y0))
+
+        best = None
+        best_distance = math.inf
+        for y in ys:
+            if abs(y - y0) >= best_distance:
+                break
+            x = self._nearest_free_x(x0, y, width, height, min_x, max_x)
+            if x is not None:
+                distance = math.hypot(x - x0, y - y0)
+                if distance < best_distance:
+                    best, best_distance = (x, y, width, height), distance
+        return best
+
+    def _nearest_free_x(self, x0: float, y: float, width: float, height: float,
+                        min_x: float, max_x: float) -> Optional[float]:
+        """Ближайший к x0 x в полосе [y, y + height), где помещается ширина width"""
+        band = (min_x, y, max_x + width - min_x, height)
+        blockers = sorted((ox, ox + ow) for ox, _, ow, _ in self.query_overlaps(band))
+
+        best = None
+        gap_start = min_x
+        for start, end in blockers + [(max_x + width, max_x + width)]:
+            if start - gap_start >= width:
+                x = min(max(x0, gap_start), start - width)
+                if best is None or abs(x - x0) < abs(best - x0):
+                    best = x
+            gap_start = max(gap_start, end)
+        return best
+
+    # --- сетка ---
+
+    def _cells_for(self, rect: Rect) -> Iterator[Tuple[int, int]]:
+        x, y, width, height = rect
+        size = self.cell_size
+        first_col, last_col = int(x // size), int((x + max(width, 1) - 1) // size)
+        first_row, last_row = int(y // size), int((y + max(height, 1) - 1) // size)
+        for col in range(first_col, last_col + 1):
+            for row in range(first_row, last_row + 1):
+                yield (col, row)
+
+    def _candidate_ids(self, rect: Rect) -> List[int]:
+        candidates = set()
+        cells = self._cells
+        for cell in self._cells_for(rect):
+            bucket = cells.get(cell)
+            if bucket:
+                candidates.update(bucket)
+        return sorted(candidates)
+
+    def _overlapping_ids(self, rect: Rect, first_only: bool = False) -> List[int]:
+        found = []
+        for item_id in self._candidate_ids(rect):
+            if rects_overlap(rect, self._items[item_id]):
+                found.append(item_id)
+                if first_only:
+                    break
+        return found
@@ -1,6 +1,12 @@
 # styles_module.py - СИСТЕМА СТИЛЕЙ И ТЕМ
 from .old_functions import ContentElement, ElementStyle, BorderStyle, TextStyle, RGBColor, Pt
-from typing import Dict
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import nsdecls
+from pptx.enum.text import PP_ALIGN, MSO_ANCHOR
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+import copy
 
 class StyleSystem:
     """Система управления стилями элементов"""
@@ -45,6 +51,17 @@ class StyleSystem:
         
         return element
     
+    @staticmethod
+    def border_width_emu(width_value) -> int:
+        """Преобразует ширину границы (Pt или число точек) в EMU (1 point = 12700 EMU)"""
+        if hasattr(width_value, 'pt'):  # Если это объект Pt
+            width_emu = int(width_value.pt * 12700)
+        else:  # Если это число
+            width_emu = int(width_value * 12700)
+
+        # Проверяем диапазон (0-20116800 EMU)
+        return max(0, min(20116800, width_emu))
+
     def define_style_class(self, class_name: str, style_config: Dict):
         """Определяет класс стилей для повторного использования"""
         self.style_classes[class_name] = style_config
@@ -72,4 +89,172 @@ class StyleSystem:
             variant['text'] = RGBColor(33, 33, 33)
             variant['footnote'] = RGBColor(100, 100, 100)
         
-        return variant
\ No newline at end of file
+        return variant
+
+@dataclass(frozen=True)
+class CompiledStyle:
+    """Готовые заливка и граница фигуры: XML-строки и разобранные элементы"""
+    fill_xml: str
+    line_xml: str
+    fill: object
+    line: object
+
+    @property
+    def xml(self) -> str:
+        return self.fill_xml + self.line_xml
+
+
+@dataclass(frozen=True)
+class CompiledTextStyle:
+    """Готовые свойства текста: anchor для bodyPr, a:pPr и шаблон a:rPr (sz="0")"""
+    anchor: Optional[str]
+    p_pr_xml: str
+    r_pr_xml: str
+    p_pr: object
+    r_pr: object
+
+
+class StyleCompiler:
+    """Компилирует сочетания стилей в XML один раз и хранит их в LRU-кэше
+
+    Ключ заливки/границы - (background_color, цвет границы, ширина в EMU),
+    ключ текста - (bold, italic, font_color, align, vertical_align).
+    Фигуры получают глубокие копии закэшированных элементов.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._reset_caches()
+
+    def _reset_caches(self):
+        self._compile_style = lru_cache(maxsize=self.maxsize)(self._build_style)
+        self._compile_text = lru_cache(maxsize=self.maxsize)(self._build_text)
+
+    def __getstate__(self):
+        # Кэш на lru_cache не сериализуется - воркеры строят свой
+        return {"maxsize": self.maxsize}
+
+    def __setstate__(self, state):
+        self.maxsize = state["maxsize"]
+        self._reset_caches()
+
+    @staticmethod
+    def style_key(style: ElementStyle) -> Tuple:
+        border = style.border
+        if not (border and border.color):
+            return (style.background_color, None, None)
+
+        width = None
+        if border.width:
+            try:
+                width = StyleSystem.border_width_emu(border.width)
+            except (ValueError, TypeError) as e:
+                print(f"⚠️  Ошибка установки ширины границы: {e}")
+                width = 12700  # Значение по умолчанию: 1 точка
+        return (style.background_color, border.color, width)
+
+    @staticmethod
+    def text_key(text_style: TextStyle) -> Tuple:
+        return (bool(text_style.bold), bool(text_style.italic), text_style.font_color,
+                text_style.align, text_style.vertical_align)
+
+    def compile(self, style: ElementStyle) -> CompiledStyle:
+        """Заливка и граница для ElementStyle"""
+        return self._compile_style(self.style_key(style))
+
+    def compile_text(self, text_style: TextStyle) -> CompiledTextStyle:
+        """Свойства абзаца и текста для TextStyle"""
+        return self._compile_text(self.text_key(text_style))
+
+    @staticmethod
+    def _build_style(key: Tuple) -> CompiledStyle:
+        background_color, border_color, border_width = key
+
+        if background_color:
+            fill_xml = '<a:solidFill><a:srgbClr val="%s"/></a:solidFill>' % str(background_color)
+        else:
+            fill_xml = '<a:noFill/>'
+
+        if border_color:
+            width_attr = ' w="%d"' % border_width if border_width is not None else ''
+            line_xml = '<a:ln%s><a:solidFill><a:srgbClr val="%s"/></a:solidFill></a:ln>' % (
+                width_attr, str(border_color)
+            )
+        else:
+            line_xml = '<a:ln><a:noFill/></a:ln>'
+
+        return CompiledStyle(fill_xml, line_xml, _parse_fragment(fill_xml), _parse_fragment(line_xml))
+
+    @staticmethod
+    def _build_text(key: Tuple) -> CompiledTextStyle:
+        bold, italic, font_color, align, vertical_align = key
+
+        anchor = MSO_ANCHOR.to_xml(vertical_align) if vertical_align is not None else None
+        if align is not None:
+            p_pr_xml = '<a:pPr algn="%s"/>' % PP_ALIGN.to_xml(align)
+        else:
+            p_pr_xml = '<a:pPr/>'
+
+        r_pr_attrs = ' sz="0" b="%d" i="%d"' % (bold, italic)
+        if font_color:
+            r_pr_xml = '<a:rPr%s><a:solidFill><a:srgbClr val="%s"/></a:solidFill></a:rPr>' % (
+                r_pr_attrs, str(font_color)
+            )
+        else:
+            r_pr_xml = '<a:rPr%s/>' % r_pr_attrs
+
+        return CompiledTextStyle(anchor, p_pr_xml, r_pr_xml,
+                                 _parse_fragment(p_pr_xml), _parse_fragment(r_pr_xml))
+
+    def apply(self, shape, style: ElementStyle):
+        """Ставит копии закэшированных заливки и границы в spPr фигуры"""
+        compiled = self.compile(style)
+        sp_pr = shape._element.spPr
+        sp_pr._remove_eg_fillProperties()
+        sp_pr._remove_ln()
+        line = sp_pr._insert_ln(copy.deepcopy(compiled.line))
+        line.addprevious(copy.deepcopy(compiled.fill))
+
+    def apply_text(self, shape, text_style: TextStyle, text: str, font_size: float):
+        """Заполняет текстовую рамку фигуры одним абзацем с закэшированными свойствами"""
+        compiled = self.compile_text(text_style)
+        text_frame = shape.text_frame
+        text_frame.clear()
+
+        body_pr = text_frame._txBody.bodyPr
+        if compiled.anchor is None:
+            body_pr.attrib.pop("anchor", None)
+        else:
+            body_pr.set("anchor", compiled.anchor)
+
+        p = text_frame.paragraphs[0]._p
+        p._remove_pPr()
+        p.insert(0, copy.deepcopy(compiled.p_pr))
+
+        r = p.add_r()
+        r.text = text
+        r_pr = copy.deepcopy(compiled.r_pr)
+        r_pr.set("sz", str(Pt(font_size).centipoints))
+        r.insert(0, r_pr)
+
+    def stats(self) -> Dict[str, float]:
+        """Счетчики попаданий/промахов обоих кэшей - для подбора maxsize"""
+        stats = {}
+        for name, cache in (("style", self._compile_style), ("text", self._compile_text)):
+            info = cache.cache_info()
+            total = info.hits + info.misses
+            stats[name] = {
+                "hits": info.hits,
+                "misses": info.misses,
+                "size": info.currsize,
+                "maxsize": info.maxsize,
+                "hit_rate": info.hits / total if total else 0.0,
+            }
+        return stats
+
+    def clear(self):
+        self._reset_caches()
+
+
+def _parse_fragment(xml: str):
+    return parse_xml('<a:root %s>%s</a:root>' % (nsdecls("a"), xml))[0]
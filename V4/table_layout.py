@@ -0,0 +1,153 @@
+# table_layout.py - РАЗМЕТКА ТАБЛИЦЫ: СТОЛБЦЫ, СТРОКИ, СТРАНИЦЫ
+"""
+Ширины столбцов и высоты строк таблицы по измеренному тексту ячеек
+(TextMeasurer) и разбивка строк на страницы-слайды.
+
+Ширина каждой ячейки в единицах шрифта берется из общего кэша ширин
+одним вызовом на ячейку. Если таблица шире места, узкие столбцы сохраняют
+ширину самой широкой ячейки, а широкие делят остаток пропорционально ей
+(как автоматическая раскладка таблиц в HTML); иначе запас делится
+пропорционально между всеми столбцами. Строка, в которой все ячейки
+помещаются в одну строку текста, не переносится по словам - перенос
+считается только для длинных ячеек.
+"""
+
+from .font_metrics import TextMeasurer, DEFAULT_FONT, DEFAULT_INSET_X, DEFAULT_INSET_Y, EMU_PER_POINT
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+# Поля ячейки таблицы PowerPoint по умолчанию (marL/marR и marT/marB)
+CELL_MARGIN_X = DEFAULT_INSET_X
+CELL_MARGIN_Y = DEFAULT_INSET_Y
+
+Row = Tuple[str, ...]
+
+
+@dataclass
+class TableLayout:
+    """Размеры таблицы в EMU; header_height - 0, если шапки нет"""
+    column_widths: List[int]
+    row_heights: List[int]
+    header_height: int
+    font_size: float
+
+    @property
+    def width(self) -> int:
+        return sum(self.column_widths)
+
+    @property
+    def height(self) -> int:
+        return self.header_height + sum(self.row_heights)
+
+    def pages(self, available_height: float) -> List[Tuple[int, int]]:
+        """Отрезки строк [start, end), помещающиеся по высоте вместе с шапкой"""
+        return paginate_rows(self.row_heights, available_height, self.header_height)
+
+    def page(self, start: int, end: int) -> 'TableLayout':
+        return TableLayout(self.column_widths, self.row_heights[start:end], self.header_height, self.font_size)
+
+
+def _cell_text(value) -> str:
+    return "" if value is None else value if isinstance(value, str) else str(value)
+
+
+def table_rows(data: Iterable[Sequence], columns: Optional[int] = None) -> List[Row]:
+    """Строки таблицы из любого итератора (список списков, курсор запроса) - кортежи строк
+
+    Короткие строки дополняются пустыми ячейками до columns, длинные обрезаются.
+    """
+    rows = [tuple(map(_cell_text, row)) for row in data]
+    if columns is None:
+        columns = max((len(row) for row in rows), default=0)
+    padding = ("",) * columns
+    return [row if len(row) == columns else (row + padding)[:columns] for row in rows]
+
+
+def measure_table(measurer: TextMeasurer, headers: Optional[Sequence[str]], rows: Sequence[Row],
+                  width: float, font_size: float, font_name: str = DEFAULT_FONT) -> TableLayout:
+    """Ширины столбцов по самой широкой ячейке и высоты строк с переносом по словам"""
+    columns = len(headers) if headers else len(rows[0]) if rows else 0
+    if not columns:
+        return TableLayout([], [], 0, font_size)
+
+    units = measurer._units
+    regular = measurer.metrics(font_name, False)
+    bold = measurer.metrics(font_name, True)
+    scale = font_size * EMU_PER_POINT / regular.units_per_em
+    bold_scale = font_size * EMU_PER_POINT / bold.units_per_em
+
+    # Ширина каждой ячейки один раз: нужна и для столбцов, и для высоты строк
+    row_units = [[units(font_name, False, text) for text in row] for row in rows]
+    natural = [0.0] * columns
+    for cells in row_units:
+        for column, cell in enumerate(cells):
+            if cell > natural[column]:
+                natural[column] = cell
+    natural = [cell * scale for cell in natural]
+    header_units = [units(font_name, True, text) for text in headers] if headers else None
+    if header_units:
+        natural = [max(cell, header * bold_scale) for cell, header in zip(natural, header_units)]
+
+    column_widths = _column_widths([cell + 2 * CELL_MARGIN_X for cell in natural], width)
+
+    line_height = measurer.line_height(font_size, font_name)
+    inner = [max(column - 2 * CELL_MARGIN_X, 1) for column in column_widths]
+
+    def row_height(row: Sequence[str], cells: List[int], limits: List[float], bold_row: bool) -> int:
+        lines = 1
+        for column, cell in enumerate(cells):
+            text = row[column]
+            if cell <= limits[column] and "\n" not in text:
+                continue
+            lines = max(lines, measurer.count_lines(text, inner[column], font_size, font_name, bold_row))
+        return lines * line_height + 2 * CELL_MARGIN_Y
+
+    header_height = 0
+    if header_units:
+        header_height = row_height(headers, header_units, [column / bold_scale for column in inner], True)
+    limits = [column / scale for column in inner]
+    row_heights = [row_height(row, cells, limits, False) for row, cells in zip(rows, row_units)]
+    return TableLayout(column_widths, row_heights, header_height, font_size)
+
+
+def _column_widths(desired: List[float], width: float) -> List[int]:
+    """Ширины столбцов, в сумме ровно width"""
+    columns = range(len(desired))
+    widths = list(desired)
+    if sum(desired) > width:
+        # Столбцы уже равной доли остатка получают свою ширину, остальные делят остаток
+        remaining = width
+        wide = list(columns)
+        while wide:
+            share = remaining / len(wide)
+            narrow = [column for column in wide if desired[column] <= share]
+            if not narrow:
+                break
+            remaining -= sum(desired[column] for column in narrow)
+            wide = [column for column in wide if desired[column] > share]
+        total = sum(desired[column] for column in wide)
+        for column in wide:
+            widths[column] = desired[column] * remaining / total
+    else:
+        widths = [cell * width / sum(desired) for cell in desired]
+    result = [int(cell) for cell in widths]
+    result[-1] += int(width) - sum(result)
+    return result
+
+
+def paginate_rows(row_heights: Sequence[int], available_height: float, header_height: int = 0) -> List[Tuple[int, int]]:
+    """Отрезки строк [start, end) для страниц высотой available_height с шапкой на каждой
+
+    На странице всегда есть хотя бы одна строка, даже если она выше страницы.
+    """
+    pages = []
+    start = 0
+    used = header_height
+    for index, height in enumerate(row_heights):
+        if used + height > available_height and index > start:
+            pages.append((start, index))
+            start = index
+            used = header_height
+        used += height
+    pages.append((start, len(row_heights)))
+    return pages
@@ -0,0 +1,163 @@
+# template_cache.py - КЭШ БАЗОВОГО ШАБЛОНА ПРЕЗЕНТАЦИИ
+"""
+Presentation() каждый раз заново открывает и разбирает пакет шаблона
+(мастер, 11 макетов, тема). Здесь шаблон разбирается один раз на процесс,
+а каждая новая колода получает клон графа частей:
+
+- бинарные части делят неизменяемые bytes с шаблоном;
+- XML-части копируют дерево шаблона только при первом обращении к _element
+  (copy-on-write); нетронутые части сохраняются готовой сериализацией шаблона;
+- связи (rels) у клона свои, поэтому добавление слайдов шаблон не меняет.
+"""
+
+from pptx.opc.constants import CONTENT_TYPE as CT
+from pptx.opc.oxml import serialize_part_xml
+from pptx.opc.package import XmlPart, _Relationship, _Relationships
+from pptx.opc.packuri import PACKAGE_URI
+from pptx.package import Package
+from typing import Dict, Optional, Tuple
+import copy
+import os
+import threading
+
+import pptx
+
+_DEFAULT_TEMPLATE = os.path.join(os.path.dirname(pptx.__file__), "templates", "default.pptx")
+
+# Главная часть .potx - шаблон; у клона она становится обычной презентацией
+_MAIN_CONTENT_TYPES = (CT.PML_PRESENTATION_MAIN, CT.PML_PRES_MACRO_MAIN, CT.PML_SLIDESHOW_MAIN)
+
+# Поля, которые у каждого клона свои
+_PER_CLONE_FIELDS = ("_rels", "_element", "_package")
+
+
+class _CopyOnAccessElement:
+    """Дескриптор без __set__: копия попадает в __dict__ и дальше перекрывает его"""
+
+    def __get__(self, part, owner=None):
+        if part is None:
+            return self
+        element = copy.deepcopy(part._template_part._element)
+        part.__dict__["_element"] = element
+        return element
+
+
+class _CopyOnWritePart:
+    """Примесь к классу XML-части клона"""
+
+    _element = _CopyOnAccessElement()
+
+    @property
+    def blob(self) -> bytes:
+        if "_element" not in self.__dict__:
+            return self._template_blob
+        return serialize_part_xml(self._element)
+
+
+_cow_classes: Dict[type, type] = {}
+
+
+def _cow_class(part_class: type) -> type:
+    cow_class = _cow_classes.get(part_class)
+    if cow_class is None:
+        cow_class = type(part_class.__name__, (_CopyOnWritePart, part_class), {})
+        _cow_classes[part_class] = cow_class
+    return cow_class
+
+
+class _TemplateSource:
+    """Разобранный один раз пакет шаблона"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.package = Package.open(path)
+        main_part = self.package.main_document_part
+        if main_part.content_type == CT.PML_TEMPLATE_MAIN:
+            main_part._content_type = CT.PML_PRESENTATION_MAIN
+            main_part.__dict__.pop("content_type", None)
+        elif main_part.content_type not in _MAIN_CONTENT_TYPES:
+            raise ValueError(f"Файл '{path}' не является презентацией PowerPoint "
+                             f"(content type: {main_part.content_type})")
+
+        self.parts = tuple(self.package.iter_parts())
+        # Сериализация нетронутых XML-частей - один раз
+        self.blobs = {
+            part.partname: serialize_part_xml(part._element)
+            for part in self.parts if isinstance(part, XmlPart)
+        }
+
+    def clone(self):
+        """Новый Package с теми же частями; возвращает pptx.presentation.Presentation"""
+        package = object.__new__(type(self.package))
+        package._pkg_file = self.path
+
+        clones = {}
+        for part in self.parts:
+            if isinstance(part, XmlPart):
+                clone = object.__new__(_cow_class(type(part)))
+                clone._template_part = part
+                clone._template_blob = self.blobs[part.partname]
+            else:
+                clone = object.__new__(type(part))
+            # Собственные поля части (_partname, _blob, _filename ...), без кэшей lazyproperty
+            clone.__dict__.update(
+                (name, value) for name, value in part.__dict__.items()
+                if name.startswith("_") and name not in _PER_CLONE_FIELDS
+            )
+            clone._package = package
+            clones[part] = clone
+
+        package.__dict__["_rels"] = _clone_rels(self.package._rels, PACKAGE_URI.baseURI, clones)
+        for part, clone in clones.items():
+            clone.__dict__["_rels"] = _clone_rels(part.rels, part.partname.baseURI, clones)
+
+        return package.main_document_part.presentation
+
+
+def _clone_rels(rels: _Relationships, base_uri: str, clones: Dict) -> _Relationships:
+    cloned = _Relationships(base_uri)
+    for r_id, rel in rels.items():
+        target = rel.target_ref if rel.is_external else clones[rel.target_part]
+        cloned._rels[r_id] = _Relationship(base_uri, r_id, rel.reltype, rel._target_mode, target)
+    return cloned
+
+
+class TemplateCache:
+    """Шаблоны по пути (и времени изменения файла), общие для всего процесса"""
+
+    def __init__(self):
+        self._sources: Dict[Tuple[str, float], _TemplateSource] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def presentation(self, template: Optional[str] = None):
+        """Новая презентация на основе шаблона (по умолчанию - встроенного в python-pptx)"""
+        path = os.path.abspath(template) if template else _DEFAULT_TEMPLATE
+        key = (path, os.path.getmtime(path))
+
+        source = self._sources.get(key)
+        if source is None:
+            with self._lock:
+                source = self._sources.get(key)
+                if source is None:
+                    source = _TemplateSource(path)
+                    self._sources[key] = source
+                    self.misses += 1
+                else:
+                    self.hits += 1
+        else:
+            self.hits += 1
+        return source.clone()
+
+    def clear(self):
+        with self._lock:
+            self._sources.clear()
+
+
+TEMPLATE_CACHE = TemplateCache()
+
+
+def new_presentation(template: Optional[str] = None):
+    """Замена Presentation(template) с разбором шаблона один раз на процесс"""
+    return TEMPLATE_CACHE.presentation(template)
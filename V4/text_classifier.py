@@ -0,0 +1,191 @@
+# text_classifier.py - КЛАССИФИКАЦИЯ ТЕКСТА ПО СОДЕРЖАНИЮ
+"""
+Категория текста (caption / subtitle / main / title) по тем же правилам,
+что были в AdvancedTextModule._detect_text_type: вместо цепочки
+any(marker in text ...) маркеры ищутся одним заранее скомпилированным
+регулярным выражением, а результат для каждой строки запоминается в LRU-кэше
+(ключ - сама строка, то есть ее хеш). Доля заглавных букв считается только
+при первом обращении к ней - для категории она не нужна.
+
+category() / categories() возвращают только категорию: на потоке разных
+строк основная цена - создание объектов признаков и вытеснение из LRU,
+поэтому категории хранятся в простом словаре строка -> категория, который
+очищается целиком при заполнении.
+"""
+
+from functools import lru_cache
+from itertools import islice
+from typing import Dict, Iterable, List, Optional
+import re
+
+# Маркеры списков и нумерации: •, -, —, · и "1." / "2." / "3."
+_MARKERS = re.compile(r"[•\-—·]|[123]\.")
+_UPPERCASE = re.compile(r"[A-ZА-ЯЁ]")
+
+# Границы длины: короче CAPTION_MAX - подпись, заголовок - короче TITLE_MAX,
+# длиннее MAIN_MIN - всегда основной текст
+CAPTION_MAX = 15
+TITLE_MAX = 50
+MAIN_MIN = 100
+
+LENGTH_BUCKETS = ("short", "medium", "long", "very_long")
+
+# По стольким первым строкам categories() решает, кэшировать ли остальные
+ADAPT_SAMPLE = 4096
+
+
+class TextFeatures:
+    """Категория текста и признаки, по которым она выбрана"""
+
+    __slots__ = ("text", "category", "length", "marker", "is_upper", "_uppercase_ratio")
+
+    def __init__(self, text: str, category: str, length: int, marker: Optional[str], is_upper: bool):
+        self.text = text
+        self.category = category
+        self.length = length
+        # Первый найденный маркер списка или нумерации
+        self.marker = marker
+        self.is_upper = is_upper
+        self._uppercase_ratio = None
+
+    @property
+    def has_marker(self) -> bool:
+        return self.marker is not None
+
+    @property
+    def length_bucket(self) -> str:
+        if self.length < CAPTION_MAX:
+            return "short"
+        if self.length < TITLE_MAX:
+            return "medium"
+        if self.length <= MAIN_MIN:
+            return "long"
+        return "very_long"
+
+    @property
+    def uppercase_ratio(self) -> float:
+        """Доля заглавных букв среди непробельных символов"""
+        if self._uppercase_ratio is None:
+            visible = self.length - self.text.count(" ")
+            self._uppercase_ratio = len(_UPPERCASE.findall(self.text)) / visible if visible else 0.0
+        return self._uppercase_ratio
+
+    def as_dict(self) -> Dict:
+        return {"category": self.category, "length": self.length, "length_bucket": self.length_bucket,
+                "marker": self.marker, "is_upper": self.is_upper, "uppercase_ratio": self.uppercase_ratio}
+
+    def __repr__(self) -> str:
+        return (f"TextFeatures(category={self.category!r}, length={self.length}, "
+                f"marker={self.marker!r}, is_upper={self.is_upper})")
+
+
+def _category(text: str, length: int, marker: Optional[str], is_upper: bool) -> str:
+    if length < CAPTION_MAX:
+        return "caption"
+    if marker is not None:
+        return "subtitle"
+    if length > MAIN_MIN:
+        return "main"
+    if length < TITLE_MAX and (is_upper or text[0].isupper() and text[-1] in "!?:"):
+        return "title"
+    return "main"
+
+
+def text_category(text: str) -> str:
+    """Только категория строки (без кэша и без объекта признаков)"""
+    length = len(text)
+    if length < CAPTION_MAX:
+        return "caption"
+    return _category(text, length, _MARKERS.search(text), False if length >= TITLE_MAX else text.isupper())
+
+
+def classify_text(text: str) -> TextFeatures:
+    """Категория и признаки одной строки (без кэша)"""
+    length = len(text)
+    match = _MARKERS.search(text)
+    marker = match.group() if match else None
+    is_upper = text.isupper()
+    return TextFeatures(text, _category(text, length, marker, is_upper), length, marker, is_upper)
+
+
+class TextClassifier:
+    """classify_text с LRU-кэшем по строке и пакетной классификацией"""
+
+    def __init__(self, maxsize: int = 65536):
+        self.maxsize = maxsize
+        self._reset_caches()
+
+    def _reset_caches(self):
+        self.classify = lru_cache(maxsize=self.maxsize)(classify_text)
+        self._categories: Dict[str, str] = {}
+
+    def __getstate__(self):
+        # Кэш на lru_cache не сериализуется - воркеры строят свой
+        return {"maxsize": self.maxsize}
+
+    def __setstate__(self, state):
+        self.maxsize = state["maxsize"]
+        self._reset_caches()
+
+    def classify_many(self, texts: Iterable[str]) -> List[TextFeatures]:
+        """Признаки для списка строк; повторы внутри списка считаются один раз"""
+        classify = self.classify
+        seen: Dict[str, TextFeatures] = {}
+        result = []
+        for text in texts:
+            features = seen.get(text)
+            if features is None:
+                features = seen[text] = classify(text)
+            result.append(features)
+        return result
+
+    def category(self, text: str) -> str:
+        """Только категория строки (с кэшем)"""
+        category = self._categories.get(text)
+        if category is None:
+            category = text_category(text)
+            if len(self._categories) >= self.maxsize:
+                self._categories.clear()
+            self._categories[text] = category
+        return category
+
+    def categories(self, texts: Iterable[str]) -> List[str]:
+        """Только категории списка строк - без объектов признаков
+
+        Если среди первых ADAPT_SAMPLE строк почти нет повторов, остаток
+        списка классифицируется без кэша: хеширование и вставка уникальных
+        строк стоят дороже самой классификации.
+        """
+        iterator = iter(texts)
+        result: List[str] = []
+        sample = list(islice(iterator, ADAPT_SAMPLE))
+        hits = self._extend_cached(sample, result)
+        if hits * 10 < len(sample):
+            result.extend(map(text_category, iterator))
+        else:
+            self._extend_cached(iterator, result)
+        return result
+
+    def _extend_cached(self, texts: Iterable[str], result: List[str]) -> int:
+        """Дописывает категории в result через кэш; возвращает число попаданий"""
+        cache = self._categories
+        get = cache.get
+        append = result.append
+        hits = 0
+        for text in texts:
+            category = get(text)
+            if category is None:
+                category = text_category(text)
+                if len(cache) >= self.maxsize:
+                    cache.clear()
+                cache[text] = category
+            else:
+                hits += 1
+            append(category)
+        return hits
+
+    def cache_info(self):
+        return {"classify": self.classify.cache_info(), "categories": len(self._categories)}
+
+    def clear(self):
+        self._reset_caches()
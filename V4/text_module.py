@@ -1,9 +1,17 @@
 # text_module.py
 from .old_functions import ContentElement, TextStyle, ElementStyle, BorderStyle, Inches, Pt, RGBColor
-from typing import Dict
+from .old_functions import ContentType, LayoutStrategy
+from .font_metrics import TextMeasurer, FitBox, DEFAULT_FONT, DEFAULT_INSET_X, DEFAULT_INSET_Y
+from .line_breaking import LineBreaker, TextLayout
+from .text_classifier import TextClassifier
+from .table_layout import TableLayout, table_rows, measure_table
+from .layout_engine import SlideLayoutState
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import itertools
+import time
 
 class AdvancedTextModule:
-    def __init__(self):
+    def __init__(self, font_name: str = DEFAULT_FONT):
         self.FONT_CONFIG = {
             "title": {"base": 22, "min": 18, "max": 32},
             "subtitle": {"base": 20, "min": 18, "max": 24},
@@ -11,6 +19,14 @@ class AdvancedTextModule:
             "caption": {"base": 12, "min": 10, "max": 14},
             "footnote": {"base": 10, "min": 8, "max": 12}
         }
+        # Шрифт, которым PowerPoint отрисует текст (тема шаблона по умолчанию - Calibri)
+        self.font_name = font_name
+        self.measurer = TextMeasurer()
+        self.line_breaker = LineBreaker(self.measurer)
+        self.classifier = TextClassifier()
+        self.fit_stats: Dict[str, float] = {}
+        # Номера таблиц без явного element_id (id() списка строк повторяется после его удаления)
+        self._table_ids = itertools.count(1)
     
     def create_text_element(self, text: str, x: float = None, y: float = None, 
                           width: float = None, height: float = None, **kwargs) -> ContentElement:
@@ -52,28 +68,161 @@ class AdvancedTextModule:
         
         return element
     
+    def create_table(self, data: Iterable[Sequence], headers: Optional[Sequence[str]] = None,
+                     x: float = None, y: float = None, width: float = None, height: float = None,
+                     element_id: str = None, font_size: float = None, **kwargs) -> ContentElement:
+        """Таблица из строк data - списка или любого итератора строк (например, курсора запроса)
+        
+        Значения ячеек приводятся к строкам один раз; XML всех ячеек строится при
+        рендере одной строкой. Разбивку на слайды делает paginate_table.
+        """
+        headers = [str(header) for header in headers] if headers else None
+        rows = table_rows(data, len(headers) if headers else None)
+        element = ContentElement(
+            id=element_id or f"table_{next(self._table_ids)}",
+            type=ContentType.TABLE,
+            content={"headers": headers, "rows": rows},
+            x=x, y=y, width=width, height=height
+        )
+        
+        if font_size or 'text_color' in kwargs:
+            element.style.text_style = TextStyle(font_size=font_size, font_color=kwargs.get('text_color'))
+        return element
+    
+    def table_layout(self, element: ContentElement, available_width: float) -> TableLayout:
+        """Ширины столбцов и высоты строк таблицы в границах элемента
+        
+        Разметка хранится на самом элементе (revision, ширина, TableLayout) и
+        считается заново, только когда он изменился или сменилась ширина.
+        """
+        cached = element.__dict__.get('_table_layout')
+        if cached and cached[:2] == (element.revision, available_width):
+            return cached[2]
+        
+        text_style = element.style.text_style
+        font_size = text_style.font_size if text_style and text_style.font_size else self.FONT_CONFIG["caption"]["base"]
+        layout = measure_table(self.measurer, element.content.get('headers'), element.content['rows'],
+                               available_width, font_size, self.font_name)
+        element._table_layout = (element.revision, available_width, layout)
+        return layout
+    
+    def paginate_table(self, element: ContentElement, available_width: float,
+                       available_height: float) -> List[ContentElement]:
+        """Делит таблицу на части, помещающиеся по высоте; шапка повторяется в каждой части
+        
+        Разметка считается один раз на всю таблицу и запоминается для каждой части.
+        """
+        layout = self.table_layout(element, available_width)
+        pages = layout.pages(available_height)
+        if len(pages) == 1:
+            return [element]
+        
+        headers = element.content.get('headers')
+        rows = element.content['rows']
+        parts = []
+        for index, (start, end) in enumerate(pages):
+            part = ContentElement(
+                id=f"{element.id}_{index + 1}",
+                type=ContentType.TABLE,
+                content={"headers": headers, "rows": rows[start:end]},
+                style=element.style,
+                x=element.x, y=element.y, width=element.width, height=element.height,
+                metadata={**element.metadata, "table_page": (index + 1, len(pages))}
+            )
+            part._table_layout = (part.revision, available_width, layout.page(start, end))
+            parts.append(part)
+        return parts
+    
     def calculate_font_size(self, element: ContentElement, available_width: float, available_height: float) -> float:
         if not isinstance(element.content, str):
             return self.FONT_CONFIG["main"]["base"]
         
-        text = element.content
-        text_type = self._detect_text_type(element, text)
-        config = self.FONT_CONFIG[text_type]
+        fitted = element.__dict__.get('_fitted_size')
+        if fitted and fitted[:3] == (element.revision, available_width, available_height):
+            return fitted[3]
         
-        base_size = config["base"]
-        min_size = config["min"]
-        max_size = config["max"]
-        
-        # Упрощенный расчет
-        chars_per_inch = 7
-        max_chars_per_line = available_width * chars_per_inch
-        
-        if len(text) > max_chars_per_line and max_chars_per_line > 0:
-            lines_needed = len(text) / max_chars_per_line
-            reduction = min(4, (lines_needed - 1) * 1.5)
-            base_size = max(min_size, base_size - reduction)
-        
-        return max(min_size, min(max_size, base_size))
+        return self.measurer.fit_font_size(*self._fit_box(element, available_width, available_height))
+    
+    def _fit_box(self, element: ContentElement, available_width: float, available_height: float) -> FitBox:
+        """Текст, место под него и диапазон кегля для подбора"""
+        text = element.content
+        config = self.FONT_CONFIG[self._detect_text_type(element, text)]
+        bold = bool(element.style.text_style and element.style.text_style.bold)
+        # Место под текст внутри фигуры (available_* - в EMU) без полей надписи;
+        # подбирается наибольший кегль не больше базового
+        return (text, available_width - 2 * DEFAULT_INSET_X, available_height - 2 * DEFAULT_INSET_Y,
+                config["min"], config["base"], self.font_name, bold)
+    
+    def predict_text(self, element: ContentElement, available_width: float, available_height: float,
+                     font_size: Optional[float] = None, method: str = "greedy",
+                     hyphenate: bool = False) -> TextLayout:
+        """Строки текста элемента в его фигуре и переполнение по высоте
+        
+        По умолчанию - жадная разбивка без переносов, как у PowerPoint, и
+        кегль, который выберет calculate_font_size.
+        """
+        if font_size is None:
+            font_size = self.calculate_font_size(element, available_width, available_height)
+        text, width, height, _, _, font_name, bold = self._fit_box(element, available_width, available_height)
+        return self.line_breaker.layout(text, width, height, font_size, font_name, bold, method, hyphenate)
+    
+    def fit_all(self, deck, uniform_siblings: bool = True) -> Dict[str, float]:
+        """Подбирает кегль сразу для всех текстовых элементов колоды
+        
+        Границы элементов считаются так же, как при рендере, кегли - одним
+        вызовом TextMeasurer.fit_many с общим кэшем ширин. С uniform_siblings
+        текстовые дети одного контейнера-сетки и элементы с одинаковым
+        metadata['font_group'] получают общий (наименьший) кегль. Результат
+        хранится на самом элементе (revision, ширина, высота, кегль) и
+        используется calculate_font_size при рендере, пока элемент и его
+        границы не изменятся.
+        """
+        start = time.perf_counter()
+        layout_engine = deck.layout_engine
+        elements: List[ContentElement] = []
+        areas: List[Tuple[float, float]] = []
+        boxes: List[FitBox] = []
+        groups: Dict[tuple, List[int]] = {}
+        # Временное состояние компоновки: состояния слайдов не трогаем
+        scratch = SlideLayoutState()
+        with layout_engine.use_state(scratch):
+            for slide_index, slide in enumerate(deck.slides):
+                scratch.clear()
+                for element, bounds in layout_engine.iter_tree(slide.elements):
+                    if element.type != ContentType.TEXT or not bounds or not isinstance(element.content, str):
+                        continue
+                    group = self._font_group(slide_index, element) if uniform_siblings else None
+                    if group is not None:
+                        groups.setdefault(group, []).append(len(elements))
+                    elements.append(element)
+                    areas.append((bounds[2], bounds[3]))
+                    boxes.append(self._fit_box(element, bounds[2], bounds[3]))
+        
+        sizes = self.measurer.fit_many(boxes)
+        for members in groups.values():
+            shared = min(sizes[i] for i in members)
+            for i in members:
+                sizes[i] = shared
+        
+        fitted = {}
+        for element, (width, height), size in zip(elements, areas, sizes):
+            element._fitted_size = (element.revision, width, height, size)
+            fitted[element.id] = size
+        
+        seconds = time.perf_counter() - start
+        self.fit_stats = {"elements": len(elements), "groups": len(groups), "seconds": seconds,
+                          "exact_checks": self.measurer.exact_checks,
+                          "elements_per_second": len(elements) / seconds if seconds else 0.0}
+        return fitted
+    
+    @staticmethod
+    def _font_group(slide_index: int, element: ContentElement) -> Optional[tuple]:
+        if 'font_group' in element.metadata:
+            return (slide_index, element.metadata['font_group'])
+        parent = element.parent
+        if parent is not None and parent.layout_strategy == LayoutStrategy.GRID:
+            return (slide_index, id(parent))
+        return None
     
     def _detect_text_type(self, element: ContentElement, text: str) -> str:
         if element.style.text_style and element.style.text_style.font_size:
@@ -82,16 +231,4 @@ class AdvancedTextModule:
             elif element.style.text_style.font_size <= 10:
                 return "footnote"
         
-        if len(text) < 15:
-            return "caption"
-        
-        if any(marker in text for marker in ['•', '-', '—', '·', '1.', '2.', '3.']):
-            return "subtitle"
-        
-        if len(text) > 100:
-            return "main"
-        
-        if len(text) < 50 and (text.isupper() or text[0].isupper() and text[-1] in '!?:'):
-            return "title"
-        
-        return "main"
\ No newline at end of file
+        return self.classifier.category(text)
@@ -0,0 +1,71 @@
+# bench_auto_place.py - АВТОРАЗМЕЩЕНИЕ ЭЛЕМЕНТОВ
+"""
+Пакетное размещение элементов без координат через MaxRectsPlacer на
+области, которая растет вместе с числом элементов. Проверяет, что
+размещенные прямоугольники не пересекаются и не выходят за границы, а
+время на элемент почти не растет с числом элементов (при полном переборе
+свободных прямоугольников оно росло линейно).
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_auto_place [число элементов ...]
+"""
+
+from V4.old_functions import Inches
+from V4.placement import MaxRectsPlacer
+from V4.spatial_index import OccupiedAreas
+import math
+import random
+import sys
+import time
+
+SIZES = (100, 1000, 10000)
+# Допустимый рост времени на элемент на каждое десятикратное увеличение числа
+# элементов (при полном переборе свободных прямоугольников было x7 и больше)
+MAX_SLOWDOWN = 3
+# Время - лучшее из нескольких прогонов: малые размеры идут миллисекунды и шумят
+REPEATS = 3
+
+
+def main(sizes=SIZES, seed: int = 42) -> dict:
+    print("⏱️  Авторазмещение: MaxRects, пакетный режим")
+    results = {}
+    for count in sizes:
+        rnd = random.Random(seed)
+        # Заполнение около 60% площади
+        side = int(Inches(1) * math.sqrt(count * 1.5 / 0.6))
+        sizes_emu = [(rnd.randrange(Inches(0.5), Inches(2)), rnd.randrange(Inches(0.3), Inches(1)))
+                     for _ in range(count)]
+
+        min_size = (min(w for w, _ in sizes_emu), min(h for _, h in sizes_emu))
+        elapsed = None
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            placer = MaxRectsPlacer((0, 0, side, side), spacing=Inches(0.05), min_size=min_size)
+            placed = [placer.place(width, height) for width, height in sizes_emu]
+            run = time.perf_counter() - start
+            elapsed = run if elapsed is None else min(elapsed, run)
+
+        placed = [rect for rect in placed if rect is not None]
+        index = OccupiedAreas()
+        for rect in placed:
+            assert not index.query_overlaps(rect)
+            assert 0 <= rect[0] and rect[0] + rect[2] <= side and 0 <= rect[1] and rect[1] + rect[3] <= side
+            index.append(rect)
+
+        results[count] = {"total_ms": elapsed * 1000, "per_element_us": elapsed / count * 1e6,
+                          "placed": len(placed), "free_rects": len(placer.free)}
+        print(f"   {count:>6} элементов: {elapsed * 1000:9.1f} мс  ({elapsed / count * 1e6:7.1f} мкс/эл.)  "
+              f"размещено {len(placed)}, свободных прямоугольников {len(placer.free)}")
+
+    smallest, largest = min(results), max(results)
+    if largest > smallest:
+        growth = results[largest]["per_element_us"] / results[smallest]["per_element_us"]
+        slowdown = growth ** (1 / math.log10(largest / smallest))
+        print(f"   рост времени на элемент: x{growth:.1f}, на каждые x10 элементов x{slowdown:.1f} "
+              f"(допустимо до x{MAX_SLOWDOWN})")
+        assert slowdown < MAX_SLOWDOWN, "время на элемент растет с числом элементов"
+    return results
+
+
+if __name__ == "__main__":
+    main(tuple(int(arg) for arg in sys.argv[1:]) or SIZES)
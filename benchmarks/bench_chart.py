@@ -0,0 +1,129 @@
+# bench_chart.py - НАТИВНЫЕ ДИАГРАММЫ V4
+"""
+1) Линейная диаграмма из одного ряда (массив NumPy): ChartEngine (XML
+   и книга Excel порциями в буфер) против python-pptx
+   add_chart с CategoryChartData - время и пик памяти Python (tracemalloc).
+   python-pptx растет квадратично от числа категорий, поэтому сравнение -
+   на PPTX_MAX_POINTS точках, а ChartEngine отдельно строит полный ряд
+   (по умолчанию 100 000 точек). Значения из кэша диаграммы и из
+   встроенной книги сохраненного файла сверяются с исходными.
+2) Одна и та же диаграмма на 50 слайдах: число частей диаграмм в пакете
+   и размер файла.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_chart [число_точек]
+"""
+
+from V4.core import PresentationGenerator, Inches
+from pptx import Presentation
+from pptx.chart.data import CategoryChartData
+from pptx.enum.chart import XL_CHART_TYPE
+from lxml import etree
+import numpy as np
+import contextlib
+import io
+import sys
+import time
+import tracemalloc
+import zipfile
+
+BOX = (Inches(0.5), Inches(1.3), Inches(12), Inches(5.7))
+NS = {"c": "http://schemas.openxmlformats.org/drawingml/2006/chart",
+      "x": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+
+# Больше python-pptx строит минутами (8000 точек - десятки секунд)
+PPTX_MAX_POINTS = 8000
+
+
+def series(points: int) -> np.ndarray:
+    x = np.arange(points)
+    return np.round(np.sin(x / 500) * 100 + np.random.default_rng(1).normal(0, 5, points), 3)
+
+
+def traced(build):
+    """Время и пик памяти Python при построении и сохранении колоды"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    stream = build()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return stream, elapsed, peak
+
+
+def build_v4(values: np.ndarray, slides: int = 1) -> io.BytesIO:
+    stream = io.BytesIO()
+    with contextlib.redirect_stdout(io.StringIO()):
+        generator = PresentationGenerator(render_backend="xml")
+        for _ in range(slides):
+            generator.create_slide("Ряд")
+            generator.add_chart("line", {"series": {"Значение": values}}, *BOX)
+            generator.current_slide.render()
+        generator.save(stream)
+    return stream
+
+
+def build_pptx(values: np.ndarray, slides: int = 1) -> io.BytesIO:
+    prs = Presentation()
+    for _ in range(slides):
+        chart_data = CategoryChartData()
+        chart_data.categories = range(1, len(values) + 1)
+        chart_data.add_series("Значение", values.tolist())
+        slide = prs.slides.add_slide(prs.slide_layouts[6])
+        slide.shapes.add_chart(XL_CHART_TYPE.LINE, *BOX, chart_data)
+    stream = io.BytesIO()
+    prs.save(stream)
+    return stream
+
+
+def read_values(stream) -> tuple:
+    """Значения первого ряда из XML диаграммы и из встроенной книги (прокси python-pptx
+    на 100 000 точек читают минутами)"""
+    package = zipfile.ZipFile(stream)
+    chart = etree.fromstring(package.read("ppt/charts/chart1.xml"))
+    cached = [float(value) for value in chart.xpath(".//c:val//c:v/text()", namespaces=NS)]
+    workbook_name = next(name for name in package.namelist() if name.startswith("ppt/embeddings/"))
+    workbook = zipfile.ZipFile(io.BytesIO(package.read(workbook_name)))
+    sheet = etree.fromstring(workbook.read("xl/worksheets/sheet1.xml"))
+    stored = [float(row[1][0].text) for row in list(sheet.iter(f"{{{NS['x']}}}row"))[1:]]
+    return cached, stored
+
+
+def chart_parts(stream) -> int:
+    return sum(1 for name in zipfile.ZipFile(stream).namelist()
+               if name.startswith("ppt/charts/chart") and name.endswith(".xml"))
+
+
+def main(points: int = 100000) -> dict:
+    results = {}
+    compared = min(points, PPTX_MAX_POINTS)
+    cases = [(compared, "python-pptx", build_pptx), (compared, "ChartEngine", build_v4)]
+    if points > compared:
+        cases.append((points, "ChartEngine", build_v4))
+    for count, name, build in cases:
+        values = series(count)
+        stream, elapsed, peak = traced(lambda: build(values))
+        results[f"{name} {count}"] = {"seconds": elapsed, "peak_mb": peak / 2 ** 20, "stream": stream}
+        print(f"📈 {name:<12} {count:>7} точек: {elapsed:6.2f} с, пик памяти {peak / 2 ** 20:7.1f} МБ, "
+              f"файл {len(stream.getvalue()) / 2 ** 20:.2f} МБ")
+    old, new = results[f"python-pptx {compared}"], results[f"ChartEngine {compared}"]
+    print(f"   Ускорение на {compared} точках x{old['seconds'] / new['seconds']:.1f}, "
+          f"памяти меньше в {old['peak_mb'] / new['peak_mb']:.1f} раза")
+    cached, stored = read_values(results[f"ChartEngine {points}"]["stream"])
+    same = cached == stored == series(points).tolist()
+    print(f"   значения в файле совпадают: {'✅' if same else '❌'}")
+
+    repeats = 50
+    small = series(1000)
+    print(f"🔁 Одна диаграмма (1000 точек) на {repeats} слайдах")
+    for name, build in (("python-pptx", build_pptx), ("ChartEngine", build_v4)):
+        stream, elapsed, _ = traced(lambda: build(small, repeats))
+        print(f"   {name:<12}: {elapsed:6.2f} с, частей диаграмм {chart_parts(stream)}, "
+              f"файл {len(stream.getvalue()) / 2 ** 20:.2f} МБ")
+        results[f"{name} x{repeats}"] = {"seconds": elapsed, "parts": chart_parts(stream)}
+    results["same"] = same
+    return results
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,93 @@
+# bench_chart_downsample.py - ПРОРЕЖИВАНИЕ РЯДОВ ДИАГРАММ
+"""
+Телеметрия: метрика раз в секунду за 30 дней (2 592 000 точек, массив
+NumPy) на линейной диаграмме с max_points=2000.
+
+1) Время этапа прореживания для lttb и minmax (NumPy и списки) и
+   линейность: то же на половине и четверти ряда.
+2) Сохранение формы: сколько редких всплесков осталось на графике и
+   сохранены ли глобальные минимум и максимум.
+3) Колода целиком (add_chart + рендер + сохранение) с прореживанием против
+   диаграммы на FULL_POINTS исходных точек без него - время и размер файла.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_chart_downsample [число_точек]
+"""
+
+from V4.core import PresentationGenerator, Inches
+from V4.chart_downsample import downsample_indices
+import numpy as np
+import contextlib
+import io
+import sys
+import time
+
+BOX = (Inches(0.5), Inches(1.3), Inches(12), Inches(5.7))
+MAX_POINTS = 2000
+# Без прореживания - только начало ряда: 2,6 млн точек строятся десятки секунд
+FULL_POINTS = 100000
+
+
+def telemetry(points: int):
+    """Суточный цикл, тренд, шум и редкие всплески; возвращает ряд и индексы всплесков"""
+    rng = np.random.default_rng(7)
+    t = np.arange(points)
+    values = 50 + 20 * np.sin(2 * np.pi * t / 86400) + t / points * 10 + rng.normal(0, 2, points)
+    spikes = rng.choice(points, points // 100000 + 1, replace=False)
+    values[spikes] += rng.uniform(40, 80, len(spikes))
+    return np.round(values, 3), spikes
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def build_deck(values: np.ndarray, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        generator = PresentationGenerator(render_backend="xml")
+        generator.create_slide("Телеметрия")
+        start = time.perf_counter()
+        element = generator.add_chart("line", {"series": {"CPU, %": values}}, *BOX, **kwargs)
+        generator.current_slide.render()
+        stream = io.BytesIO()
+        generator.save(stream)
+    return element, time.perf_counter() - start, len(stream.getvalue())
+
+
+def main(points: int = 2592000) -> dict:
+    values, spikes = telemetry(points)
+    results = {}
+    print(f"📉 Ряд {points} точек → {MAX_POINTS}")
+    for method in ("lttb", "minmax"):
+        indices, elapsed = timed(downsample_indices, None, values, MAX_POINTS, method)
+        _, list_elapsed = timed(downsample_indices, None, values.tolist(), MAX_POINTS, method)
+        scaling = [timed(downsample_indices, None, values[:points // part], MAX_POINTS, method)[1]
+                   for part in (4, 2)] + [elapsed]
+        kept = values[indices]
+        extremes = kept.max() == values.max() and kept.min() == values.min()
+        kept_spikes = int(np.isin(spikes, indices).sum())
+        results[method] = {"seconds": elapsed, "list_seconds": list_elapsed, "kept": len(indices),
+                           "spikes": kept_spikes, "extremes": extremes, "scaling": scaling}
+        print(f"   {method:<6}: NumPy {elapsed * 1000:7.1f} мс, списки {list_elapsed * 1000:7.1f} мс, "
+              f"точек {len(indices)} (в {points / len(indices):.0f} раза меньше)")
+        print(f"           N/4, N/2, N: {', '.join(f'{s * 1000:.1f}' for s in scaling)} мс; "
+              f"всплесков {kept_spikes} из {len(spikes)}, мин/макс сохранены: {'✅' if extremes else '❌'}")
+
+    print("🗂️  Колода с одной диаграммой")
+    for method in ("lttb", "minmax"):
+        element, elapsed, size = build_deck(values, max_points=MAX_POINTS, downsample=method)
+        report = element.metadata["downsample"]
+        results[f"deck {method}"] = {"seconds": elapsed, "bytes": size, "ratio": report.ratio}
+        print(f"   {method:<6} {points} точек: {elapsed:6.2f} с, файл {size / 2 ** 10:7.0f} КБ, "
+              f"сокращение x{report.ratio:.0f}")
+    full = min(points, FULL_POINTS)
+    _, elapsed, size = build_deck(values[:full])
+    results["deck full"] = {"seconds": elapsed, "bytes": size}
+    print(f"   полный  {full} точек: {elapsed:6.2f} с, файл {size / 2 ** 10:7.0f} КБ")
+    return results
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2592000)
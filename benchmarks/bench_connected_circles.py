@@ -0,0 +1,94 @@
+# bench_connected_circles.py - ТОПОЛОГИИ СВЯЗАННЫХ КРУГОВ В A2
+"""
+Инфографика 'circles' из A2 на n кругов для каждой топологии
+(complete, ring, star, knn): число соединителей и время построения слайда.
+Для complete - сравнение с прежним способом (add_connector python-pptx на
+каждую пару): XML соединителей должен совпасть (в каноническом виде),
+время - сократиться.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_connected_circles [n ...]
+"""
+
+from lxml import etree
+import contextlib
+import io
+import sys
+import time
+
+import presentation_templatesА2 as a2
+
+SIZES = (5, 10, 20, 50)
+TOPOLOGIES = ('complete', 'ring', 'star', 'knn')
+
+
+def items(count: int):
+    return [f"Узел {i + 1}" for i in range(count)]
+
+
+def build_slide(count: int, topology: str):
+    with contextlib.redirect_stdout(io.StringIO()):
+        template = a2.PresentationTemplates('blue_tech')
+        start = time.perf_counter()
+        slide = template.create_infographic_slide("Связи", "circles", {"items": items(count)}, topology=topology)
+    return template, slide, time.perf_counter() - start
+
+
+def connectors(slide) -> list:
+    return [etree.tostring(element, method="c14n", exclusive=True)
+            for element in slide.shapes._spTree.iter("{*}cxnSp")]
+
+
+def centers(slide):
+    """Центры кругов слайда; соединители удаляются"""
+    sp_tree = slide.shapes._spTree
+    for element in list(sp_tree.iter("{*}cxnSp")):
+        sp_tree.remove(element)
+    ovals = [shape for shape in slide.shapes if shape.name.startswith("Oval")]
+    return [shape.left + shape.width // 2 for shape in ovals], [shape.top + shape.height // 2 for shape in ovals]
+
+
+def bulk_connectors(template, slide, pairs) -> float:
+    xs, ys = centers(slide)
+    start = time.perf_counter()
+    a2.add_connectors(slide, xs, ys, pairs, template.color_scheme.secondary)
+    return time.perf_counter() - start
+
+
+def legacy_connectors(template, slide, pairs) -> float:
+    """Прежний путь: add_connector python-pptx на каждую пару"""
+    xs, ys = centers(slide)
+    start = time.perf_counter()
+    for i, j in pairs:
+        a2.IconLibrary.create_arrow_connector(slide, xs[i], ys[i], xs[j], ys[j], template.color_scheme.secondary)
+    return time.perf_counter() - start
+
+
+def main(sizes=SIZES) -> dict:
+    results = {}
+    print("🔗 Связанные круги A2: соединителей / время слайда")
+    for count in sizes:
+        row = []
+        for topology in TOPOLOGIES:
+            template, slide, elapsed = build_slide(count, topology)
+            results[(count, topology)] = {"connectors": len(connectors(slide)), "seconds": elapsed}
+            row.append(f"{topology} {len(connectors(slide)):>4} / {elapsed * 1000:6.1f} мс")
+        print(f"   n={count:<4} " + "  ".join(row))
+
+    print("⏱️  complete: соединители одним блоком XML против add_connector на пару")
+    for count in sizes:
+        template, slide, _ = build_slide(count, 'complete')
+        pairs = a2.topology_edges(count, 'complete')
+        bulk_time = bulk_connectors(template, slide, pairs)
+        bulk = connectors(slide)
+        legacy_time = legacy_connectors(template, slide, pairs)
+        same = connectors(slide) == bulk
+        results[(count, 'legacy')] = {"bulk": bulk_time, "legacy": legacy_time, "same": same}
+        print(f"   n={count:<4} связей {len(bulk):>5}: блоком {bulk_time * 1000:7.1f} мс, "
+              f"add_connector {legacy_time * 1000:8.1f} мс (x{legacy_time / bulk_time:.0f}), "
+              f"XML совпадает: {'✅' if same else '❌'}")
+    return results
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or SIZES)
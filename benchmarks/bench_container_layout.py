@@ -0,0 +1,80 @@
+# bench_container_layout.py - РАСКЛАДКА КОНТЕЙНЕРОВ
+"""
+Контейнер с n плитками и стратегией GRID / VSTACK / HSTACK:
+- "по элементу" - calculate_bounds для каждого ребенка отдельно;
+- "пакетом" - один вызов layout_children на списках;
+- "NumPy" - тот же вызов векторно (если NumPy установлен).
+Результаты всех вариантов сравниваются между собой; кэш раскладок
+сбрасывается перед каждым замером.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_container_layout [число плиток ...]
+"""
+
+from V4.container_layout import np
+from V4.layout_engine import SmartLayoutEngine
+from V4.old_functions import ContentElement, ContentType, Inches, LayoutStrategy
+import random
+import sys
+import time
+
+# Дальше поэлементный вариант (квадратичный) не запускается
+PER_ELEMENT_LIMIT = 2000
+
+
+def build_container(strategy: LayoutStrategy, count: int, seed: int = 42) -> ContentElement:
+    rnd = random.Random(seed)
+    container = ContentElement(id="container", type=ContentType.SHAPE, content="",
+                               layout_strategy=strategy, x=Inches(0.5), y=Inches(0.5),
+                               width=Inches(12), height=Inches(6))
+    for i in range(count):
+        # Часть плиток с заданным размером, остальные растягиваются
+        fixed = rnd.random() < 0.3
+        container.add_child(ContentElement(
+            id=f"tile_{i}", type=ContentType.SHAPE, content="",
+            width=rnd.randrange(Inches(0.001), Inches(0.01)) if fixed else None,
+            height=rnd.randrange(Inches(0.001), Inches(0.005)) if fixed else None,
+        ))
+    return container
+
+
+def timed(engine: SmartLayoutEngine, func, repeats: int = 5):
+    best = None
+    result = None
+    for _ in range(repeats):
+        engine.clear_layout_cache()
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000, result
+
+
+def main(sizes=(10, 100, 1000, 10000)) -> dict:
+    engine = SmartLayoutEngine(Inches(13.33), Inches(7.5))
+    print(f"⏱️  Раскладка контейнера (лучшее из 5, мс){'' if np is not None else ' - NumPy не установлен'}")
+    results = {}
+    for strategy in (LayoutStrategy.GRID, LayoutStrategy.VERTICAL_STACK, LayoutStrategy.HORIZONTAL_STACK):
+        for count in sizes:
+            container = build_container(strategy, count)
+            bounds = engine.calculate_bounds(container)
+            area = engine.calculate_child_bounds(bounds, container.style.padding)
+            row = {}
+
+            row["batch_ms"], expected = timed(engine, lambda: engine.layout_children(container, bounds, vectorized=False))
+            if np is not None:
+                row["numpy_ms"], rects = timed(engine, lambda: engine.layout_children(container, bounds, vectorized=True))
+                assert rects == expected
+            if count <= PER_ELEMENT_LIMIT:
+                row["per_element_ms"], rects = timed(
+                    engine, lambda: [engine.calculate_bounds(child, area) for child in container.children], 1)
+                assert rects == expected
+
+            results[f"{strategy.value}/{count}"] = row
+            cells = "  ".join(f"{name[:-3]} {value:9.2f}" for name, value in row.items())
+            print(f"   {strategy.value:<6} {count:>6} плиток: {cells}")
+    return results
+
+
+if __name__ == "__main__":
+    main(tuple(int(arg) for arg in sys.argv[1:]) or (10, 100, 1000, 10000))
@@ -0,0 +1,90 @@
+# bench_fit_all.py - ПАКЕТНЫЙ ПОДБОР КЕГЛЯ ДЛЯ ВСЕЙ КОЛОДЫ
+"""
+AdvancedTextModule.fit_all() против подбора по одному элементу
+(calculate_font_size в цикле) на колоде из текстовых блоков и сеток
+с текстовыми ячейками. Печатает пропускную способность в элементах
+в секунду и проверяет, что без групп результаты совпадают, а ячейки
+каждой сетки получили одинаковый кегль.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_fit_all [число текстов]
+"""
+
+from V4.core import PresentationGenerator, Inches
+from V4.layout_engine import SlideLayoutState
+from V4.old_functions import ContentElement, ContentType, LayoutStrategy
+from benchmarks.bench_text_fit import WORDS
+import contextlib
+import io
+import random
+import sys
+import time
+
+
+def build_deck(num_texts: int, seed: int = 42) -> PresentationGenerator:
+    rnd = random.Random(seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        generator = PresentationGenerator(theme="dark_pro", render_backend="xml")
+        for i in range(num_texts // 10):
+            slide = generator.create_slide(f"Слайд {i + 1}")
+            # Четыре текста вручную и сетка на шесть ячеек
+            for j in range(4):
+                text = " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(3, 40)))
+                generator.add_text(text, Inches(0.5 + 3 * j), Inches(1.5), Inches(rnd.uniform(1.5, 3)),
+                                   Inches(rnd.uniform(0.6, 2.5)))
+            grid = ContentElement(id=f"grid_{i}", type=ContentType.CONTAINER, content="",
+                                  layout_strategy=LayoutStrategy.GRID, metadata={"columns": 3},
+                                  x=Inches(0.5), y=Inches(4.3), width=Inches(12), height=Inches(3))
+            for j in range(6):
+                text = " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(2, 25)))
+                grid.add_child(ContentElement(id=f"cell_{i}_{j}", type=ContentType.TEXT, content=text))
+            slide.add_element(grid)
+    return generator
+
+
+def one_by_one(generator: PresentationGenerator) -> dict:
+    """Кегль каждого текста отдельным calculate_font_size"""
+    text_module = generator.text_module
+    sizes = {}
+    scratch = SlideLayoutState()
+    with generator.layout_engine.use_state(scratch):
+        for slide in generator.slides:
+            scratch.clear()
+            for element, bounds in generator.layout_engine.iter_tree(slide.elements):
+                if element.type == ContentType.TEXT and bounds:
+                    sizes[element.id] = text_module.calculate_font_size(element, bounds[2], bounds[3])
+    return sizes
+
+
+def main(num_texts: int = 20000) -> dict:
+    print(f"⏱️  Пакетный подбор кегля: ~{num_texts} текстов")
+    generator = build_deck(num_texts)
+    text_module = generator.text_module
+
+    start = time.perf_counter()
+    single = one_by_one(generator)
+    single_seconds = time.perf_counter() - start
+    print(f"   по одному        : {single_seconds * 1000:8.1f} мс  ({len(single) / single_seconds:9.0f} элементов/с)")
+
+    results = {"one_by_one": len(single) / single_seconds}
+    for uniform in (False, True):
+        text_module.measurer.cache_clear()
+        fitted = text_module.fit_all(generator, uniform_siblings=uniform)
+        stats = text_module.fit_stats
+        name = "fit_all (сетки)" if uniform else "fit_all"
+        print(f"   {name:<17}: {stats['seconds'] * 1000:8.1f} мс  ({stats['elements_per_second']:9.0f} элементов/с)  "
+              f"точных переносов {stats['exact_checks']}, групп {stats['groups']}")
+        results[name] = stats["elements_per_second"]
+        if not uniform:
+            print(f"   совпадает с подбором по одному: {'✅' if fitted == single else '❌'}")
+
+    same_in_grids = all(
+        len({fitted[child.id] for child in element.children}) == 1
+        for slide in generator.slides for element in slide.elements if element.children
+    )
+    print(f"   ячейки сеток одного кегля: {'✅' if same_in_grids else '❌'}")
+    return results
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
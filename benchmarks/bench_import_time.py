@@ -0,0 +1,71 @@
+# bench_import_time.py - ХОЛОДНЫЙ СТАРТ V4
+"""
+Время импорта пакета V4 и создания PresentationGenerator в свежем
+интерпретаторе (каждый замер - отдельный процесс, берется медиана).
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_import_time [повторов] [--json файл]
+"""
+
+import json
+import statistics
+import subprocess
+import sys
+
+# Что замеряется: имя -> код, выполняемый в новом процессе
+SCENARIOS = {
+    "import V4": "import V4",
+    "V4.PresentationGenerator": "import V4\nV4.PresentationGenerator",
+    "from V4.core import PresentationGenerator": "from V4.core import PresentationGenerator",
+    "PresentationGenerator()": (
+        "import contextlib, io\n"
+        "from V4.core import PresentationGenerator\n"
+        "with contextlib.redirect_stdout(io.StringIO()):\n"
+        "    PresentationGenerator()"
+    ),
+}
+
+_TIMER = (
+    "import time as _t\n"
+    "_start = _t.perf_counter()\n"
+    "{code}\n"
+    "print(_t.perf_counter() - _start)\n"
+)
+
+
+def measure(code: str, repeats: int) -> list:
+    """Время выполнения code в repeats свежих процессах (секунды)"""
+    timings = []
+    for _ in range(repeats):
+        completed = subprocess.run(
+            [sys.executable, "-c", _TIMER.format(code=code)],
+            capture_output=True, text=True, check=True
+        )
+        timings.append(float(completed.stdout.strip().splitlines()[-1]))
+    return timings
+
+
+def main(repeats: int = 7, output: str = None) -> dict:
+    print(f"⏱️  Холодный старт V4 (медиана из {repeats} процессов)")
+    results = {}
+    for name, code in SCENARIOS.items():
+        timings = measure(code, repeats)
+        results[name] = {"median_ms": statistics.median(timings) * 1000,
+                         "min_ms": min(timings) * 1000}
+        print(f"   {name:<45} {results[name]['median_ms']:8.1f} мс  (мин {results[name]['min_ms']:.1f})")
+
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"✅ Результаты сохранены: {output}")
+    return results
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    output = None
+    if "--json" in args:
+        index = args.index("--json")
+        output = args[index + 1]
+        del args[index:index + 2]
+    main(int(args[0]) if args else 7, output)
@@ -0,0 +1,69 @@
+# bench_info_slide.py - СПИСОК ПУНКТОВ НА ИНФО-СЛАЙДЕ A2
+"""
+create_info_slide с 16 пунктами: иконка и текстовое поле на каждый пункт
+(list_mode='shapes') против одного текстового поля с маркированными
+абзацами (list_mode='bullets'). Печатает время на слайд, число фигур
+на слайде и проверяет, что текст пунктов в обоих режимах один и тот же.
+Последний прогон - с графическим маркером (bullet_image).
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_info_slide [число_слайдов]
+"""
+
+from PIL import Image
+import presentation_templatesА2 as a2
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+POINTS = [f"Ключевой аспект {i + 1}: рост выручки & новые рынки <квартал {i % 4 + 1}>" for i in range(16)]
+
+
+def build(num_slides: int, list_mode: str, bullet_image: str = None):
+    template = a2.PresentationTemplates()
+    start = time.perf_counter()
+    for i in range(num_slides):
+        template.create_info_slide(f"Слайд {i + 1}", POINTS, icon_type='diamond',
+                                   list_mode=list_mode, bullet_image=bullet_image)
+    return template, time.perf_counter() - start
+
+
+def point_texts(slide, list_mode: str) -> list:
+    texts = [shape.text_frame.text for shape in slide.shapes if shape.has_text_frame and shape.text_frame.text]
+    # Первое текстовое поле - заголовок
+    if list_mode == 'bullets':
+        return texts[1].split("\n")
+    return texts[1:]
+
+
+def main(num_slides: int = 200) -> dict:
+    print(f"⏱️  Инфо-слайды A2: {num_slides} слайдов по {len(POINTS)} пунктов")
+    results = {}
+    with tempfile.TemporaryDirectory() as folder:
+        marker = os.path.join(folder, "marker.png")
+        Image.new("RGB", (32, 32), (0, 120, 215)).save(marker)
+        for list_mode, bullet_image in (("shapes", None), ("bullets", None), ("bullets", marker)):
+            name = list_mode + (" + картинка" if bullet_image else "")
+            template, elapsed = build(num_slides, list_mode, bullet_image)
+            slide = template.prs.slides[0]
+            results[name] = {"ms_per_slide": elapsed / num_slides * 1000, "shapes": len(slide.shapes),
+                             "texts": point_texts(slide, list_mode)}
+            with contextlib.redirect_stdout(io.StringIO()):
+                template.save(os.path.join(folder, f"{list_mode}_{bool(bullet_image)}.pptx"))
+            print(f"   {name:<20}: {results[name]['ms_per_slide']:6.2f} мс на слайд, "
+                  f"фигур на слайде {results[name]['shapes']}")
+
+    baseline = results["shapes"]
+    bullets = results["bullets"]
+    print(f"   Ускорение: x{baseline['ms_per_slide'] / bullets['ms_per_slide']:.1f}, "
+          f"фигур меньше в {baseline['shapes'] / bullets['shapes']:.1f} раза")
+    same = all(result["texts"] == POINTS for result in results.values())
+    print(f"   Текст пунктов совпадает: {'✅' if same else '❌'}")
+    return results
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
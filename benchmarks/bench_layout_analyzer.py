@@ -0,0 +1,83 @@
+# bench_layout_analyzer.py - ПРОВЕРКА МАКЕТА НА 100 000 ЭЛЕМЕНТОВ
+"""
+Время analyze_layout() на двух колодах примерно по 100 000 элементов:
+- "колода" - слайды по 12 случайных элементов (часть пересекается и выходит за слайд);
+- "сетка" - один слайд с контейнером-сеткой на 100 000 плиток.
+Для выборки слайдов результат сверяется с перебором всех пар.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_layout_analyzer [число элементов]
+"""
+
+from V4.core import PresentationGenerator, Inches, RGBColor
+from V4.layout_analyzer import analyze_slide
+from V4.old_functions import ContentElement, ContentType, LayoutStrategy
+import contextlib
+import io
+import itertools
+import random
+import sys
+
+
+def random_deck(num_elements: int, seed: int = 42) -> PresentationGenerator:
+    rnd = random.Random(seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        generator = PresentationGenerator(theme="dark_pro", render_backend="xml")
+        for i in range(num_elements // 12):
+            generator.create_slide(f"Слайд {i + 1}")
+            for _ in range(12):
+                generator.add_shape(
+                    "rectangle", Inches(rnd.uniform(0.2, 11.5)), Inches(rnd.uniform(0.8, 6.5)),
+                    Inches(rnd.uniform(0.3, 2.5)), Inches(rnd.uniform(0.3, 1.5)),
+                    background_color=RGBColor(rnd.randrange(256), 80, 120)
+                )
+    return generator
+
+
+def grid_deck(num_elements: int) -> PresentationGenerator:
+    with contextlib.redirect_stdout(io.StringIO()):
+        generator = PresentationGenerator(theme="dark_pro", render_backend="xml")
+        slide = generator.create_slide("Сетка")
+    container = ContentElement(id="grid", type=ContentType.CONTAINER, content="",
+                               layout_strategy=LayoutStrategy.GRID,
+                               x=Inches(0.5), y=Inches(1.2), width=Inches(12), height=Inches(6))
+    for i in range(num_elements):
+        container.add_child(ContentElement(id=f"tile_{i}", type=ContentType.SHAPE, content=""))
+    slide.add_element(container)
+    return generator
+
+
+def brute_force_overlaps(generator: PresentationGenerator, slide_index: int) -> int:
+    """Число пересечений слайда перебором всех пар (для сверки)"""
+    slide = generator.slides[slide_index]
+    rects = [bounds for _, bounds in generator.layout_engine.iter_tree(slide.elements)]
+    rects.append(slide.title_area())
+    return sum(
+        1 for a, b in itertools.combinations(rects, 2)
+        if a[0] < b[0] + b[2] and b[0] < a[0] + a[2] and a[1] < b[1] + b[3] and b[1] < a[1] + a[3]
+    )
+
+
+def main(num_elements: int = 100000) -> dict:
+    print(f"⏱️  Проверка макета: ~{num_elements} элементов")
+    results = {}
+    for name, factory in (("колода", random_deck), ("сетка", grid_deck)):
+        generator = factory(num_elements)
+        report = generator.analyze_layout()
+        results[name] = {"elements": report.elements, "slides": report.slides, "seconds": report.seconds,
+                         "overlaps": len(report.overlaps), "overflows": len(report.overflows)}
+        print(f"   {name:<7}: {report.elements} элементов на {report.slides} слайдах за {report.seconds:.3f} с  "
+              f"(пересечений {len(report.overlaps)}, за границей {len(report.overflows)})")
+
+        by_slide = report.by_slide()
+        sample = random.Random(0).sample(range(report.slides), min(50, report.slides))
+        matches = all(
+            len(by_slide.get(index, {}).get("overlaps", ())) == brute_force_overlaps(generator, index)
+            for index in sample if sum(1 for _ in generator.slides[index].iter_elements()) < 1000
+        )
+        print(f"            совпадает с перебором пар: {'✅' if matches else '❌'}")
+    return results
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,74 @@
+# bench_layout_memory.py - ПАМЯТЬ СОСТОЯНИЯ КОМПОНОВКИ НА ДЛИННОЙ КОЛОДЕ
+"""
+Строит колоду (по умолчанию 5 000 слайдов по 12 элементов, каждый слайд
+рендерится сразу после наполнения) и через каждые 10% слайдов замеряет:
+- сколько занятых областей держат движок компоновки и слайды;
+- сколько памяти (tracemalloc) занимают объекты, созданные в модулях
+  компоновки (layout_engine, spatial_index, container_layout).
+При состоянии на слайд с пулом обе величины не должны расти с длиной колоды.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_layout_memory [число_слайдов]
+"""
+
+from V4.core import PresentationGenerator, Inches, RGBColor
+import contextlib
+import io
+import random
+import sys
+import tracemalloc
+
+LAYOUT_MODULES = ("*layout_engine.py", "*spatial_index.py", "*container_layout.py")
+
+
+def layout_memory_kb() -> float:
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(True, pattern) for pattern in LAYOUT_MODULES]
+    )
+    return sum(stat.size for stat in snapshot.statistics("filename")) / 1024
+
+
+def retained_areas(generator: PresentationGenerator) -> int:
+    engine = generator.layout_engine
+    states = {id(engine.state): engine.state}
+    states.update((id(state), state) for state in engine._state_pool)
+    states.update((id(slide._layout_state), slide._layout_state)
+                  for slide in generator.slides if slide._layout_state is not None)
+    return sum(len(state.occupied_areas) for state in states.values())
+
+
+def main(num_slides: int = 5000, seed: int = 42) -> list:
+    rnd = random.Random(seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        generator = PresentationGenerator(theme="dark_pro", render_backend="xml")
+
+    print(f"⏱️  Память компоновки: {num_slides} слайдов по 12 элементов")
+    checkpoints = []
+    step = max(1, num_slides // 10)
+    tracemalloc.start()
+    for i in range(num_slides):
+        generator.create_slide(f"Слайд {i + 1}")
+        for _ in range(12):
+            generator.add_shape(
+                "rectangle", Inches(rnd.uniform(0.5, 9)), Inches(rnd.uniform(1.2, 5)),
+                Inches(rnd.uniform(0.5, 3)), Inches(rnd.uniform(0.5, 2)),
+                background_color=RGBColor(rnd.randrange(256), 80, 120)
+            )
+        generator.current_slide.render()
+
+        if (i + 1) % step == 0:
+            checkpoint = {"slides": i + 1, "retained_areas": retained_areas(generator),
+                          "layout_kb": layout_memory_kb()}
+            checkpoints.append(checkpoint)
+            print(f"   {checkpoint['slides']:>6} слайдов: областей {checkpoint['retained_areas']:>4}  "
+                  f"память компоновки {checkpoint['layout_kb']:8.1f} КБ")
+    tracemalloc.stop()
+
+    first, last = checkpoints[0], checkpoints[-1]
+    flat = last["retained_areas"] <= first["retained_areas"] and last["layout_kb"] <= first["layout_kb"] * 1.5
+    print(f"   Память не растет с числом слайдов: {'✅' if flat else '❌'}")
+    return checkpoints
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
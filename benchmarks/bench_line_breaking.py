@@ -0,0 +1,77 @@
+# bench_line_breaking.py - РАЗБИВКА РУССКОГО ТЕКСТА НА СТРОКИ
+"""
+LineBreaker на длинных русских абзацах: жадная разбивка и Кнут-Пласс,
+с переносами по слогам и без. Затем подбор кегля тех же текстов в два
+прохода (второй - с кэшем разбивок по абзацам) и сверка жадной разбивки
+с TextMeasurer.count_lines, по которому подбирается кегль при рендере.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_line_breaking [число абзацев]
+"""
+
+from V4.font_metrics import TextMeasurer
+from V4.line_breaking import LineBreaker
+from V4.old_functions import Inches
+import random
+import statistics
+import sys
+import time
+
+WORDS = (
+    "нейросетевые модели позволяют автоматически генерировать презентации по текстовому описанию "
+    "подбирая структуру слайдов иллюстрации и оформление в соответствии с выбранной темой при этом "
+    "качество результата зависит от объема обучающей выборки и архитектуры трансформера который "
+    "обрабатывает последовательность токенов с учетом контекста предыдущих предложений"
+).split()
+
+
+def random_paragraphs(count: int, seed: int = 42):
+    rnd = random.Random(seed)
+    paragraphs = []
+    for _ in range(count):
+        words = [rnd.choice(WORDS) for _ in range(rnd.randint(15, 80))]
+        words[0] = words[0].capitalize()
+        paragraphs.append(" ".join(words) + ".")
+    return paragraphs
+
+
+def main(count: int = 2000) -> dict:
+    print(f"⏱️  Разбивка на строки: {count} абзацев, кегль 16, ширина 4\"")
+    paragraphs = random_paragraphs(count)
+    width = Inches(4)
+    results = {}
+    for method in ("greedy", "optimal"):
+        for hyphenate in (False, True):
+            breaker = LineBreaker(TextMeasurer())
+            start = time.perf_counter()
+            layouts = [breaker.layout(text, width, Inches(5), 16, method=method, hyphenate=hyphenate)
+                       for text in paragraphs]
+            elapsed = time.perf_counter() - start
+            lines = sum(layout.line_count for layout in layouts)
+            # Неровность правого края: разброс заполнения строк (кроме последних)
+            fill = [breaker.measurer.text_width(line, 16) / width
+                    for layout in layouts for line in layout.lines[:-1]]
+            name = f"{method}{' + переносы' if hyphenate else ''}"
+            results[name] = {"paragraphs_per_second": count / elapsed, "lines": lines,
+                             "fill_mean": statistics.mean(fill), "fill_stdev": statistics.pstdev(fill)}
+            print(f"   {name:<20}: {count / elapsed:8.0f} абзацев/с  строк {lines:6d}  "
+                  f"заполнение строки {statistics.mean(fill):.3f} ± {statistics.pstdev(fill):.3f}")
+
+    breaker = LineBreaker(TextMeasurer())
+    boxes = [(text, Inches(random.Random(i).uniform(3, 9)), Inches(3)) for i, text in enumerate(paragraphs)]
+    for phase in ("подбор кегля", "повторный подбор"):
+        start = time.perf_counter()
+        sizes = [breaker.fit_font_size(text, box_width, box_height, 8, 24) for text, box_width, box_height in boxes]
+        elapsed = time.perf_counter() - start
+        results[phase] = count / elapsed
+        print(f"   {phase:<20}: {count / elapsed:8.0f} текстов/с  (средний кегль {statistics.mean(sizes):.1f})")
+
+    measurer = TextMeasurer()
+    same = sum(breaker.count_lines(text, box_width, 14) == measurer.count_lines(text, box_width, 14)
+               for text, box_width, _ in boxes)
+    print(f"   жадная разбивка совпадает с TextMeasurer: {same} из {count} {'✅' if same == count else '❌'}")
+    return results
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,87 @@
+# bench_nested_render.py - РЕНДЕР ВЛОЖЕННЫХ КОНТЕЙНЕРОВ
+"""
+Рендер деревьев элементов: широкого (контейнер-сетка с 10 000 детей)
+и глубокого (цепочка из 500 вложенных контейнеров). Обход идет стеком,
+поэтому глубина дерева не упирается в предел рекурсии. Для каждого дерева
+сравниваются backend'ы pptx, xml и параллельный рендер (2 воркера),
+XML слайдов должен совпадать. python-pptx ищет свободный id фигуры перебором
+всего дерева слайда (квадратично по числу фигур), поэтому backend pptx
+запускается только для деревьев до PPTX_LIMIT элементов.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_nested_render [ширина] [глубина]
+"""
+
+from V4.core import PresentationGenerator, Inches, RGBColor
+from V4.old_functions import ContentElement, ContentType, ElementStyle, LayoutStrategy
+from benchmarks.bench_render_backend import deck_xml
+import contextlib
+import io
+import sys
+import time
+
+PPTX_LIMIT = 2000
+
+
+def wide_tree(width: int) -> ContentElement:
+    root = ContentElement(id="wide", type=ContentType.CONTAINER, content="",
+                          layout_strategy=LayoutStrategy.GRID,
+                          x=Inches(0.5), y=Inches(1.2), width=Inches(12), height=Inches(6))
+    for i in range(width):
+        root.add_child(ContentElement(
+            id=f"tile_{i}", type=ContentType.SHAPE, content="",
+            style=ElementStyle(background_color=RGBColor(i % 256, 80, 120))
+        ))
+    return root
+
+
+def deep_tree(depth: int) -> ContentElement:
+    root = ContentElement(id="level_0", type=ContentType.CONTAINER, content="",
+                          x=Inches(0.5), y=Inches(1.2), width=Inches(12), height=Inches(6))
+    node = root
+    for i in range(1, depth):
+        child = ContentElement(
+            id=f"level_{i}", type=ContentType.TEXT if i % 2 else ContentType.CONTAINER,
+            content=f"Уровень {i}",
+            style=ElementStyle(padding=Inches(0.005), background_color=RGBColor(40, i % 256, 90))
+        )
+        node.add_child(child)
+        node = child
+    return root
+
+
+def render(tree_factory, size: int, mode: str):
+    with contextlib.redirect_stdout(io.StringIO()):
+        generator = PresentationGenerator(theme="dark_pro", render_backend="pptx" if mode == "pptx" else "xml")
+        generator.create_slide("Вложенные контейнеры")
+        generator.current_slide.add_element(tree_factory(size))
+        start = time.perf_counter()
+        if mode == "parallel":
+            generator.render_parallel(2)
+        else:
+            generator.current_slide.render()
+        elapsed = time.perf_counter() - start
+    return elapsed, generator
+
+
+def main(width: int = 10000, depth: int = 500) -> dict:
+    print(f"⏱️  Вложенные контейнеры: ширина {width}, глубина {depth}")
+    results = {}
+    for name, factory, size in (("wide", wide_tree, width), ("deep", deep_tree, depth)):
+        timings = {}
+        decks = {}
+        modes = ("pptx", "xml", "parallel") if size <= PPTX_LIMIT else ("xml", "parallel")
+        for mode in modes:
+            timings[mode], decks[mode] = render(factory, size, mode)
+        expected = deck_xml(decks["xml"])
+        identical = all(deck_xml(deck) == expected for deck in decks.values())
+        shapes = len(decks["xml"].current_slide.shape_map)
+        results[name] = dict(timings, shapes=shapes, identical=identical)
+        print(f"   {name:<5} ({shapes} фигур): " + "  ".join(f"{mode} {seconds:.3f} с" for mode, seconds in timings.items())
+              + f"  XML идентичен: {'✅' if identical else '❌'}")
+    return results
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*args)
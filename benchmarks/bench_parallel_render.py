@@ -0,0 +1,68 @@
+# bench_parallel_render.py - ПАРАЛЛЕЛЬНЫЙ РЕНДЕР V4
+"""
+Рендер детерминированной колоды последовательно и в пуле процессов
+с разным числом воркеров. Проверяет, что сохраненные файлы совпадают побайтно.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_parallel_render [число_слайдов]
+"""
+
+from benchmarks.bench_render_backend import build_deck
+from V4.core import Inches
+from PIL import Image
+import contextlib
+import hashlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+
+def make_images(folder: str, count: int = 4) -> list:
+    """Создает несколько PNG-картинок для слайдов"""
+    paths = []
+    for i in range(count):
+        path = os.path.join(folder, f"image_{i}.png")
+        Image.new("RGB", (320, 240), (40 * i, 120, 200)).save(path)
+        paths.append(path)
+    return paths
+
+
+def build_deck_with_images(num_slides: int, images: list):
+    generator = build_deck("xml", num_slides)
+    generator.media_manager.debug = False
+    rnd = random.Random(7)
+    for slide in generator.slides:
+        generator.current_slide = slide
+        generator.add_image(rnd.choice(images), Inches(9), Inches(4), Inches(3), Inches(2))
+    return generator
+
+
+def main(num_slides: int = 500):
+    print(f"⏱️  Параллельный рендер {num_slides} слайдов")
+    digests = {}
+
+    with tempfile.TemporaryDirectory() as folder:
+        images = make_images(folder)
+
+        for workers in (1, 2, 4, os.cpu_count() or 1):
+            generator = build_deck_with_images(num_slides, images)
+            start = time.perf_counter()
+            generator.render_parallel(max_workers=workers)
+            elapsed = time.perf_counter() - start
+
+            buffer = io.BytesIO()
+            with contextlib.redirect_stdout(io.StringIO()):
+                generator.save(buffer, deterministic=True)
+            digests[workers] = hashlib.sha256(buffer.getvalue()).hexdigest()
+            print(f"   воркеров: {workers:>2}  рендер: {elapsed:.3f} с  sha256: {digests[workers][:16]}")
+
+    identical = len(set(digests.values())) == 1
+    print(f"   Файлы идентичны: {'✅' if identical else '❌'}")
+    return digests
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,83 @@
+# bench_render_backend.py - СРАВНЕНИЕ BACKEND'ОВ РЕНДЕРА V4
+"""
+Сравнивает рендер слайдов через прокси python-pptx ("pptx")
+и пакетную генерацию XML ("xml") на детерминированной колоде.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_render_backend [число_слайдов]
+"""
+
+from V4.core import PresentationGenerator, Inches, RGBColor, Pt
+from V4.old_functions import PP_ALIGN
+from lxml import etree
+import contextlib
+import io
+import random
+import sys
+import time
+
+SHAPE_TYPES = ['rectangle', 'rounded_rect', 'oval', 'diamond', 'star', 'triangle']
+WORDS = ['анализ', 'данные', 'модель', 'система', 'рост', 'стратегия', 'инновации', 'результат']
+
+
+def build_deck(backend: str, num_slides: int, seed: int = 42) -> PresentationGenerator:
+    """Строит колоду из num_slides слайдов с фиксированным seed"""
+    rnd = random.Random(seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        generator = PresentationGenerator(theme="dark_pro", render_backend=backend)
+
+    for i in range(num_slides):
+        slide = generator.create_slide(f"Слайд {i + 1}")
+        for j in range(12):
+            x = Inches(rnd.uniform(0.5, 9))
+            y = Inches(rnd.uniform(1.2, 5))
+            kind = rnd.randrange(3)
+            if kind == 0:
+                text = " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(2, 20)))
+                generator.add_text(
+                    text, x, y, Inches(3), Inches(1),
+                    background_color=RGBColor(rnd.randrange(256), rnd.randrange(256), rnd.randrange(256)),
+                    border_color=RGBColor(200, 200, 200), text_color=RGBColor(255, 255, 255),
+                    bold=bool(j % 2), align=PP_ALIGN.CENTER
+                )
+            elif kind == 1:
+                generator.add_shape(
+                    rnd.choice(SHAPE_TYPES), x, y, Inches(1.5), Inches(1.5),
+                    background_color=RGBColor(rnd.randrange(256), 80, 120)
+                )
+            else:
+                generator.add_container(x, y, Inches(3), Inches(2), border_color=RGBColor(90, 90, 90), border_width=2)
+    return generator
+
+
+def render_deck(generator: PresentationGenerator) -> float:
+    """Рендерит все слайды и возвращает затраченное время"""
+    start = time.perf_counter()
+    for slide in generator.slides:
+        slide.render()
+    return time.perf_counter() - start
+
+
+def deck_xml(generator: PresentationGenerator) -> list:
+    """Канонический XML деревьев фигур для сравнения результатов"""
+    return [etree.tostring(slide.slide.shapes._spTree, method="c14n") for slide in generator.slides]
+
+
+def main(num_slides: int = 300):
+    print(f"⏱️  Рендер {num_slides} слайдов (12 элементов на слайд)")
+
+    results = {}
+    decks = {}
+    for backend in ("pptx", "xml"):
+        decks[backend] = build_deck(backend, num_slides)
+        results[backend] = render_deck(decks[backend])
+        print(f"   {backend:>5}: {results[backend]:.3f} с")
+
+    identical = deck_xml(decks["pptx"]) == deck_xml(decks["xml"])
+    print(f"   Ускорение: x{results['pptx'] / results['xml']:.1f}")
+    print(f"   XML идентичен: {'✅' if identical else '❌'}")
+    return results
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 300)
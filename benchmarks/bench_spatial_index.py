@@ -0,0 +1,55 @@
+# bench_spatial_index.py - ЗАПРОСЫ К ЗАНЯТЫМ ОБЛАСТЯМ
+"""
+Сравнивает поиск пересечений линейным проходом по списку (как раньше
+в SmartLayoutEngine.occupied_areas) и через сеточный индекс OccupiedAreas.
+Плотность фигур постоянна: площадь растет вместе с их числом, поэтому
+время запроса к индексу не должно расти с числом элементов.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_spatial_index
+"""
+
+from V4.old_functions import Inches
+from V4.spatial_index import OccupiedAreas, rects_overlap
+import math
+import random
+import sys
+import time
+
+
+def random_rects(rnd: random.Random, count: int, side: int) -> list:
+    return [
+        (rnd.randrange(side), rnd.randrange(side),
+         rnd.randrange(Inches(0.3), Inches(2)), rnd.randrange(Inches(0.3), Inches(1)))
+        for _ in range(count)
+    ]
+
+
+def main(sizes=(100, 1000, 10000, 100000), num_queries: int = 500, seed: int = 42) -> dict:
+    print(f"⏱️  Пересечения: {num_queries} запросов, линейный проход против сетки")
+    results = {}
+    for count in sizes:
+        rnd = random.Random(seed)
+        # Около 10 фигур на квадратный дюйм независимо от их числа
+        side = int(Inches(1) * math.sqrt(count / 10))
+        rects = random_rects(rnd, count, side)
+        queries = random_rects(rnd, num_queries, side)
+        index = OccupiedAreas(rects)
+
+        start = time.perf_counter()
+        linear = [[r for r in rects if rects_overlap(q, r)] for q in queries]
+        linear_us = (time.perf_counter() - start) / num_queries * 1e6
+
+        start = time.perf_counter()
+        indexed = [index.query_overlaps(q) for q in queries]
+        indexed_us = (time.perf_counter() - start) / num_queries * 1e6
+
+        assert indexed == linear
+        results[count] = {"linear_us": linear_us, "indexed_us": indexed_us}
+        print(f"   {count:>7} фигур: список {linear_us:9.1f} мкс  сетка {indexed_us:7.1f} мкс  "
+              f"(x{linear_us / indexed_us:.0f})")
+    return results
+
+
+if __name__ == "__main__":
+    main(tuple(int(arg) for arg in sys.argv[1:]) or (100, 1000, 10000, 100000))
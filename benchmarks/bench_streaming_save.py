@@ -0,0 +1,66 @@
+# bench_streaming_save.py - ПАМЯТЬ ПРИ ОБЫЧНОМ И ПОТОКОВОМ СОХРАНЕНИИ V4
+"""
+Колода с уникальной картинкой на каждом слайде: сравнивает пик памяти
+Python (tracemalloc) при save() в конце и при open_stream() до рендера.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_streaming_save [число_слайдов]
+"""
+
+from benchmarks.bench_render_backend import build_deck
+from V4.core import Inches
+from PIL import Image
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+
+def make_noise_images(folder: str, count: int, size: int = 400) -> list:
+    """PNG из шума плохо сжимаются - каждый весит около size*size*3 байт"""
+    rnd = random.Random(1)
+    paths = []
+    for i in range(count):
+        path = os.path.join(folder, f"noise_{i}.png")
+        Image.frombytes("RGB", (size, size), rnd.randbytes(size * size * 3)).save(path)
+        paths.append(path)
+    return paths
+
+
+def run(num_slides: int, images: list, target: str, streaming: bool) -> tuple:
+    generator = build_deck("xml", num_slides)
+    generator.media_manager.debug = False
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if streaming:
+            generator.open_stream(target)
+        for slide, image in zip(generator.slides, images):
+            generator.current_slide = slide
+            generator.add_image(image, Inches(9), Inches(4), Inches(3), Inches(2))
+            slide.render()
+        generator.save(target)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, os.path.getsize(target)
+
+
+def main(num_slides: int = 60):
+    print(f"💾 Сохранение {num_slides} слайдов с уникальными картинками")
+    with tempfile.TemporaryDirectory() as folder:
+        images = make_noise_images(folder, num_slides)
+        for streaming in (False, True):
+            target = os.path.join(folder, f"deck_{streaming}.pptx")
+            elapsed, peak, size = run(num_slides, images, target, streaming)
+            mode = "поток" if streaming else "save()"
+            print(f"   {mode:>6}: {elapsed:.2f} с  пик памяти: {peak / 2**20:.1f} МБ  файл: {size / 2**20:.1f} МБ")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 60)
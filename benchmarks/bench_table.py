@@ -0,0 +1,109 @@
+# bench_table.py - ТАБЛИЦА ИЗ ТЫСЯЧ СТРОК В V4
+"""
+Таблица из 10 000 строк (как результат запроса) с разбивкой на слайды:
+PresentationGenerator.add_table (ширины столбцов по измеренному тексту,
+XML ячеек одной строкой) против того же разбиения через python-pptx
+add_table и заполнение каждой ячейки прокси-вызовами. После сохранения
+файл читается обратно и текст всех ячеек сверяется с исходными строками.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_table [число_строк]
+"""
+
+from V4.core import PresentationGenerator, Inches, Pt
+from pptx import Presentation
+import contextlib
+import io
+import random
+import sys
+import time
+
+HEADERS = ["№", "Клиент", "Сумма, ₽", "Дата", "Комментарий"]
+WORDS = "заказ оплата возврат доставка скидка договор счет акт отгрузка резерв".split()
+
+
+def query_rows(count: int, seed: int = 42):
+    """Итератор строк, как курсор запроса к базе"""
+    rnd = random.Random(seed)
+    for i in range(count):
+        yield (i + 1, f"ООО «Клиент {rnd.randint(1, 500)}»", round(rnd.uniform(100, 1e6), 2),
+               f"2026-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}",
+               " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(1, 12))))
+
+
+def build_v4(count: int, backend: str):
+    with contextlib.redirect_stdout(io.StringIO()):
+        generator = PresentationGenerator(render_backend=backend)
+        generator.create_slide("Выгрузка заказов")
+        start = time.perf_counter()
+        parts = generator.add_table(query_rows(count), HEADERS)
+        laid_out = time.perf_counter()
+        for slide in generator.slides:
+            slide.render()
+        rendered = time.perf_counter()
+        stream = io.BytesIO()
+        generator.save(stream)
+        saved = time.perf_counter()
+    return generator, parts, stream, {"layout": laid_out - start, "render": rendered - laid_out,
+                                      "save": saved - rendered, "total": saved - start}
+
+
+def build_proxies(generator, parts):
+    """Те же страницы и ширины, но каждая ячейка - через прокси python-pptx"""
+    prs = Presentation()
+    prs.slide_width, prs.slide_height = generator.prs.slide_width, generator.prs.slide_height
+    start = time.perf_counter()
+    for part in parts:
+        slide = prs.slides.add_slide(prs.slide_layouts[6])
+        layout = part._table_layout[2]
+        headers, rows = part.content["headers"], part.content["rows"]
+        table = slide.shapes.add_table(len(rows) + 1, len(headers), part.x, part.y,
+                                       layout.width, layout.height).table
+        for column, width in zip(table.columns, layout.column_widths):
+            column.width = width
+        for row_index, (row, values) in enumerate(zip(table.rows, [headers] + rows)):
+            row.height = layout.header_height if row_index == 0 else layout.row_heights[row_index - 1]
+            for cell, value in zip(row.cells, values):
+                cell.text = value
+                for paragraph in cell.text_frame.paragraphs:
+                    for run in paragraph.runs:
+                        run.font.size = Pt(layout.font_size)
+                        run.font.bold = row_index == 0
+    stream = io.BytesIO()
+    prs.save(stream)
+    return time.perf_counter() - start
+
+
+def read_back(stream) -> list:
+    rows = []
+    for slide in Presentation(stream).slides:
+        for shape in slide.shapes:
+            if shape.has_table:
+                rows.extend(tuple(cell.text for cell in row.cells) for row in list(shape.table.rows)[1:])
+    return rows
+
+
+def main(count: int = 10000) -> dict:
+    print(f"⏱️  Таблица: {count} строк x {len(HEADERS)} столбцов")
+    results = {}
+    for backend in ("pptx", "xml"):
+        generator, parts, stream, times = build_v4(count, backend)
+        results[backend] = times
+        print(f"   add_table ({backend:<4}): разметка {times['layout']:.2f} с, рендер {times['render']:.2f} с, "
+              f"сохранение {times['save']:.2f} с, всего {times['total']:.2f} с, слайдов {len(parts)}")
+
+    widths = [round(width / Inches(1), 2) for width in parts[0]._table_layout[2].column_widths]
+    print(f"   ширины столбцов, дюймы: {widths}")
+    proxies = build_proxies(generator, parts)
+    results["proxies"] = proxies
+    print(f"   python-pptx по ячейкам: {proxies:.2f} с  (ускорение x{proxies / results['xml']['total']:.1f})")
+
+    expected = [tuple("" if value is None else str(value) for value in row) for row in query_rows(count)]
+    same = read_back(stream) == expected
+    print(f"   ячейки после чтения файла совпадают: {'✅' if same else '❌'}")
+    results["same"] = same
+    return results
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
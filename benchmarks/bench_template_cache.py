@@ -0,0 +1,53 @@
+# bench_template_cache.py - СОЗДАНИЕ НОВЫХ ПРЕЗЕНТАЦИЙ
+"""
+Время на одну новую колоду: Presentation() python-pptx против клона
+закэшированного шаблона, а также конструкторы PresentationGenerator (V4),
+PresentationTemplates (A1/A2) и PresentationBuilder (A3).
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_template_cache [число_колод]
+"""
+
+from V4.template_cache import new_presentation
+from V4.core import PresentationGenerator
+from pptx import Presentation
+import presentation_templatesА1 as a1
+import presentation_templatesА2 as a2
+import presentation_templatesА3 as a3
+import contextlib
+import io
+import sys
+import time
+
+SCENARIOS = {
+    "Presentation()": Presentation,
+    "new_presentation()": new_presentation,
+    "PresentationGenerator()": PresentationGenerator,
+    "A1 PresentationTemplates()": a1.PresentationTemplates,
+    "A2 PresentationTemplates()": a2.PresentationTemplates,
+    "A3 PresentationBuilder()": a3.PresentationBuilder,
+}
+
+
+def per_deck_ms(factory, num_decks: int) -> float:
+    factory()  # Первый вызов разбирает шаблон - в замер не входит
+    start = time.perf_counter()
+    for _ in range(num_decks):
+        factory()
+    return (time.perf_counter() - start) / num_decks * 1000
+
+
+def main(num_decks: int = 300) -> dict:
+    print(f"⏱️  Создание {num_decks} новых презентаций")
+    results = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for name, factory in SCENARIOS.items():
+            results[name] = per_deck_ms(factory, num_decks)
+    for name, ms in results.items():
+        print(f"   {name:<28} {ms:7.3f} мс на колоду")
+    print(f"   Ускорение new_presentation(): x{results['Presentation()'] / results['new_presentation()']:.1f}")
+    return results
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 300)
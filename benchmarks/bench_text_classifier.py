@@ -0,0 +1,80 @@
+# bench_text_classifier.py - КЛАССИФИКАЦИЯ ТЕКСТА НА 1 000 000 СТРОК
+"""
+TextClassifier против прежней _detect_text_type (цепочка any(marker in text)
+и проверок строки) на двух наборах по 1 000 000 строк: почти все строки
+разные и строки колоды, где одни и те же подписи и заголовки повторяются
+(10 000 различных). Категории обеих реализаций сверяются.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_text_classifier [число строк]
+"""
+
+from V4.text_classifier import TextClassifier
+import random
+import sys
+import time
+
+WORDS = ("Презентация данные анализ ИТОГИ Результат модели 2024 рост показатель выручка "
+         "• - — · 1. 2. 3. квартал стратегия Итог! Вопрос? Цели:").split()
+
+
+def legacy_category(text: str) -> str:
+    """Прежняя эвристика AdvancedTextModule._detect_text_type (без стилей)"""
+    if len(text) < 15:
+        return "caption"
+    if any(marker in text for marker in ['•', '-', '—', '·', '1.', '2.', '3.']):
+        return "subtitle"
+    if len(text) > 100:
+        return "main"
+    if len(text) < 50 and (text.isupper() or text[0].isupper() and text[-1] in '!?:'):
+        return "title"
+    return "main"
+
+
+def random_texts(count: int, distinct: int, seed: int = 42):
+    rnd = random.Random(seed)
+    pool = [" ".join(rnd.choice(WORDS) for _ in range(rnd.randint(1, 25))) for _ in range(distinct)]
+    if distinct >= count:
+        return pool[:count]
+    return [rnd.choice(pool) for _ in range(count)]
+
+
+def main(count: int = 1000000) -> dict:
+    print(f"⏱️  Классификация текста: {count} строк")
+    results = {}
+    for name, distinct in (("разные строки", count), ("строки колоды", 10000)):
+        texts = random_texts(count, distinct)
+
+        start = time.perf_counter()
+        expected = [legacy_category(text) for text in texts]
+        legacy_seconds = time.perf_counter() - start
+
+        classifier = TextClassifier()
+        start = time.perf_counter()
+        categories = classifier.categories(texts)
+        cold_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        classifier.categories(texts)
+        warm_seconds = time.perf_counter() - start
+
+        results[name] = {"legacy": legacy_seconds, "cold": cold_seconds, "warm": warm_seconds}
+        print(f"   {name} ({distinct} различных):")
+        print(f"      прежняя эвристика : {legacy_seconds:6.3f} с")
+        print(f"      categories()      : {cold_seconds:6.3f} с  (x{legacy_seconds / cold_seconds:.1f})")
+        print(f"      повторно (кэш)    : {warm_seconds:6.3f} с  (x{legacy_seconds / warm_seconds:.1f})")
+        print(f"      категории совпадают: {'✅' if categories == expected else '❌'}")
+
+    texts = random_texts(count, 10000)
+    classifier = TextClassifier()
+    start = time.perf_counter()
+    features = classifier.classify_many(texts)
+    seconds = time.perf_counter() - start
+    results["classify_many"] = seconds
+    print(f"   classify_many (признаки, 10000 различных): {seconds:6.3f} с  "
+          f"(пример: {features[0].as_dict()})")
+    return results
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,62 @@
+# bench_text_fit.py - ПОДБОР КЕГЛЯ ПО МЕТРИКАМ ШРИФТА
+"""
+Скорость AdvancedTextModule.calculate_font_size на случайных русских и
+английских текстах в прямоугольниках разного размера: первый проход
+с пустым кэшем ширин, второй - с заполненным. Для каждого результата
+проверяется, что текст действительно помещается в прямоугольник
+(или кегль упирается в минимум).
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_text_fit [число подборов]
+"""
+
+from V4.font_metrics import DEFAULT_INSET_X, DEFAULT_INSET_Y
+from V4.old_functions import ContentElement, ContentType, Inches
+from V4.text_module import AdvancedTextModule
+import random
+import sys
+import time
+
+WORDS = (
+    "презентация слайд данные анализ результат модель обучение нейросеть генерация текст "
+    "выручка квартал рост показатель стратегия рынок клиент продукт команда решение "
+    "presentation layout revenue growth quarter strategy market model training pipeline"
+).split()
+
+
+def random_cases(count: int, seed: int = 42):
+    rnd = random.Random(seed)
+    cases = []
+    for i in range(count):
+        text = " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(3, 60)))
+        element = ContentElement(id=f"text_{i}", type=ContentType.TEXT, content=text)
+        cases.append((element, Inches(rnd.uniform(2, 12)), Inches(rnd.uniform(0.5, 5))))
+    return cases
+
+
+def main(count: int = 5000) -> dict:
+    print(f"⏱️  Подбор кегля: {count} текстов")
+    cases = random_cases(count)
+    text_module = AdvancedTextModule()
+    results = {}
+    for phase in ("холодный кэш", "теплый кэш"):
+        start = time.perf_counter()
+        sizes = [text_module.calculate_font_size(element, width, height) for element, width, height in cases]
+        elapsed = time.perf_counter() - start
+        results[phase] = {"seconds": elapsed, "fits_per_second": count / elapsed}
+        print(f"   {phase:<13}: {elapsed * 1000:8.1f} мс  ({count / elapsed:9.0f} подборов/с)")
+
+    measurer = text_module.measurer
+    fitted = sum(
+        measurer.fits(element.content, width - 2 * DEFAULT_INSET_X, height - 2 * DEFAULT_INSET_Y, size)
+        for (element, width, height), size in zip(cases, sizes)
+    )
+    at_minimum = count - fitted
+    print(f"   помещается: {fitted}, не помещается даже минимальным кеглем: {at_minimum}")
+    print(f"   кэш ширин: {measurer.cache_info}")
+    results["fitted"] = fitted
+    return results
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
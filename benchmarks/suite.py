@@ -0,0 +1,348 @@
+# suite.py - НАБОР БЕНЧМАРКОВ ДЛЯ V4 И ШАБЛОНОВ A1/A2/A3
+"""
+Детерминированные (seed) колоды на 10, 100, 1 000 и 10 000 слайдов для
+PresentationGenerator (V4, backend'ы pptx и xml), PresentationTemplates (A1, A2)
+и PresentationBuilder (A3). Движок v4_layout - раскладка вложенных контейнеров
+с SizeConstraints (48 детей на слайд) и повторная раскладка после правки
+одного ребенка на слайде (кэш поддеревьев). По фазам замеряются время, пиковый RSS процесса
+и размер итогового файла. Каждый прогон идет в отдельном процессе, чтобы
+пиковый RSS не наследовался от предыдущих.
+
+Запуск из корня репозитория:
+    python -m benchmarks.suite [--sizes 10 100] [--engines v4 a2] [--output results.json]
+    python -m benchmarks.suite --compare old.json new.json
+"""
+
+from typing import Callable, Dict, List, Optional
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+SIZES = (10, 100, 1000, 10000)
+ENGINES = ("v4", "v4_xml", "v4_layout", "a1", "a2", "a3")
+DEFAULT_OUTPUT = "benchmark_results.json"
+
+TOPICS = [
+    "Искусственный интеллект", "Космические технологии", "Биотехнологии",
+    "Квантовые вычисления", "Устойчивая энергетика", "Робототехника",
+    "Кибербезопасность", "Интернет вещей", "Машинное обучение", "Компьютерное зрение",
+]
+ICON_TYPES = ['bullet', 'arrow', 'star', 'heart', 'lightning', 'diamond']
+WORDS = ['анализ', 'данные', 'модель', 'система', 'рост', 'стратегия', 'инновации', 'результат']
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Пиковый RSS текущего процесса в МБ (None, если недоступен)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux отдает килобайты, macOS - байты
+    return peak / (2 ** 20 if sys.platform == "darwin" else 2 ** 10)
+
+
+class PhaseTimer:
+    """Время и пиковый RSS после каждой фазы прогона"""
+
+    def __init__(self):
+        self.phases: Dict[str, Dict[str, Optional[float]]] = {}
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        yield
+        self.phases[name] = {
+            "seconds": time.perf_counter() - start,
+            "peak_rss_mb": peak_rss_mb(),
+        }
+
+
+# --- детерминированные нагрузки ---
+
+def template_slides_config(num_slides: int, seed: int, engine: str) -> List[Dict]:
+    """Конфигурация слайдов для create_presentation() из A1/A2"""
+    rnd = random.Random(seed)
+    extended = engine == "a2"
+    layouts = ['grid', 'list', 'arrow_list'] if extended else ['grid', 'list']
+    infographics = ['pyramid', 'circles', 'flowchart'] + (['arrow_flow'] if extended else [])
+
+    slides = [{'type': 'title', 'title': 'БЕНЧМАРК', 'subtitle': f'{num_slides} слайдов, seed {seed}'}]
+    for i in range(1, num_slides):
+        kind = rnd.choice(['info', 'infographic', 'content'])
+        title = f'СЛАЙД {i + 1}: {rnd.choice(TOPICS).upper()}'
+        if kind == 'info':
+            config = {
+                'type': 'info', 'title': title,
+                'content_points': [f'Ключевой аспект {j + 1}: ' + ' '.join(rnd.choice(WORDS) for _ in range(4))
+                                   for j in range(rnd.randint(3, 7))],
+                'icon_type': rnd.choice(ICON_TYPES),
+            }
+        elif kind == 'infographic':
+            config = {
+                'type': 'infographic', 'title': title,
+                'infographic_type': rnd.choice(infographics),
+                'data': {'items': [f'Уровень {j + 1}: ' + rnd.choice(WORDS) for j in range(rnd.randint(3, 6))]},
+            }
+        else:
+            config = {
+                'type': 'content', 'title': title,
+                'sections': [f'Компонент {j + 1}: ' + rnd.choice(WORDS) for j in range(rnd.randint(4, 8))],
+                'layout': rnd.choice(layouts),
+                'columns': rnd.randint(2, 3),
+            }
+            if extended:
+                config['icon_type'] = rnd.choice(ICON_TYPES)
+        if extended:
+            config['footnote'] = f'Слайд #{i + 1}'
+        slides.append(config)
+    return slides
+
+
+def run_v4(num_slides: int, seed: int, output: str, timer: PhaseTimer, backend: str = "pptx"):
+    with timer.phase("import"):
+        from benchmarks.bench_render_backend import build_deck
+    with timer.phase("build"):
+        generator = build_deck(backend, num_slides, seed)
+    with timer.phase("render"):
+        for slide in generator.slides:
+            slide.render()
+    with timer.phase("save"):
+        generator.save(output)
+
+
+def run_v4_layout(num_slides: int, seed: int, output: str, timer: PhaseTimer):
+    with timer.phase("import"):
+        from V4.core import PresentationGenerator, Inches
+        from V4.old_functions import ContentElement, ContentType, LayoutStrategy, SizeConstraints
+
+    rnd = random.Random(seed)
+    with timer.phase("build"):
+        generator = PresentationGenerator(theme="dark_pro")
+        containers = []
+        for i in range(num_slides):
+            slide = generator.create_slide(f"Слайд {i + 1}")
+            container = ContentElement(id=f"stack_{i}", type=ContentType.CONTAINER, content="",
+                                       layout_strategy=LayoutStrategy.VERTICAL_STACK,
+                                       x=Inches(0.5), y=Inches(1.2), width=Inches(12), height=Inches(5.8))
+            for r in range(3):
+                row = ContentElement(id=f"row_{i}_{r}", type=ContentType.CONTAINER, content="",
+                                     layout_strategy=LayoutStrategy.HORIZONTAL_STACK,
+                                     constraints=SizeConstraints(grow_priority=rnd.randint(1, 3)))
+                for j in range(16):
+                    row.add_child(ContentElement(
+                        id=f"tile_{i}_{r}_{j}", type=ContentType.SHAPE, content="",
+                        constraints=SizeConstraints(
+                            min_width=Inches(rnd.uniform(0.1, 0.5)) if rnd.random() < 0.3 else None,
+                            max_width=Inches(rnd.uniform(0.6, 1.2)) if rnd.random() < 0.3 else None,
+                            aspect_ratio=rnd.choice([None, None, 1.0, 1.5]),
+                            grow_priority=rnd.randint(0, 3),
+                        )
+                    ))
+                container.add_child(row)
+            slide.add_element(container)
+            containers.append(container)
+    engine = generator.layout_engine
+    with timer.phase("layout"):
+        for slide, container in zip(generator.slides, containers):
+            with engine.use_state(slide.layout_state):
+                engine.layout_tree(container)
+    with timer.phase("relayout"):
+        for slide, container in zip(generator.slides, containers):
+            container.children[rnd.randrange(3)].children[rnd.randrange(16)].constraints.min_width = Inches(0.7)
+            with engine.use_state(slide.layout_state):
+                engine.layout_tree(container)
+    with timer.phase("render"):
+        for slide in generator.slides:
+            slide.render()
+    with timer.phase("save"):
+        generator.save(output)
+
+
+def run_templates(num_slides: int, seed: int, output: str, timer: PhaseTimer, engine: str):
+    with timer.phase("import"):
+        module = __import__("presentation_templatesА1" if engine == "a1" else "presentation_templatesА2")
+    with timer.phase("build"):
+        slides_config = template_slides_config(num_slides, seed, engine)
+    with timer.phase("render"):
+        template = module.PresentationTemplates('blue_tech')
+        for slide_config in slides_config:
+            config = slide_config.copy()
+            getattr(template, f"create_{config.pop('type')}_slide")(**config)
+    with timer.phase("save"):
+        template.save(output)
+
+
+def run_a3(num_slides: int, seed: int, output: str, timer: PhaseTimer):
+    with timer.phase("import"):
+        import presentation_templatesА3 as a3
+        from pptx.util import Inches
+
+    rnd = random.Random(seed)
+    shape_types = ['rectangle', 'rounded_rect', 'oval', 'diamond', 'star', 'triangle']
+
+    with timer.phase("build"):
+        builder = a3.create_presentation("default")
+        slides = []
+        for i in range(num_slides):
+            slide = builder.create_slide(f"Слайд {i + 1}")
+            for j in range(12):
+                x = Inches(rnd.uniform(0.5, 9))
+                y = Inches(rnd.uniform(1.2, 5))
+                kind = rnd.randrange(3)
+                if kind == 0:
+                    text = " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(2, 20)))
+                    element = a3.create_text_element(text, x, y, Inches(3), Inches(1), f"text_{i}_{j}")
+                elif kind == 1:
+                    element = a3.create_shape_element(rnd.choice(shape_types), x, y,
+                                                      Inches(1.5), Inches(1.5), f"shape_{i}_{j}")
+                else:
+                    element = a3.create_container_element(x, y, Inches(3), Inches(2), f"container_{i}_{j}")
+                slide.add_element(element)
+            slides.append(slide)
+    with timer.phase("render"):
+        for slide in slides:
+            slide.render()
+    with timer.phase("save"):
+        builder.save(output)
+
+
+RUNNERS: Dict[str, Callable] = {
+    "v4": lambda n, seed, output, timer: run_v4(n, seed, output, timer, "pptx"),
+    "v4_xml": lambda n, seed, output, timer: run_v4(n, seed, output, timer, "xml"),
+    "v4_layout": run_v4_layout,
+    "a1": lambda n, seed, output, timer: run_templates(n, seed, output, timer, "a1"),
+    "a2": lambda n, seed, output, timer: run_templates(n, seed, output, timer, "a2"),
+    "a3": run_a3,
+}
+
+
+def run_case(engine: str, num_slides: int, seed: int) -> Dict:
+    """Один прогон в текущем процессе"""
+    timer = PhaseTimer()
+    with tempfile.TemporaryDirectory() as folder:
+        output = os.path.join(folder, "deck.pptx")
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            RUNNERS[engine](num_slides, seed, output, timer)
+        total = time.perf_counter() - start
+        size = os.path.getsize(output)
+
+    return {
+        "engine": engine,
+        "slides": num_slides,
+        "seed": seed,
+        "seconds": total,
+        "peak_rss_mb": peak_rss_mb(),
+        "output_bytes": size,
+        "phases": timer.phases,
+    }
+
+
+def run_case_subprocess(engine: str, num_slides: int, seed: int) -> Dict:
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.suite", "--case", engine, str(num_slides), "--seed", str(seed)],
+        capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        return {"engine": engine, "slides": num_slides, "seed": seed,
+                "error": completed.stderr.strip().splitlines()[-1:]}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(sizes, engines, seed: int = 42) -> Dict:
+    results = []
+    for num_slides in sizes:
+        for engine in engines:
+            result = run_case_subprocess(engine, num_slides, seed)
+            results.append(result)
+            print(format_result(result))
+
+    return {
+        "commit": git_commit(),
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "results": results,
+    }
+
+
+def format_result(result: Dict) -> str:
+    name = f"{result['engine']:>7} x {result['slides']:>5}"
+    if "error" in result:
+        return f"   {name}: ❌ {' '.join(result['error'])}"
+
+    phases = "  ".join(f"{phase} {stat['seconds']:.2f} с" for phase, stat in result["phases"].items())
+    rss = f"{result['peak_rss_mb']:.0f} МБ" if result["peak_rss_mb"] is not None else "н/д"
+    return (f"   {name}: {result['seconds']:.2f} с  RSS {rss}  "
+            f"файл {result['output_bytes'] / 2 ** 20:.2f} МБ  ({phases})")
+
+
+def compare(old_path: str, new_path: str, threshold: float = 0.10) -> int:
+    """Сравнивает два файла результатов; возвращает число регрессий по времени"""
+    with open(old_path, encoding="utf-8") as f:
+        old = {(r["engine"], r["slides"]): r for r in json.load(f)["results"] if "error" not in r}
+    with open(new_path, encoding="utf-8") as f:
+        new = [r for r in json.load(f)["results"] if "error" not in r]
+
+    regressions = 0
+    print(f"📈 Сравнение {old_path} -> {new_path}")
+    for result in new:
+        before = old.get((result["engine"], result["slides"]))
+        if not before:
+            continue
+        ratio = result["seconds"] / before["seconds"] if before["seconds"] else 1.0
+        mark = "❌" if ratio > 1 + threshold else "✅"
+        regressions += ratio > 1 + threshold
+        print(f"   {mark} {result['engine']:>7} x {result['slides']:>5}: "
+              f"{before['seconds']:.2f} с -> {result['seconds']:.2f} с (x{ratio:.2f})")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарки генераторов презентаций")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=list(ENGINES))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--case", nargs=2, metavar=("ENGINE", "SLIDES"), help=argparse.SUPPRESS)
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    args = parser.parse_args(argv)
+
+    if args.case:
+        print(json.dumps(run_case(args.case[0], int(args.case[1]), args.seed)))
+        return 0
+    if args.compare:
+        return 1 if compare(*args.compare) else 0
+
+    print(f"⏱️  Бенчмарки: слайды {args.sizes}, движки {args.engines}, seed {args.seed}")
+    report = run_suite(args.sizes, args.engines, args.seed)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"✅ Результаты сохранены: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,6 +6,8 @@ from pptx.enum.shapes import MSO_SHAPE, MSO_CONNECTOR
 from pptx.dml.color import RGBColor
 from dataclasses import dataclass
 from typing import List, Dict, Tuple, Optional
+from V4.template_cache import new_presentation
+from V4.package_writer import StreamingPackageWriter
 import math
 
 @dataclass
@@ -118,12 +120,15 @@ class SmartShape:
 class PresentationTemplates:
     """Основной класс библиотеки шаблонов"""
     
-    def __init__(self, theme: str = 'blue_tech'):
-        self.prs = Presentation()
+    def __init__(self, theme: str = 'blue_tech', template: str = None):
+        self.prs = new_presentation(template)
         self.prs.slide_width = Inches(13.333)
         self.prs.slide_height = Inches(7.5)
         self.color_scheme = ColorThemes.get_theme(theme)
         self.current_slide = None
+        self.stream_writer = None
+        # Последний созданный слайд: в поток он пишется, когда вызывающий код с ним закончил
+        self._pending_slide = None
     
     # ===== ШАБЛОН 1: ТИТУЛЬНЫЙ СЛАЙД =====
     def create_title_slide(self, title: str, subtitle: str = None, 
@@ -197,7 +202,7 @@ class PresentationTemplates:
             run.font.size = Pt(14)
             run.font.color.rgb = self.color_scheme.text
         
-        return slide
+        return self._finish_slide(slide)
     
     # ===== ШАБЛОН 2: СОДЕРЖАНИЕ =====
     def create_content_slide(self, title: str, sections: List[str], 
@@ -216,7 +221,7 @@ class PresentationTemplates:
         elif layout == 'list':
             self._create_list_layout(slide, sections)
         
-        return slide
+        return self._finish_slide(slide)
     
     def _create_grid_layout(self, slide, sections: List[str], columns: int):
         """Сеточное расположение разделов"""
@@ -321,7 +326,7 @@ class PresentationTemplates:
                 placeholder.fill.solid()
                 placeholder.fill.fore_color.rgb = self.color_scheme.secondary
         
-        return slide
+        return self._finish_slide(slide)
     
     # ===== ШАБЛОН 4: ИНФОГРАФИКА =====
     def create_infographic_slide(self, title: str, infographic_type: str, 
@@ -341,7 +346,7 @@ class PresentationTemplates:
         elif infographic_type == 'flowchart':
             self._create_flowchart(slide, data, **kwargs)
         
-        return slide
+        return self._finish_slide(slide)
     
     def _create_connected_circles(self, slide, data: Dict, radius: float = 1.5):
         """Создание связанных кругов"""
@@ -495,7 +500,7 @@ class PresentationTemplates:
                 placeholder.fill.solid()
                 placeholder.fill.fore_color.rgb = self.color_scheme.secondary
         
-        return slide
+        return self._finish_slide(slide)
     
     # ===== ВСПОМОГАТЕЛЬНЫЕ МЕТОДЫ =====
     def _add_background(self, slide):
@@ -539,17 +544,46 @@ class PresentationTemplates:
                 logo.fill.solid()
                 logo.fill.fore_color.rgb = self.color_scheme.primary
     
-    def save(self, filename: str):
+    def open_stream(self, target):
+        """Потоковое сохранение: готовые слайды пишутся в target (путь или поток)
+        
+        Слайд, который вернул create_*, можно дополнять до создания следующего
+        слайда или до save() - тогда он уходит в поток, и фигуры из него убираются.
+        """
+        self.stream_writer = StreamingPackageWriter(self.prs, target)
+        return self.stream_writer
+    
+    def _finish_slide(self, slide):
+        if self.stream_writer:
+            self._flush_pending_slide()
+            self._pending_slide = slide
+        return slide
+    
+    def _flush_pending_slide(self):
+        if self._pending_slide is not None:
+            self.stream_writer.write_slide(self._pending_slide)
+            self._pending_slide = None
+    
+    def save(self, filename: str = None):
         """Сохранение презентации"""
+        if self.stream_writer:
+            self._flush_pending_slide()
+            self.stream_writer.close()
+            print("✅ Презентация сохранена в поток")
+            return
+        
         self.prs.save(filename)
         print(f"✅ Презентация сохранена: {filename}")
 
 # ===== ИСПРАВЛЕННЫЙ ПРОСТОЙ ИНТЕРФЕЙС =====
 def create_presentation(slides_config: List[Dict], theme: str = 'blue_tech', 
-                       output_file: str = 'presentation.pptx'):
+                       output_file: str = 'presentation.pptx', stream: bool = False):
     """Простой интерфейс для создания презентации"""
     
     template = PresentationTemplates(theme)
+    if stream:
+        # output_file может быть путем, pipe или любым объектом с write()
+        template.open_stream(output_file)
     
     for slide_config in slides_config:
         # Создаем копию конфигурации без ключа 'type'
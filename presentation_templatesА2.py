@@ -5,9 +5,20 @@ from pptx.enum.text import PP_ALIGN
 from pptx.enum.shapes import MSO_SHAPE, MSO_CONNECTOR
 from pptx.dml.color import RGBColor
 from dataclasses import dataclass
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Sequence, Tuple
+from V4.template_cache import new_presentation
+from V4.package_writer import StreamingPackageWriter
+from V4.render_backend import escape_text
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import nsdecls, qn
+from xml.sax.saxutils import escape
 import math
 
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен
+    np = None
+
 @dataclass
 class ColorScheme:
     """Улучшенная цветовая схема с поддержкой темных тем"""
@@ -215,15 +226,187 @@ class SmartShape:
             return max(8, base_size - (len(text) - max_length) // 5)
         return base_size
 
+# ===== МАРКИРОВАННЫЙ СПИСОК ОДНИМ ТЕКСТОВЫМ ПОЛЕМ =====
+# Символ маркера для каждого типа иконки (остальные - круг)
+BULLET_CHARS = {
+    'bullet': '●', 'circle': '●', 'square': '■', 'rectangle': '■', 'rounded_rect': '■',
+    'diamond': '◆', 'arrow': '➤', 'left_arrow': '◄', 'up_arrow': '▲', 'down_arrow': '▼',
+    'triangle': '▲', 'star': '★', 'heart': '♥', 'lightning': '⚡',
+}
+
+LIST_MODES = ('shapes', 'bullets')
+
+_BULLET_LIST_TEMPLATE = (
+    '<p:sp><p:nvSpPr><p:cNvPr id="%d" name="TextBox %d"/><p:cNvSpPr txBox="1"/><p:nvPr/></p:nvSpPr>'
+    '<p:spPr><a:xfrm><a:off x="%d" y="%d"/><a:ext cx="%d" cy="%d"/></a:xfrm>'
+    '<a:prstGeom prst="rect"><a:avLst/></a:prstGeom><a:noFill/></p:spPr>'
+    '<p:txBody><a:bodyPr wrap="square"><a:noAutofit/></a:bodyPr><a:lstStyle/>%s</p:txBody></p:sp>'
+)
+
+def bullet_list_xml(shape_id: int, x, y, width, height, points: List[str], font_size: int,
+                    color: RGBColor, bullet_color: RGBColor, bullet: str = '●',
+                    bullet_rid: str = None, indent=Inches(0.6), spacing=Inches(0.8)) -> str:
+    """XML p:sp текстового поля, где каждый пункт - абзац с маркером
+
+    bullet_rid - связь с картинкой для графического маркера (a:buBlip) вместо символа.
+    Расстояние между первыми строками соседних пунктов - spacing, как у списка из фигур.
+    """
+    if bullet_rid:
+        marker = '<a:buSzPct val="100000"/><a:buBlip><a:blip r:embed="%s"/></a:buBlip>' % bullet_rid
+    else:
+        marker = ('<a:buClr><a:srgbClr val="%s"/></a:buClr><a:buSzPct val="125000"/>'
+                  '<a:buFont typeface="Arial"/><a:buChar char="%s"/>' % (bullet_color, escape(bullet, {'"': "&quot;"})))
+    # Отступ перед абзацем добирает высоту строки до шага списка
+    space_before = max(0, int(spacing.pt * 100) - font_size * 120)
+    size = font_size * 100
+    paragraphs = []
+    for i, point in enumerate(points):
+        spacing_xml = '<a:spcBef><a:spcPts val="%d"/></a:spcBef>' % space_before if i else ''
+        paragraphs.append(
+            '<a:p><a:pPr marL="%d" indent="%d">%s%s</a:pPr>'
+            '<a:r><a:rPr lang="ru-RU" sz="%d" dirty="0"><a:solidFill><a:srgbClr val="%s"/></a:solidFill></a:rPr>'
+            '<a:t>%s</a:t></a:r></a:p>' % (indent, -indent, spacing_xml, marker, size, color, escape_text(point))
+        )
+    if not paragraphs:
+        paragraphs.append('<a:p/>')
+    return _BULLET_LIST_TEMPLATE % (shape_id, shape_id - 1, int(x), int(y), int(width), int(height),
+                                    "".join(paragraphs))
+
+
+def add_bullet_list(slide, x, y, width, height, points: List[str], font_size: int,
+                    color: RGBColor, bullet_color: RGBColor, icon_type: str = 'bullet',
+                    bullet_image: str = None, **kwargs):
+    """Добавляет на слайд список одной фигурой: XML строится целиком и разбирается один раз"""
+    bullet_rid = None
+    if bullet_image:
+        try:
+            _, bullet_rid = slide.part.get_or_add_image_part(bullet_image)
+        except OSError as error:
+            # Нет файла или не картинка - маркер символом
+            print(f"⚠️  Маркер-картинка не загружена ({bullet_image}): {error}")
+    sp_tree = slide.shapes._spTree
+    shape_id = sp_tree.max_shape_id + 1
+    xml = bullet_list_xml(shape_id, x, y, width, height, points, font_size, color, bullet_color,
+                          BULLET_CHARS.get(icon_type, '●'), bullet_rid, **kwargs)
+    sp = parse_xml('<p:spTree %s>%s</p:spTree>' % (nsdecls("a", "p", "r"), xml))[0]
+    ext_lst = sp_tree.find(qn("p:extLst"))
+    if ext_lst is not None:
+        ext_lst.addprevious(sp)
+    else:
+        sp_tree.append(sp)
+    return slide.shapes._shape_factory(sp)
+
+# ===== ТОПОЛОГИИ СВЯЗАННЫХ КРУГОВ И СОЕДИНИТЕЛИ ОДНИМ БЛОКОМ =====
+TOPOLOGIES = ('complete', 'ring', 'star', 'knn', 'edges')
+
+# Тот же p:cxnSp, что строит python-pptx add_connector, плюс линия цвета и толщины
+_CONNECTOR_TEMPLATE = (
+    '<p:cxnSp><p:nvCxnSpPr><p:cNvPr id="%d" name="Connector %d"/><p:cNvCxnSpPr/><p:nvPr/></p:nvCxnSpPr>'
+    '<p:spPr><a:xfrm%s><a:off x="%d" y="%d"/><a:ext cx="%d" cy="%d"/></a:xfrm>'
+    '<a:prstGeom prst="line"><a:avLst/></a:prstGeom>'
+    '<a:ln w="%d"><a:solidFill><a:srgbClr val="%s"/></a:solidFill></a:ln></p:spPr>'
+    '<p:style><a:lnRef idx="2"><a:schemeClr val="accent1"/></a:lnRef>'
+    '<a:fillRef idx="0"><a:schemeClr val="accent1"/></a:fillRef>'
+    '<a:effectRef idx="1"><a:schemeClr val="accent1"/></a:effectRef>'
+    '<a:fontRef idx="minor"><a:schemeClr val="tx1"/></a:fontRef></p:style></p:cxnSp>'
+)
+
+# Индекс - flipH + 2 * flipV
+_CONNECTOR_FLIPS = ('', ' flipH="1"', ' flipV="1"', ' flipH="1" flipV="1"')
+
+
+def topology_edges(count: int, topology: str = 'complete', k: int = 2, hub: int = 0,
+                   edges: Sequence[Tuple[int, int]] = None) -> List[Tuple[int, int]]:
+    """Пары индексов кругов, которые соединяются
+
+    complete - все пары (n(n-1)/2 связей), ring - соседние по кругу, star - hub
+    со всеми остальными, knn - каждый круг с k ближайшими (на правильном
+    многоугольнике это соседи на 1..ceil(k/2) позиций в обе стороны),
+    edges - явный список пар. Кроме complete, связей O(n).
+    """
+    if topology == 'complete':
+        return [(i, j) for i in range(count) for j in range(i + 1, count)]
+    if topology == 'ring':
+        if count < 3:
+            return [(0, 1)] if count == 2 else []
+        return [(i, (i + 1) % count) for i in range(count)]
+    if topology == 'star':
+        if not 0 <= hub < count:
+            raise ValueError(f"Центр звезды {hub} вне диапазона 0..{count - 1}")
+        return [(hub, i) for i in range(count) if i != hub]
+    if topology == 'knn':
+        pairs = {}
+        for offset in range(1, min((k + 1) // 2, count // 2) + 1):
+            for i in range(count):
+                j = (i + offset) % count
+                pairs.setdefault((min(i, j), max(i, j)))
+        return list(pairs)
+    if topology == 'edges':
+        pairs = []
+        for i, j in edges or ():
+            if not (0 <= i < count and 0 <= j < count) or i == j:
+                raise ValueError(f"Неверная связь ({i}, {j}) для {count} кругов")
+            pairs.append((i, j))
+        return pairs
+    raise ValueError(f"Неизвестная топология: {topology} (доступны: {', '.join(TOPOLOGIES)})")
+
+
+def connector_xml(first_id: int, centers_x: Sequence[int], centers_y: Sequence[int],
+                  pairs: Sequence[Tuple[int, int]], color: RGBColor, width=Pt(2)) -> str:
+    """XML прямых соединителей между центрами кругов одной строкой
+
+    Координаты, размеры и отражения всех соединителей считаются одним
+    проходом по массивам (с NumPy - векторно); координаты - целые EMU.
+    """
+    if not pairs:
+        return ''
+    if np is not None:
+        index = np.asarray(pairs, dtype=np.int64)
+        xs = np.asarray(centers_x, dtype=np.int64)
+        ys = np.asarray(centers_y, dtype=np.int64)
+        begin_x, end_x = xs[index[:, 0]], xs[index[:, 1]]
+        begin_y, end_y = ys[index[:, 0]], ys[index[:, 1]]
+        columns = (np.minimum(begin_x, end_x), np.minimum(begin_y, end_y),
+                   np.abs(end_x - begin_x), np.abs(end_y - begin_y),
+                   (begin_x > end_x).astype(np.int64) + 2 * (begin_y > end_y))
+        rows = zip(*(column.tolist() for column in columns))
+    else:
+        rows = ((min(centers_x[i], centers_x[j]), min(centers_y[i], centers_y[j]),
+                 abs(centers_x[j] - centers_x[i]), abs(centers_y[j] - centers_y[i]),
+                 (centers_x[i] > centers_x[j]) + 2 * (centers_y[i] > centers_y[j])) for i, j in pairs)
+    return "".join(_CONNECTOR_TEMPLATE % (shape_id, shape_id - 1, _CONNECTOR_FLIPS[flip], x, y, cx, cy,
+                                          width, color)
+                   for shape_id, (x, y, cx, cy, flip) in enumerate(rows, first_id))
+
+
+def add_connectors(slide, centers_x: Sequence[int], centers_y: Sequence[int],
+                   pairs: Sequence[Tuple[int, int]], color: RGBColor, width=Pt(2)) -> int:
+    """Добавляет все соединители одним разбором XML вместо add_connector на каждую пару"""
+    sp_tree = slide.shapes._spTree
+    xml = connector_xml(sp_tree.max_shape_id + 1, centers_x, centers_y, pairs, color, width)
+    if not xml:
+        return 0
+    connectors = list(parse_xml('<p:spTree %s>%s</p:spTree>' % (nsdecls("a", "p"), xml)))
+    ext_lst = sp_tree.find(qn("p:extLst"))
+    for connector in connectors:
+        if ext_lst is not None:
+            ext_lst.addprevious(connector)
+        else:
+            sp_tree.append(connector)
+    return len(connectors)
+
 class PresentationTemplates:
     """Основной класс библиотеки шаблонов"""
     
-    def __init__(self, theme: str = 'blue_tech'):
-        self.prs = Presentation()
+    def __init__(self, theme: str = 'blue_tech', template: str = None):
+        self.prs = new_presentation(template)
         self.prs.slide_width = Inches(13.333)
         self.prs.slide_height = Inches(7.5)
         self.color_scheme = ColorThemes.get_theme(theme)
         self.current_slide = None
+        self.stream_writer = None
+        # Последний созданный слайд: в поток он пишется, когда вызывающий код с ним закончил
+        self._pending_slide = None
     
     # ===== ВСЕ МЕТОДЫ ИЗ 2А.txt С УЛУЧШЕНИЯМИ ИЗ 2Г.txt =====
     
@@ -296,12 +479,16 @@ class PresentationTemplates:
         if footnote:
             self._add_footnote(slide, footnote)
         
-        return slide
+        return self._finish_slide(slide)
     
     def create_content_slide(self, title: str, sections: List[str], 
                            layout: str = 'grid', columns: int = 2,
-                           icon_type: str = 'bullet', footnote: str = None):
-        """Создание слайда содержания"""
+                           icon_type: str = 'bullet', footnote: str = None,
+                           uniform_font: bool = False):
+        """Создание слайда содержания
+
+        uniform_font=True - все ячейки сетки одним кеглем (по самому длинному разделу).
+        """
         slide = self.prs.slides.add_slide(self.prs.slide_layouts[6])
         self.current_slide = slide
         self._add_background(slide)
@@ -309,7 +496,7 @@ class PresentationTemplates:
         self._add_title(slide, title)
         
         if layout == 'grid':
-            self._create_grid_layout(slide, sections, columns, icon_type)
+            self._create_grid_layout(slide, sections, columns, icon_type, uniform_font)
         elif layout == 'list':
             self._create_list_layout(slide, sections, icon_type)
         elif layout == 'arrow_list':
@@ -318,9 +505,10 @@ class PresentationTemplates:
         if footnote:
             self._add_footnote(slide, footnote)
         
-        return slide
+        return self._finish_slide(slide)
     
-    def _create_grid_layout(self, slide, sections: List[str], columns: int, icon_type: str):
+    def _create_grid_layout(self, slide, sections: List[str], columns: int, icon_type: str,
+                            uniform_font: bool = False):
         """Сеточное расположение разделов"""
         num_sections = len(sections)
         rows = (num_sections + columns - 1) // columns
@@ -328,6 +516,7 @@ class PresentationTemplates:
         section_width = (self.prs.slide_width - Inches(2)) / columns
         section_height = Inches(4.5) / rows if rows > 0 else Inches(4.5)
         
+        boxes = []
         for i, section in enumerate(sections):
             row = i // columns
             col = i % columns
@@ -335,12 +524,18 @@ class PresentationTemplates:
             x = Inches(1) + col * section_width
             y = Inches(2) + row * section_height
             
-            box = SmartShape(
+            boxes.append(SmartShape(
                 slide, MSO_SHAPE.ROUNDED_RECTANGLE,
                 x, y, section_width - Inches(0.5), section_height - Inches(0.3),
                 self.color_scheme
-            )
-            box.set_text(section)
+            ))
+        
+        # По умолчанию кегль подбирается для каждой ячейки отдельно
+        font_size = None
+        if uniform_font:
+            font_size = min((box._calculate_font_size(section) for box, section in zip(boxes, sections)), default=None)
+        for box, section in zip(boxes, sections):
+            box.set_text(section, font_size)
     
     def _create_list_layout(self, slide, sections: List[str], icon_type: str):
         """Списочное расположение разделов"""
@@ -395,8 +590,16 @@ class PresentationTemplates:
     
     def create_info_slide(self, title: str, content_points: List[str], 
                          image_path: str = None, icon_type: str = 'bullet',
-                         footnote: str = None, subheading: str = None):
-        """Создание слайда с текстом и изображением"""
+                         footnote: str = None, subheading: str = None,
+                         list_mode: str = 'shapes', bullet_image: str = None):
+        """Создание слайда с текстом и изображением
+
+        list_mode='shapes' - иконка и текстовое поле на каждый пункт;
+        list_mode='bullets' - все пункты абзацами одного текстового поля с маркерами
+        (символ по icon_type или картинка bullet_image).
+        """
+        if list_mode not in LIST_MODES:
+            raise ValueError(f"Неизвестный режим списка: {list_mode} (доступны: {', '.join(LIST_MODES)})")
         slide = self.prs.slides.add_slide(self.prs.slide_layouts[6])
         self.current_slide = slide
         self._add_background(slide)
@@ -410,24 +613,32 @@ class PresentationTemplates:
         content_x = Inches(1)
         content_start_y = Inches(2.5) if subheading else Inches(2)
         
-        for i, point in enumerate(content_points):
-            y_pos = content_start_y + i * Inches(0.8)
-            
-            IconLibrary.create_icon(
-                slide, content_x, y_pos, icon_type, self.color_scheme.accent
+        if list_mode == 'bullets':
+            add_bullet_list(
+                slide, content_x, content_start_y - Inches(0.1),
+                content_width, len(content_points) * Inches(0.8),
+                content_points, 16, self.color_scheme.get_text_color(),
+                self.color_scheme.accent, icon_type, bullet_image
             )
+        else:
+            for i, point in enumerate(content_points):
+                y_pos = content_start_y + i * Inches(0.8)
             
-            text_box = slide.shapes.add_textbox(
-                content_x + Inches(0.6), y_pos - Inches(0.1),
-                content_width - Inches(0.6), Inches(0.6)
-            )
-            text_frame = text_box.text_frame
-            text_frame.clear()
-            p = text_frame.paragraphs[0]
-            run = p.add_run()
-            run.text = point
-            run.font.size = Pt(16)
-            run.font.color.rgb = self.color_scheme.get_text_color()
+                IconLibrary.create_icon(
+                    slide, content_x, y_pos, icon_type, self.color_scheme.accent
+                )
+            
+                text_box = slide.shapes.add_textbox(
+                    content_x + Inches(0.6), y_pos - Inches(0.1),
+                    content_width - Inches(0.6), Inches(0.6)
+                )
+                text_frame = text_box.text_frame
+                text_frame.clear()
+                p = text_frame.paragraphs[0]
+                run = p.add_run()
+                run.text = point
+                run.font.size = Pt(16)
+                run.font.color.rgb = self.color_scheme.get_text_color()
         
         if image_path:
             img_width = self.prs.slide_width * 0.5 - Inches(1)
@@ -448,7 +659,7 @@ class PresentationTemplates:
         if footnote:
             self._add_footnote(slide, footnote)
         
-        return slide
+        return self._finish_slide(slide)
     
     def create_infographic_slide(self, title: str, infographic_type: str, 
                                data: Dict, footnote: str = None, **kwargs):
@@ -471,10 +682,17 @@ class PresentationTemplates:
         if footnote:
             self._add_footnote(slide, footnote)
         
-        return slide
+        return self._finish_slide(slide)
     
-    def _create_connected_circles(self, slide, data: Dict, radius: float = 1.5):
-        """Создание связанных кругов"""
+    def _create_connected_circles(self, slide, data: Dict, radius: float = 1.5,
+                                  topology: str = 'complete', k: int = 2, hub: int = 0,
+                                  edges: List[Tuple[int, int]] = None):
+        """Создание связанных кругов
+        
+        topology - какие круги соединяются (TOPOLOGIES): complete - все пары,
+        ring, star (круг hub - в центре), knn (k ближайших), edges - явный
+        список пар индексов (edges или data['edges']).
+        """
         center_x = self.prs.slide_width / 2
         center_y = self.prs.slide_height / 2 + Inches(0.5)
         
@@ -483,13 +701,21 @@ class PresentationTemplates:
         
         if num_items == 0:
             return
-            
-        circles = []
         
+        if edges is None:
+            edges = data.get('edges')
+        pairs = topology_edges(num_items, topology, k, hub, edges)
+        
+        # У звезды центр - в середине, остальные круги - по окружности
+        on_ring = [i for i in range(num_items) if not (topology == 'star' and i == hub)]
+        positions = {i: 2 * math.pi * n / len(on_ring) for n, i in enumerate(on_ring)}
+        
+        centers_x, centers_y = [], []
         for i, item in enumerate(items):
-            angle = 2 * math.pi * i / num_items
-            x = center_x + Inches(radius) * math.cos(angle) - Inches(0.8)
-            y = center_y + Inches(radius) * math.sin(angle) - Inches(0.8)
+            angle = positions.get(i)
+            ring_radius = Inches(radius) if angle is not None else 0
+            x = center_x + ring_radius * math.cos(angle or 0) - Inches(0.8)
+            y = center_y + ring_radius * math.sin(angle or 0) - Inches(0.8)
             
             circle = SmartShape(
                 slide, MSO_SHAPE.OVAL,
@@ -497,18 +723,10 @@ class PresentationTemplates:
             )
             text = item.get('text', item) if isinstance(item, dict) else item
             circle.set_text(text)
-            center_circle_x = x + Inches(0.8)
-            center_circle_y = y + Inches(0.8)
-            circles.append((circle, center_circle_x, center_circle_y))
-        
-        for i in range(len(circles)):
-            for j in range(i + 1, len(circles)):
-                circle1, x1, y1 = circles[i]
-                circle2, x2, y2 = circles[j]
-                
-                IconLibrary.create_arrow_connector(
-                    slide, x1, y1, x2, y2, self.color_scheme.secondary
-                )
+            centers_x.append(int(x + Inches(0.8)))
+            centers_y.append(int(y + Inches(0.8)))
+        
+        add_connectors(slide, centers_x, centers_y, pairs, self.color_scheme.secondary)
     
     def _create_pyramid(self, slide, data: Dict):
         """Создание пирамиды"""
@@ -642,7 +860,7 @@ class PresentationTemplates:
         if footnote:
             self._add_footnote(slide, footnote)
         
-        return slide
+        return self._finish_slide(slide)
     
     # ===== ВСПОМОГАТЕЛЬНЫЕ МЕТОДЫ =====
     def _add_background(self, slide):
@@ -711,14 +929,43 @@ class PresentationTemplates:
                 logo.fill.solid()
                 logo.fill.fore_color.rgb = self.color_scheme.primary
     
-    def save(self, filename: str):
+    def open_stream(self, target):
+        """Потоковое сохранение: готовые слайды пишутся в target (путь или поток)
+        
+        Слайд, который вернул create_*, можно дополнять до создания следующего
+        слайда или до save() - тогда он уходит в поток, и фигуры из него убираются.
+        """
+        self.stream_writer = StreamingPackageWriter(self.prs, target)
+        return self.stream_writer
+    
+    def _finish_slide(self, slide):
+        if self.stream_writer:
+            self._flush_pending_slide()
+            self._pending_slide = slide
+        return slide
+    
+    def _flush_pending_slide(self):
+        if self._pending_slide is not None:
+            self.stream_writer.write_slide(self._pending_slide)
+            self._pending_slide = None
+    
+    def save(self, filename: str = None):
+        if self.stream_writer:
+            self._flush_pending_slide()
+            self.stream_writer.close()
+            print("✅ Презентация сохранена в поток")
+            return
+        
         self.prs.save(filename)
         print(f"✅ Презентация сохранена: {filename}")
 
 # ===== ПРОСТОЙ ИНТЕРФЕЙС =====
 def create_presentation(slides_config: List[Dict], theme: str = 'blue_tech', 
-                       output_file: str = 'presentation.pptx'):
+                       output_file: str = 'presentation.pptx', stream: bool = False):
     template = PresentationTemplates(theme)
+    if stream:
+        # output_file может быть путем, pipe или любым объектом с write()
+        template.open_stream(output_file)
     
     for slide_config in slides_config:
         config = slide_config.copy()
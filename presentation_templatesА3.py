@@ -12,6 +12,9 @@ from pptx.dml.color import RGBColor
 from dataclasses import dataclass, field
 from typing import List, Dict, Optional, Union, Tuple
 from enum import Enum
+from V4.container_layout import grid_rects, stack_rects
+from V4.template_cache import new_presentation
+from V4.text_classifier import TextClassifier
 import math
 
 # ===== БАЗОВЫЕ ТИПЫ ДАННЫХ =====
@@ -140,6 +143,10 @@ class ColorThemes:
     def get_available_themes(cls) -> List[str]:
         return list(cls.THEMES.keys())
 
+# ===== КЛАССИФИКАЦИЯ ТЕКСТА =====
+# Общий классификатор V4: категория запоминается по строке
+_TEXT_CLASSIFIER = TextClassifier()
+
 # ===== МОДУЛЬ ТЕКСТА =====
 class TextModule:
     """Модуль работы с текстом и авто-масштабированием"""
@@ -205,25 +212,7 @@ class TextModule:
                 return "title"
         
         # Эвристики на основе содержания
-        text_lower = text.lower()
-        
-        # Очень короткий текст
-        if len(text) < 15:
-            return "caption"
-        
-        # Текст с маркерами или цифрами
-        if any(marker in text for marker in ['•', '-', '—', '·', '1.', '2.', '3.']):
-            return "subtitle"
-        
-        # Длинный текст
-        if len(text) > 100:
-            return "main"
-        
-        # Заголовки обычно короткие
-        if len(text) < 50 and (text.isupper() or text[0].isupper() and text[-1] in '!?:'):
-            return "title"
-        
-        return "main"
+        return _TEXT_CLASSIFIER.category(text)
 
 # ===== МОДУЛЬ КОМПОНОВКИ =====
 class LayoutModule:
@@ -237,11 +226,50 @@ class LayoutModule:
     
     def calculate_bounds(self, element: ContentElement, parent_bounds: Optional[Tuple] = None) -> Optional[Tuple]:
         """Вычисляет границы элемента"""
-        if element.layout_strategy == LayoutStrategy.MANUAL:
-            return self._calculate_manual_bounds(element, parent_bounds)
-        # TODO: Добавить другие стратегии
+        parent = element.parent
+        if parent_bounds and parent is not None and parent.layout_strategy != LayoutStrategy.MANUAL:
+            for child, rect in zip(parent.children, self.layout_children(parent, parent_bounds)):
+                if child is element:
+                    return rect
         return self._calculate_manual_bounds(element, parent_bounds)
     
+    def layout_children(self, container: ContentElement, area: Tuple) -> List[Tuple]:
+        """Границы всех детей контейнера в области area за один проход
+        
+        VERTICAL_STACK / HORIZONTAL_STACK распределяют место по главной оси
+        с учетом SizeConstraints (min/max, aspect_ratio, grow_priority),
+        GRID - равные ячейки (колонки - metadata['columns']). Расчет -
+        V4.container_layout. Результат хранится на самом контейнере, пока не
+        изменились область и размеры детей.
+        """
+        children = container.children
+        key = (tuple(area), container.layout_strategy, container.metadata.get('columns'),
+               container.style.margin, tuple(_size_snapshot(child) for child in children))
+        cached = container.__dict__.get('_children_layout')
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        
+        rects = self._solve_children(container, area)
+        container._children_layout = (key, rects)
+        return rects
+    
+    def _solve_children(self, container: ContentElement, area: Tuple) -> List[Tuple]:
+        children = container.children
+        gap = container.style.margin
+        widths = [child.width for child in children]
+        heights = [child.height for child in children]
+        constraints = [child.constraints for child in children]
+        
+        if container.layout_strategy == LayoutStrategy.GRID:
+            return grid_rects(area, widths, heights, container.metadata.get('columns'), gap,
+                              constraints=constraints)
+        if container.layout_strategy == LayoutStrategy.VERTICAL_STACK:
+            return stack_rects(area, heights, widths, True, gap, constraints=constraints)
+        if container.layout_strategy == LayoutStrategy.HORIZONTAL_STACK:
+            return stack_rects(area, widths, heights, False, gap, constraints=constraints)
+        
+        return [self._calculate_manual_bounds(child, area) for child in children]
+    
     def _calculate_manual_bounds(self, element: ContentElement, parent_bounds: Optional[Tuple]) -> Tuple:
         """Ручное размещение"""
         if parent_bounds:
@@ -272,6 +300,12 @@ class LayoutModule:
             parent_h - 2 * padding
         )
 
+def _size_snapshot(element: ContentElement) -> Tuple:
+    """Все, от чего зависит раскладка ребенка (SizeConstraints не хешируется)"""
+    limits = element.constraints
+    return (element.x, element.y, element.width, element.height, limits.min_width, limits.max_width,
+            limits.min_height, limits.max_height, limits.aspect_ratio, limits.grow_priority)
+
 # ===== ОСНОВНОЙ API =====
 class PresentationBuilder:
     """
@@ -279,8 +313,8 @@ class PresentationBuilder:
     Простой API для быстрого старта
     """
     
-    def __init__(self, theme: str = "default"):
-        self.prs = Presentation()
+    def __init__(self, theme: str = "default", template: str = None):
+        self.prs = new_presentation(template)
         self.prs.slide_width = Inches(13.333)
         self.prs.slide_height = Inches(7.5)
         self.theme = ColorThemes.get_theme(theme)
@@ -353,9 +387,11 @@ class SlideBuilder:
             self._render_element(element)
         return self
     
-    def _render_element(self, element: ContentElement, parent_bounds: Optional[Tuple] = None):
+    def _render_element(self, element: ContentElement, parent_bounds: Optional[Tuple] = None,
+                        bounds: Optional[Tuple] = None):
         """Рендерит элемент и его детей"""
-        bounds = self.layout_module.calculate_bounds(element, parent_bounds)
+        if bounds is None:
+            bounds = self.layout_module.calculate_bounds(element, parent_bounds)
         if not bounds:
             return
         
@@ -372,12 +408,14 @@ class SlideBuilder:
         # Резервируем область
         self.layout_module.reserve_area(x, y, width, height)
         
-        # Рекурсивно рендерим детей
-        for child in element.children:
+        # Рекурсивно рендерим детей (раскладка всех детей - за один проход)
+        if element.children:
             child_bounds = self.layout_module.calculate_child_bounds(
                 (x, y, width, height), element.style.padding
             )
-            self._render_element(child, child_bounds)
+            child_rects = self.layout_module.layout_children(element, child_bounds)
+            for child, child_rect in zip(element.children, child_rects):
+                self._render_element(child, child_bounds, child_rect)
     
     def _render_text_element(self, element: ContentElement, x: float, y: float, width: float, height: float):
         """Рендерит текстовый элемент"""